@@ -286,52 +286,122 @@ def add_object_cached(col, name, col_obj, fcl_obj):
     o = col_obj
     # # Add collision object to set
     if name in col._objs:
-        col._manager.unregisterObject(col._objs[name])
+        col._manager.unregisterObject(col._objs[name]["obj"])
     col._objs[name] = {"obj": o, "geom": geom}
     # # store the name of the geometry
     col._names[id(geom)] = name
 
     col._manager.registerObject(o)
-    col._manager.update()
     return o
 
 
+# incremented by sync_trimesh, so cached collision managers can tell which members moved
+_pose_clock = 0
+
+
+def tagged_col_obj(scene, name, tags, cache=True):
+    """
+    Get an fcl CollisionObject for only the faces of `name` which have `tags`
+
+    The geometry is stored in the object's local frame and shares the object's transform, so
+    sync_trimesh can move it without rebuilding its BVH. If cache, it is stored on the trimesh
+    geometry and shared by every collision manager using the same (name, tags)
+    """
+
+    _, g = scene.graph[name]
+    geom = scene.geometry[g]
+
+    tag_key = frozenset(tags)
+    tagged = getattr(geom, "tagged_col_objs", None)
+    if tagged is None:
+        tagged = {}
+        if cache:
+            geom.tagged_col_objs = tagged
+    if tag_key in tagged:
+        return tagged[tag_key]
+
+    obj = blender_objs_from_names(name)[0]
+    mask = tagging.tagged_face_mask(obj, tags)
+    if not mask.any():
+        logger.warning(f"{name=} had {mask.sum()=} for {tags=}")
+        return None
+
+    sub = geom.submesh(np.where(mask), append=True)
+    assert len(sub.faces) == mask.sum()
+    sub.apply_transform(np.linalg.inv(geom.current_transform))
+
+    T = geom.current_transform
+    t = fcl.Transform(T[:3, :3], T[:3, 3])
+    fcl_obj = trimesh.collision.CollisionManager()._get_fcl_obj(sub)
+    res = (fcl.CollisionObject(fcl_obj, t), fcl_obj)
+    tagged[tag_key] = res
+    return res
+
+
+def _refit_cached_col(scene, col):
+    """
+    Bring a cached collision manager up to date with any members moved since it was last used,
+    refitting only their leaves of the dynamic AABB tree
+
+    Returns False if a member's geometry was replaced, meaning the manager must be rebuilt
+    """
+
+    if col._pose_stamp == _pose_clock:
+        return True
+
+    moved = []
+    for name, geom in col._sources.items():
+        _, g = scene.graph[name]
+        if scene.geometry.get(g) is not geom:
+            return False
+        if name in col._objs and getattr(geom, "pose_version", 0) > col._pose_stamp:
+            moved.append(col._objs[name]["obj"])
+
+    if len(moved):
+        col._manager.update(moved)
+    col._pose_stamp = _pose_clock
+
+    return True
+
+
 def col_from_subset(scene, names, tags=None, bvh_cache=None):
     if isinstance(names, str):
         names = [names]
 
-    if bvh_cache is not None and bvh_caching_config():
+    use_cache = bvh_cache is not None and bvh_caching_config()
+
+    if use_cache:
         tag_key = frozenset(tags) if tags is not None else None
         key = (frozenset(names), tag_key)
         res = bvh_cache.get(key)
-        if res is not None:
+        if res is not None and _refit_cached_col(scene, res):
             return res
 
     col = trimesh.collision.CollisionManager()
+    col._sources = {}
+    col._pose_stamp = _pose_clock
 
     for name in names:
         T, g = scene.graph[name]
         geom = scene.geometry[g]
+        col._sources[name] = geom
         if tags is not None and len(tags) > 0:
-            obj = blender_objs_from_names(name)[0]
-            mask = tagging.tagged_face_mask(obj, tags)
-            if not mask.any():
-                logger.warning(f"{name=} had {mask.sum()=} for {tags=}")
+            res = tagged_col_obj(scene, name, tags, cache=use_cache)
+            if res is None:
                 continue
-            geom = geom.submesh(np.where(mask), append=True)
-            T = trimesh.transformations.identity_matrix()
-            t = fcl.Transform(T[:3, :3], T[:3, 3])
-            geom.fcl_obj = col._get_fcl_obj(geom)
-            geom.col_obj = fcl.CollisionObject(geom.fcl_obj, t)
-            assert len(geom.faces) == mask.sum()
+            col_obj, fcl_obj = res
+        else:
+            col_obj, fcl_obj = geom.col_obj, geom.fcl_obj
         # col.add_object(name, geom, T)
-        add_object_cached(col, name, geom.col_obj, geom.fcl_obj)
+        add_object_cached(col, name, col_obj, fcl_obj)
+
+    col._manager.update()
 
     if len(col._objs) == 0:
         logger.debug(f"{names=} got no objs, returning None")
         col = None
 
-    if bvh_cache is not None and bvh_caching_config():
+    if use_cache:
         bvh_cache[key] = col
 
     return col
@@ -362,6 +432,12 @@ def sync_trimesh(scene: trimesh.Scene, obj_name: str):
     mesh.current_transform = np.array(blender_obj.matrix_world)
     t = fcl.Transform(T[:3, :3], T[:3, 3])
     mesh.col_obj.setTransform(t)
+    for col_obj, _ in getattr(mesh, "tagged_col_objs", {}).values():
+        col_obj.setTransform(t)
+
+    global _pose_clock
+    _pose_clock += 1
+    mesh.pose_version = _pose_clock
 
 
 def translate(scene: trimesh.Scene, a: str, translation):
@@ -1,2 +1,8 @@
-from .eval_memo import evict_memo_for_move, evict_memo_for_obj, memo_key
+from .eval_memo import (
+    EvictionIndex,
+    evict_memo_for_move,
+    evict_memo_for_name,
+    evict_memo_for_obj,
+    memo_key,
+)
 from .evaluate import EvalResult, evaluate_node, evaluate_problem, viol_count
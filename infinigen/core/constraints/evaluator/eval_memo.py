@@ -5,6 +5,7 @@
 # Authors: Alexander Raistrick
 
 import logging
+from collections import defaultdict
 
 from infinigen.core import tags as t
 from infinigen.core.constraints import constraint_language as cl
@@ -24,6 +25,82 @@ def memo_key(n: cl.Node):
             return id(n)
 
 
+class DependencyIndex:
+    """
+    Reverse index from object names to the memo keys whose values were computed from them.
+
+    Populated by evaluate.evaluate_node as it fills the memo, and stored inside the memo itself
+    (under the DependencyIndex class as key) so that sub-memos created by ForAll/SumOver share it.
+
+    Dependencies follow the same rules as evict_memo_for_obj: cl.scene depends on every object it returns,
+    cl.tagged narrows its children's dependencies to objects satisfying its tags, and all other nodes
+    depend on the union of their children.
+    """
+
+    def __init__(self):
+        self.key_deps: dict = {}
+        self.name_keys: defaultdict[str, set] = defaultdict(set)
+        self._stack: list[set] = []
+
+    def enter(self):
+        self._stack.append(set())
+
+    def exit(self, node: cl.Node, key, val, state: State):
+        deps = self._stack.pop()
+
+        match node:
+            case cl.scene():
+                deps = set(val)
+            case cl.tagged(_, tags):
+                deps = {
+                    n
+                    for n in deps
+                    if n not in state.objs or t.satisfies(state.objs[n].tags, tags)
+                }
+            case _:
+                pass
+
+        self.key_deps[key] = deps
+        for n in deps:
+            self.name_keys[n].add(key)
+        self.record_hit(key)
+
+    def record_hit(self, key):
+        if len(self._stack) and key in self.key_deps:
+            self._stack[-1].update(self.key_deps[key])
+
+
+def dependency_index(memo: dict) -> DependencyIndex:
+    index = memo.get(DependencyIndex)
+    if index is None:
+        index = DependencyIndex()
+        memo[DependencyIndex] = index
+    return index
+
+
+def evict_memo_for_name(memo: dict, name: str) -> int:
+    """
+    Evict every memo entry whose value was computed using object `name`.
+
+    Unlike evict_memo_for_obj this does not require `name` to still be present in state.objs.
+    Entries in the index are intentionally not removed, so that reverting a deletion evicts
+    exactly the same keys again.
+    """
+
+    index = memo.get(DependencyIndex)
+    if index is None:
+        n = len(memo)
+        memo.clear()
+        return n
+
+    evicted = 0
+    for key in index.name_keys.get(name, ()):
+        if key in memo:
+            del memo[key]
+            evicted += 1
+    return evicted
+
+
 def evict_memo_for_obj(node: cl.Problem, memo: dict, obj: ObjectState):
     recvals = [evict_memo_for_obj(child, memo, obj) for _, child in node.children()]
     res = any(recvals)
@@ -44,19 +121,94 @@ def evict_memo_for_obj(node: cl.Problem, memo: dict, obj: ObjectState):
     return res
 
 
-def reset_bvh_cache(state, filter_name=None):
+class EvictionIndex:
+    """
+    Precomputed equivalent of evict_memo_for_obj for a fixed constraint graph.
+
+    evict_memo_for_obj evicts a node if there is some path from it down to cl.scene along which every
+    cl.tagged filter is implied by the object's tags. Since implies(a, b) and implies(a, c) iff
+    implies(a, b | c), each such path reduces to the union of its tags, so we store each memo key
+    under every union-of-tags it can reach cl.scene through. Eviction is then a lookup of the objects
+    tags, which is itself cached since objects share a small number of distinct tagsets.
+    """
+
+    def __init__(self, problem: cl.Problem):
+        self.problem = problem
+        self.keys_by_tags: dict[frozenset, set] = {}
+        self._keys_for_objtags: dict[frozenset, list] = {}
+
+        path_tags = {}
+        self._index_node(problem, path_tags)
+
+        logger.debug(
+            f"{self.__class__.__name__} indexed {len(path_tags)} nodes under "
+            f"{len(self.keys_by_tags)} distinct tagsets"
+        )
+
+    def _index_node(self, node: cl.Node, path_tags: dict) -> set[frozenset]:
+        if id(node) in path_tags:
+            return path_tags[id(node)]
+
+        res = set()
+        for _, child in node.children():
+            res.update(self._index_node(child, path_tags))
+
+        match node:
+            case cl.tagged(_, tags):
+                res = {p.union(tags) for p in res}
+            case cl.scene():
+                res = {frozenset()}
+            case _:
+                pass
+
+        key = memo_key(node)
+        for p in res:
+            self.keys_by_tags.setdefault(p, set()).add(key)
+
+        path_tags[id(node)] = res
+        return res
+
+    def keys_for_obj(self, obj: ObjectState) -> list:
+        objtags = frozenset(obj.tags)
+
+        keys = self._keys_for_objtags.get(objtags)
+        if keys is not None:
+            return keys
+
+        keys = set()
+        for tags, tag_keys in self.keys_by_tags.items():
+            if len(tags) == 0 or t.implies(obj.tags, tags):
+                keys.update(tag_keys)
+
+        keys = list(keys)
+        self._keys_for_objtags[objtags] = keys
+        return keys
+
+    def evict(self, memo: dict, obj: ObjectState) -> int:
+        evicted = 0
+        for key in self.keys_for_obj(obj):
+            if key in memo:
+                del memo[key]
+                evicted += 1
+        return evicted
+
+
+def reset_bvh_cache(state, filter_name=None, filter_obj_name=None):
     """
     filter_name: if specified, only get rid of things containing this
+    filter_obj_name: blender object name to filter by, for objects no longer in state.objs
     """
 
     static_tags = {t.Semantics.Room, t.Semantics.Cutter}
 
+    if filter_name is not None:
+        filter_obj_name = state.objs[filter_name].obj.name
+
     def keep_key(k):
         names, tags = k
 
-        if filter_name is not None:
-            obj = state.objs[filter_name].obj
-            return obj.name not in names
+        if filter_obj_name is not None:
+            return filter_obj_name not in names
 
         for n in names:
             if n not in state.objs:
@@ -80,26 +232,49 @@ def reset_bvh_cache(state, filter_name=None):
 
 
 def evict_memo_for_move(
-    problem: cl.Problem, state: State, memo: dict, move: moves.Move
-):
+    problem: cl.Problem,
+    state: State,
+    memo: dict,
+    move: moves.Move,
+    index: EvictionIndex = None,
+) -> int:
+    """
+    index: if specified, must have been built from `problem`, and is used instead of walking the graph
+
+    Returns the number of memo entries evicted
+    """
+
+    n_before = len(memo)
+
     match move:
         case (
             moves.TranslateMove(names)
             | moves.RotateMove(names)
-            | moves.Addition(names=names)
             | moves.ReinitPoseMove(names=names)
             | moves.RelationPlaneChange(names=names)
-            | moves.Resample(names=names)
         ):
+            # pose only, cached collision managers refit the moved object when next used
+            for name in names:
+                assert name is not None, move
+                if index is not None:
+                    index.evict(memo, state.objs[name])
+                else:
+                    evict_memo_for_obj(problem, memo, state.objs[name])
+        case moves.Addition(names=names) | moves.Resample(names=names):
             for name in names:
                 assert name is not None, move
-                evict_memo_for_obj(problem, memo, state.objs[name])
+                if index is not None:
+                    index.evict(memo, state.objs[name])
+                else:
+                    evict_memo_for_obj(problem, memo, state.objs[name])
                 reset_bvh_cache(state, filter_name=name)
-        case moves.Deletion(name):
-            # TODO hack - delete everything since we cant evict for specific obj after it has ben deleted
-            # easily fixable with more work / refactoring
-            for k in list(memo.keys()):
-                del memo[k]
-            reset_bvh_cache(state)
+        case moves.Deletion(names):
+            # the object is no longer in state.objs, so use the dependency index recorded
+            # while it was still present rather than walking the graph with its tags
+            for name in names:
+                evict_memo_for_name(memo, name)
+            reset_bvh_cache(state, filter_obj_name=move._backup_state.obj.name)
         case _:
             raise NotImplementedError(f"Unsure what to evict for {move=}")
+
+    return n_before - len(memo)
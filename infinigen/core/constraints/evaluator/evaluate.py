@@ -207,8 +207,13 @@ def evaluate_node(node: cl.Node, state: State, memo=None):
     if memo is None:
         memo = {}
     elif k in memo:
+        eval_memo.dependency_index(memo).record_hit(k)
         return memo[k]
+
+    deps = eval_memo.dependency_index(memo)
+    deps.enter()
     val = _compute_node_val(node, state, memo)
+    deps.exit(node, k, val, state)
 
     memo[k] = val
     # logger.debug("Evaluated %s to %s", node.__class__, val)
@@ -4,6 +4,7 @@
 
 # Authors: Alexander Raistrick, Karhan Kayan
 
+import itertools
 import logging
 import os
 import time
@@ -22,7 +23,7 @@ from infinigen.core.constraints.constraint_language import util as impl_util
 from infinigen.core.constraints.evaluator import eval_memo, evaluate
 from infinigen.core.util import blender as butil
 
-from .moves import Move
+from .moves import Move, prescreen_pose_moves
 from .state_def import State
 
 logger = logging.getLogger(__name__)
@@ -43,11 +44,13 @@ class SimulatedAnnealingSolver:
         visualize=False,
         print_report_freq=1,
         print_breakdown_freq=0,
+        proposal_batch_size=1,
     ) -> None:
         self.initial_temp = initial_temp
         self.final_temp = final_temp
         self.max_invalid_candidates = max_invalid_candidates
         self.finetune_pct = finetune_pct
+        self.proposal_batch_size = proposal_batch_size
 
         self.print_report_freq = print_report_freq
         self.print_breakdown_freq = print_breakdown_freq
@@ -63,8 +66,13 @@ class SimulatedAnnealingSolver:
         self.last_eval_result = None
 
         self.eval_memo = {}
+        self.eviction_index = None
         self.stats = []
 
+        self._step_evict_count = 0
+        self._step_evict_dur = 0
+        self._step_screened = 0
+
     def save_stats(self, path):
         if len(self.stats) == 0:
             return
@@ -90,12 +98,17 @@ class SimulatedAnnealingSolver:
 
         logger.info(f"Total elapsed {path.stem} {self.stats[-1]['elapsed']:.2f}")
 
-    def reset(self, max_iters):
+    def reset(self, max_iters, consgraph: cl.Problem = None):
         self.curr_iteration = 0
         self.curr_result = None
         self.best_loss = None
         self.eval_memo = {}
 
+        if consgraph is not None:
+            self.eviction_index = eval_memo.EvictionIndex(consgraph)
+        else:
+            self.eviction_index = None
+
         self.optim_start_time = time.perf_counter()
         self.max_iterations = max_iters
 
@@ -143,7 +156,10 @@ class SimulatedAnnealingSolver:
         )
         impl_util.DISABLE_BVH_CACHE = False
 
-        if real_result.loss() == prop_result.loss():
+        if (
+            real_result.loss() == prop_result.loss()
+            and real_result.viol_count() == prop_result.viol_count()
+        ):
             return
 
         for n in consgraph.traverse(inorder=False):
@@ -157,7 +173,21 @@ class SimulatedAnnealingSolver:
             print("\n\n INVALID")
             pprint(n, depth=3)
             print(f"memo for node is out of sync, got {lazy=} yet {test_memo[key]=}")
-        raise ValueError(f"{real_result.loss()=:.4f} {prop_result.loss()=:.4f}")
+        raise ValueError(
+            f"{real_result.loss()=:.4f} {prop_result.loss()=:.4f} "
+            f"{real_result.viol_count()=} {prop_result.viol_count()=}"
+        )
+
+    def _evict(self, consgraph: "cl.Problem", state: "State", move: "Move"):
+        index = self.eviction_index
+        if index is not None and index.problem is not consgraph:
+            index = None
+
+        start = time.perf_counter()
+        self._step_evict_count += eval_memo.evict_memo_for_move(
+            consgraph, state, self.eval_memo, move, index=index
+        )
+        self._step_evict_dur += time.perf_counter() - start
 
     @gin.configurable
     def _move(
@@ -170,7 +200,7 @@ class SimulatedAnnealingSolver:
         validate_lazy_eval=False,
     ):
         if do_lazy_eval:
-            eval_memo.evict_memo_for_move(consgraph, state, self.eval_memo, move)
+            self._evict(consgraph, state, move)
             prop_result = evaluate.evaluate_problem(
                 consgraph, state, filter_domain, self.eval_memo
             )
@@ -184,6 +214,26 @@ class SimulatedAnnealingSolver:
 
         return prop_result
 
+    def _screened_proposals(self, move_gen: typing.Iterator, state: "State"):
+        """
+        Yields (move, plausible) pairs from move_gen.
+
+        If proposal_batch_size > 1, candidates are drawn from move_gen in batches and pose moves are
+        checked for collisions against a read-only snapshot of the trimesh scene, so that candidates
+        which are certain to fail never have to be applied to and reverted from blender.
+        """
+
+        if self.proposal_batch_size <= 1:
+            for move in move_gen:
+                yield move, True
+            return
+
+        while True:
+            batch = list(itertools.islice(move_gen, self.proposal_batch_size))
+            if len(batch) == 0:
+                return
+            yield from zip(batch, prescreen_pose_moves(state, batch))
+
     @gin.configurable
     def retry_attempt_proposals(
         self,
@@ -195,24 +245,34 @@ class SimulatedAnnealingSolver:
     ) -> typing.Tuple["Move", "evaluate.EvalResult", int]:
         move_gen = propose_func(consgraph, state, filter_domain, temp)
 
+        max_screened = self.max_invalid_candidates * max(self.proposal_batch_size, 1)
+
         move = None
-        retry = None
-        for retry, move in enumerate(move_gen):
+        retry = 0
+        for move, plausible in self._screened_proposals(move_gen, state):
             if retry == self.max_invalid_candidates:
                 logger.debug(
                     f"{move_gen=} reached {self.max_invalid_candidates=} without succeeding an apply()"
                 )
                 break
 
+            if not plausible:
+                self._step_screened += 1
+                if self._step_screened == max_screened:
+                    logger.debug(f"{move_gen=} reached {max_screened=} screened out")
+                    break
+                continue
+
             succeeded = move.apply(state)
             if succeeded:
-                eval_memo.evict_memo_for_move(consgraph, state, self.eval_memo, move)
+                self._evict(consgraph, state, move)
                 result = self._move(consgraph, state, move, filter_domain)
                 return move, result, retry
 
             logger.debug(f"{retry=} reverting {move=}")
-            eval_memo.evict_memo_for_move(consgraph, state, self.eval_memo, move)
+            self._evict(consgraph, state, move)
             move.revert(state)
+            retry += 1
 
         else:
             logger.debug(f"{move_gen=} produced {retry} attempts and none were valid")
@@ -256,6 +316,9 @@ class SimulatedAnnealingSolver:
             )
 
         move_start_time = time.perf_counter()
+        self._step_evict_count = 0
+        self._step_evict_dur = 0
+        self._step_screened = 0
 
         is_log_step = (
             self.print_report_freq != 0
@@ -285,7 +348,7 @@ class SimulatedAnnealingSolver:
                 self.curr_result = prop_result
                 move.accept(state)
             else:
-                eval_memo.evict_memo_for_move(consgraph, state, self.eval_memo, move)
+                self._evict(consgraph, state, move)
                 move.revert(state)
 
         dt = time.perf_counter() - move_start_time
@@ -332,6 +395,9 @@ class SimulatedAnnealingSolver:
                     move_dur=dt,
                     elapsed=elapsed,
                     retry=retry,
+                    evict_count=self._step_evict_count,
+                    evict_dur=self._step_evict_dur,
+                    screened=self._step_screened,
                 )
             )
 
@@ -15,10 +15,34 @@ from infinigen.core.constraints.constraint_language.util import sync_trimesh
 from infinigen.core.util import blender as butil
 
 
-def to_trimesh(obj: bpy.types.Object):
-    bpy.context.view_layer.update()
-    verts = np.array([obj.matrix_world @ v.co for v in obj.data.vertices])
-    faces = np.array([p.vertices for p in obj.data.polygons])
+def to_trimesh(obj: bpy.types.Object, update=True):
+    """
+    update: if False, caller is responsible for calling bpy.context.view_layer.update() beforehand,
+        e.g. once for a whole batch of objects
+    """
+
+    if update:
+        bpy.context.view_layer.update()
+
+    mesh_data = obj.data
+
+    verts = np.empty(len(mesh_data.vertices) * 3, dtype=np.float64)
+    mesh_data.vertices.foreach_get("co", verts)
+    verts = verts.reshape(-1, 3)
+
+    M = np.array(obj.matrix_world)
+    if not np.allclose(M, np.eye(4)):
+        verts = verts @ M[:3, :3].T + M[:3, 3]
+
+    n_polys = len(mesh_data.polygons)
+    if len(mesh_data.loops) == 3 * n_polys:
+        faces = np.empty(3 * n_polys, dtype=np.int64)
+        mesh_data.polygons.foreach_get("vertices", faces)
+        faces = faces.reshape(-1, 3)
+    else:
+        # non-triangulated mesh, polygons cannot be read into a fixed-width buffer
+        faces = np.array([p.vertices for p in mesh_data.polygons])
+
     mesh = trimesh.Trimesh(vertices=verts, faces=faces, process=False)
     mesh.current_transform = trimesh.transformations.identity_matrix()
     return mesh
@@ -46,18 +70,28 @@ def parse_scene(objects):
     preprocess_scene(objects)
 
     scene = trimesh.Scene()
-    for obj in objects:
-        add_to_scene(scene, obj)
+    add_objects_to_scene(scene, objects, preprocess=False)
 
     return scene
 
 
-def add_to_scene(scene, obj, preprocess=True):
+def add_objects_to_scene(scene, objects, preprocess=True):
+    # add many objects with a single view_layer update, rather than one per object
+
+    if preprocess:
+        preprocess_scene(objects)
+    else:
+        bpy.context.view_layer.update()
+
+    return [add_to_scene(scene, obj, preprocess=False, update=False) for obj in objects]
+
+
+def add_to_scene(scene, obj, preprocess=True, update=True):
     if preprocess:
         preprocess_obj(obj)
     obj_matrix_world = Matrix(obj.matrix_world)
     obj.matrix_world = Matrix.Identity(4)
-    tmesh = to_trimesh(obj)
+    tmesh = to_trimesh(obj, update=update)
     tmesh.metadata["tags"] = tagging.union_object_tags(obj)
     scene.add_geometry(
         geometry=tmesh,
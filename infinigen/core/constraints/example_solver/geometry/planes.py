@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 import logging
+from collections import OrderedDict
 
 import bpy
 import gin
@@ -23,45 +24,83 @@ from infinigen.core.constraints.constraint_language.util import (
 logger = logging.getLogger(__name__)
 
 
+@gin.configurable
 class Planes:
-    def __init__(self):
-        self._mesh_hashes = {}  # Dictionary to store mesh hashes for each object
-        self._cached_planes = {}  # Dictionary to store computed planes, keyed by object and face_mask hash
-        self._cached_plane_masks = {}  # Dictionary to store computed plane masks, keyed by object, plane, and face_mask hash
+    """
+    Caches are keyed by a hash of each object's local vertex and face buffers rather than its name,
+    so resampled assets with identical topology are not served stale planes, and identical placeholders
+    (e.g. the same factory and seed) share computed results. Results only store polygon indices, and
+    coplanarity is invariant to the object's pose, so they remain valid as objects are moved.
+    """
+
+    def __init__(self, max_cached_planes=2000, max_cached_plane_masks=20000):
+        self.max_cached_planes = max_cached_planes
+        self.max_cached_plane_masks = max_cached_plane_masks
+
+        # (mesh_hash, face_mask_hash, tolerance) -> list of representative polygon indices
+        self._cached_planes = OrderedDict()
+        # (mesh_hash, face_mask_hash, plane polygon index, tolerance) -> plane mask
+        self._cached_plane_masks = OrderedDict()
+
+        self.stats = dict(
+            planes_hit=0,
+            planes_miss=0,
+            plane_masks_hit=0,
+            plane_masks_miss=0,
+        )
 
     def calculate_mesh_hash(self, obj):
-        # Simple hash based on counts of vertices, edges, and polygons
+        # Hash of the actual vertex/face buffers, independent of object name and pose
         mesh = obj.data
-        hash_str = (
-            f"{obj.name}_{len(mesh.vertices)}_{len(mesh.edges)}_{len(mesh.polygons)}"
-        )
-        return hash(hash_str)
+        verts = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", verts)
+        loops = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loops)
+        loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_starts)
+        return hash((verts.tobytes(), loops.tobytes(), loop_starts.tobytes()))
 
     def hash_face_mask(self, face_mask):
         # Hash the face_mask to use as part of the key for caching
-        return hash(face_mask.tostring())
+        return hash(face_mask.tobytes())
+
+    @staticmethod
+    def _lru_get(cache: OrderedDict, key):
+        res = cache.get(key)
+        if res is not None:
+            cache.move_to_end(key)
+        return res
+
+    @staticmethod
+    def _lru_put(cache: OrderedDict, key, value, max_size: int):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+    def clear_cache(self):
+        self._cached_planes.clear()
+        self._cached_plane_masks.clear()
 
     def get_all_planes_cached(self, obj, face_mask, tolerance=1e-4):
-        current_mesh_hash = self.calculate_mesh_hash(obj)
-        current_face_mask_hash = self.hash_face_mask(face_mask)
-        cache_key = (obj.name, current_face_mask_hash)
-
-        # Check if mesh has been modified or planes have not been computed before for this object and face_mask
-        if (
-            cache_key not in self._cached_planes
-            or self._mesh_hashes.get(obj.name) != current_mesh_hash
-        ):
-            self._mesh_hashes[obj.name] = (
-                current_mesh_hash  # Update the hash for this object
-            )
-            # Recompute planes for this object and face_mask and update cache
-            # logger.info(f'Cache MISS planes for {obj.name=}')
-            self._cached_planes[cache_key] = self.compute_all_planes_fast(
-                obj, face_mask, tolerance
+        cache_key = (
+            self.calculate_mesh_hash(obj),
+            self.hash_face_mask(face_mask),
+            tolerance,
+        )
+
+        poly_idxs = self._lru_get(self._cached_planes, cache_key)
+        if poly_idxs is None:
+            self.stats["planes_miss"] += 1
+            planes = self.compute_all_planes_fast(obj, face_mask, tolerance)
+            poly_idxs = [idx for _, idx in planes]
+            self._lru_put(
+                self._cached_planes, cache_key, poly_idxs, self.max_cached_planes
             )
+        else:
+            self.stats["planes_hit"] += 1
 
-        # logger.info(f'Cache HIT planes for {obj.name=}')
-        return self._cached_planes[cache_key]
+        return [(obj.name, idx) for idx in poly_idxs]
 
     @staticmethod
     def normalize(v):
@@ -271,44 +310,35 @@ class Planes:
             return self._compute_tagged_plane_mask(
                 obj, face_mask, plane, plane_tolerance
             )
-        obj_id = obj.name
-        current_hash = self.calculate_mesh_hash(obj)  # Calculate current mesh hash
-        face_mask_hash = self.hash_face_mask(face_mask)  # Calculate hash for face_mask
-        ref_poly = self.planerep_to_poly(plane)
-        ref_vertex = butil.global_vertex_coordinates(
-            obj, obj.data.vertices[ref_poly.vertices[0]]
-        )
-        ref_normal = butil.global_polygon_normal(obj, ref_poly)
-        plane_hash = self.hash_plane(
-            ref_normal, ref_vertex, hash_tolerance
-        )  # Calculate hash for plane
-
-        # Composite key now includes face_mask_hash
-        cache_key = (obj_id, plane_hash, face_mask_hash)
+        plane_name, plane_idx = plane
+        if plane_name != obj.name:
+            # reference plane belongs to a different object, result depends on both poses
+            return self._compute_tagged_plane_mask(
+                obj, face_mask, plane, plane_tolerance
+            )
 
-        # Check if the mesh has been modified since last calculation or if the face mask has changed
-        mesh_or_face_mask_changed = (
-            cache_key not in self._cached_plane_masks
-            or self._mesh_hashes.get(obj_id) != current_hash
+        cache_key = (
+            self.calculate_mesh_hash(obj),
+            self.hash_face_mask(face_mask),
+            plane_idx,
+            plane_tolerance,
         )
 
-        if not mesh_or_face_mask_changed:
-            # logger.info(f'Cache HIT plane mask for {obj.name=}')
-            return self._cached_plane_masks[cache_key]["mask"]
-
-        # If mesh or face mask changed, update the hash and recompute
-        self._mesh_hashes[obj_id] = current_hash
+        plane_mask = self._lru_get(self._cached_plane_masks, cache_key)
+        if plane_mask is not None:
+            self.stats["plane_masks_hit"] += 1
+            return plane_mask
 
-        # Compute and cache the plane mask
-        # logger.info(f'Cache MISS plane mask for {obj.name=}')
+        self.stats["plane_masks_miss"] += 1
         plane_mask = self._compute_tagged_plane_mask(
             obj, face_mask, plane, plane_tolerance
         )
-
-        # Update the cache with the new result
-        self._cached_plane_masks[cache_key] = {
-            "mask": plane_mask,
-        }
+        self._lru_put(
+            self._cached_plane_masks,
+            cache_key,
+            plane_mask,
+            self.max_cached_plane_masks,
+        )
 
         return plane_mask
 
@@ -5,13 +5,16 @@
 
 import logging
 
+import fcl
 import gin
+import numpy as np
 from shapely.geometry import MultiPolygon, Point, Polygon
 
 import infinigen.core.constraints.constraint_language as cl
 from infinigen.core import tags as t
 from infinigen.core.constraints.constraint_language.util import (
     blender_objs_from_names,
+    col_from_subset,
     meshes_from_names,
     project_to_xy_poly,
 )
@@ -93,6 +96,68 @@ def all_relations_valid(state, name):
     return True
 
 
+def collision_candidates(state: State, name: str) -> list[str]:
+    return [
+        os.obj.name
+        for k, os in state.objs.items()
+        if k != name and t.Semantics.NoCollision not in os.tags
+    ]
+
+
+def collision_checking_disabled() -> bool:
+    # the disable_collision_checking gin binding of check_post_move_validity
+    try:
+        return gin.query_parameter(
+            "check_post_move_validity.disable_collision_checking"
+        )
+    except ValueError:
+        return False
+
+
+def transform_collision_free(
+    state: State, name: str, transform: np.ndarray, max_depth=0.0001
+) -> bool:
+    """
+    Read-only version of the collision test in check_post_move_validity, for object `name` placed at `transform`.
+
+    Reuses the object's existing fcl geometry and the cached collision manager of all other objects,
+    so it does not modify blender or the trimesh scene. Relations are not checked, so a True result
+    still needs to be confirmed by check_post_move_validity after the move is applied.
+    Always True when check_post_move_validity.disable_collision_checking is bound.
+    """
+
+    if collision_checking_disabled():
+        return True
+
+    scene = state.trimesh_scene
+    objstate = state.objs[name]
+
+    if t.Semantics.NoCollision in objstate.tags:
+        return True
+
+    collision_objs = collision_candidates(state, name)
+    if len(collision_objs) == 0:
+        return True
+
+    col = col_from_subset(scene, collision_objs, bvh_cache=state.bvh_cache)
+    if col is None:
+        return True
+
+    mesh = meshes_from_names(scene, objstate.obj.name)[0]
+    candidate = fcl.CollisionObject(
+        mesh.fcl_obj, fcl.Transform(transform[:3, :3], transform[:3, 3])
+    )
+
+    request = fcl.CollisionRequest(num_max_contacts=100000, enable_contact=True)
+    cdata = fcl.CollisionData(request=request)
+    col._manager.collide(candidate, cdata, fcl.defaultCollisionCallback)
+
+    contacts = cdata.result.contacts
+    if len(contacts) == 0:
+        return True
+    return max(c.penetration_depth for c in contacts) <= max_depth
+
+
 @gin.configurable
 def check_post_move_validity(
     state: State, name: str, disable_collision_checking=False, visualize=False
@@ -100,11 +165,7 @@ def check_post_move_validity(
     scene = state.trimesh_scene
     objstate = state.objs[name]
 
-    collision_objs = [
-        os.obj.name
-        for k, os in state.objs.items()
-        if k != name and t.Semantics.NoCollision not in os.tags
-    ]
+    collision_objs = collision_candidates(state, name)
 
     if len(collision_objs) == 0:
         return True
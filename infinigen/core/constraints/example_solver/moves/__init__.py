@@ -1,6 +1,6 @@
 from .addition import Addition, Resample
 from .deletion import Deletion
 from .moves import Move
-from .pose import ReinitPoseMove, RotateMove, TranslateMove
+from .pose import ReinitPoseMove, RotateMove, TranslateMove, prescreen_pose_moves
 from .reassignment import RelationPlaneChange, RelationTargetChange
 from .swap import Swap
@@ -91,7 +91,10 @@ class Addition(moves.Move):
 
         self._new_obj, gen = sample_rand_placeholder(self.gen_class)
 
-        parse_scene.add_to_scene(state.trimesh_scene, self._new_obj, preprocess=True)
+        # already preprocessed by sample_rand_placeholder
+        parse_scene.add_objects_to_scene(
+            state.trimesh_scene, [self._new_obj], preprocess=False
+        )
 
         tags = self.temp_force_tags.union(usage_lookup.usages_of_factory(gen.__class__))
 
@@ -146,7 +149,9 @@ class Resample(moves.Move):
             os.obj.bound_box[self.align_corner]
             raise NotImplementedError(f"{self.align_corner=}")
 
-        parse_scene.add_to_scene(state.trimesh_scene, os.obj, preprocess=True)
+        parse_scene.add_objects_to_scene(
+            state.trimesh_scene, [os.obj], preprocess=False
+        )
         dof.apply_relations_surfacesample(state, target_name)
 
         return validity.check_post_move_validity(state, target_name)
@@ -159,7 +164,9 @@ class Resample(moves.Move):
 
         os.obj = self._backup_obj
         os.generator = self._backup_gen
-        parse_scene.add_to_scene(state.trimesh_scene, os.obj, preprocess=False)
+        parse_scene.add_objects_to_scene(
+            state.trimesh_scene, [os.obj], preprocess=False
+        )
         restore_pose_backup(state, target_name, self._backup_poseinfo)
 
     def accept(self, state: State):
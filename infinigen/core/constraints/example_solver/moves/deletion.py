@@ -40,6 +40,7 @@ class Deletion(Move):
     def revert(self, state):
         (target_name,) = self.names
         state.objs[target_name] = self._backup_state
-        parse_scene.add_to_scene(
-            state.trimesh_scene, self._backup_state.obj, preprocess=True
+        # the object was preprocessed when it was first added to the state
+        parse_scene.add_objects_to_scene(
+            state.trimesh_scene, [self._backup_state.obj], preprocess=False
         )
@@ -8,6 +8,7 @@ import logging
 from dataclasses import dataclass
 
 import numpy as np
+import trimesh
 
 from infinigen.core.constraints.constraint_language import util as iu
 from infinigen.core.constraints.example_solver.geometry import dof, validity
@@ -48,6 +49,11 @@ class TranslateMove(moves.Move):
         (target_name,) = self.names
         restore_pose_backup(state, target_name, self._backup_pose)
 
+    def proposed_transform(self, T: np.ndarray) -> np.ndarray:
+        res = T.copy()
+        res[:3, 3] += self.translation
+        return res
+
 
 @dataclass
 class RotateMove(moves.Move):
@@ -76,6 +82,39 @@ class RotateMove(moves.Move):
         (target_name,) = self.names
         restore_pose_backup(state, target_name, self._backup_pose)
 
+    def proposed_transform(self, T: np.ndarray) -> np.ndarray:
+        # matches iu.rotate, which rotates about the object's origin
+        R = trimesh.transformations.rotation_matrix(self.angle, self.axis)
+        res = T.copy()
+        res[:3, :3] = R[:3, :3] @ T[:3, :3]
+        return res
+
+
+def prescreen_pose_moves(state: State, candidates: list[moves.Move]) -> list[bool]:
+    """
+    Cheaply reject TranslateMove/RotateMove candidates which would collide, without applying them in blender.
+
+    All candidates are checked against the same read-only snapshot of the trimesh/fcl scene.
+    Returns one bool per candidate. False means apply() would fail its collision check, non-pose moves are always True.
+    """
+
+    if validity.collision_checking_disabled():
+        return [True] * len(candidates)
+
+    res = []
+    for move in candidates:
+        if not isinstance(move, (TranslateMove, RotateMove)):
+            res.append(True)
+            continue
+
+        (target_name,) = move.names
+        os = state.objs[target_name]
+        mesh = iu.meshes_from_names(state.trimesh_scene, os.obj.name)[0]
+        T = move.proposed_transform(np.array(mesh.current_transform))
+        res.append(validity.transform_collision_free(state, target_name, T))
+
+    return res
+
 
 @dataclass
 class ReinitPoseMove(moves.Move):
@@ -115,6 +115,7 @@ def populate_state_placeholders(state: State, filter=None, final=True):
         return
 
     # objects modified in any way (via pholder update or boolean cut) must be synched with trimesh state
+    populated_objs = {}  # objkey -> obj, an object may be both populated and cut
     for objkey, old_objname in tqdm(
         set(update_state_mesh_objs), desc="Updating trimesh with populated objects"
     ):
@@ -123,8 +124,12 @@ def populate_state_placeholders(state: State, filter=None, final=True):
         # delete old trimesh
         delete_obj(state.trimesh_scene, old_objname, delete_blender=False)
 
-        # put the new, populated object into the state
         parse_scene.preprocess_obj(os.obj)
         if not final:
             tagging.tag_canonical_surfaces(os.obj)
-        parse_scene.add_to_scene(state.trimesh_scene, os.obj, preprocess=True)
+        populated_objs[objkey] = os.obj
+
+    # put the new, populated objects into the state, with one view layer update for all of them
+    parse_scene.add_objects_to_scene(
+        state.trimesh_scene, list(populated_objs.values()), preprocess=False
+    )
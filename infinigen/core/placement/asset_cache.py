@@ -0,0 +1,162 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+
+import bpy
+import gin
+import numpy as np
+
+import infinigen
+
+logger = logging.getLogger(__name__)
+
+
+def _file_hash(path):
+    try:
+        return hashlib.md5(Path(path).read_bytes()).hexdigest()
+    except (OSError, TypeError):
+        return None
+
+
+@gin.configurable
+class AssetCache:
+    """
+    On-disk cache of the object trees produced by AssetFactory.spawn_asset, one .blend per
+    (factory class, factory_seed, i, distance bucket, kwargs, code version, gin config) key.
+
+    Disabled unless folder is set. factories optionally restricts caching to the named
+    factory classes, since factories whose assets depend on their placeholder's location or
+    on other objects in the scene cannot be cached. While enabled, spawn_asset distances are
+    rounded down to distance_buckets_per_octave log-spaced buckets, so that an asset is
+    identical whether it was generated or loaded from the cache.
+    """
+
+    _inst = None
+
+    @classmethod
+    def instance(cls):
+        if cls._inst is None:
+            cls._inst = cls()
+        return cls._inst
+
+    def __init__(
+        self,
+        folder=None,
+        factories=None,
+        distance_buckets_per_octave=4,
+        max_size_gb=20,
+    ):
+        self.folder = Path(folder) if folder is not None else None
+        self.factories = set(factories) if factories is not None else None
+        self.distance_buckets_per_octave = distance_buckets_per_octave
+        self.max_size = max_size_gb * 1e9
+        self.hits = self.misses = 0
+        self._code_hashes = {}
+
+    @property
+    def enabled(self):
+        return self.folder is not None
+
+    def applies_to(self, factory):
+        if not self.enabled:
+            return False
+        return self.factories is None or factory.__class__.__name__ in self.factories
+
+    def quantize_distance(self, distance):
+        if distance is None or distance <= 0:
+            return distance
+        k = self.distance_buckets_per_octave
+        return float(2 ** (np.floor(np.log2(distance) * k) / k))
+
+    def _code_hash(self, factory_cls):
+        if factory_cls not in self._code_hashes:
+            files = [inspect.getsourcefile(c) for c in factory_cls.__mro__[:-1]]
+            self._code_hashes[factory_cls] = [_file_hash(f) for f in files]
+        return self._code_hashes[factory_cls]
+
+    def key(self, factory, i, distance, vis_distance, kwargs):
+        desc = [
+            infinigen.__version__,
+            factory.__class__.__module__,
+            factory.__class__.__qualname__,
+            self._code_hash(factory.__class__),
+            factory.factory_seed,
+            i,
+            distance,
+            vis_distance,
+            sorted((k, repr(v)) for k, v in kwargs.items()),
+            gin.config_str(),
+        ]
+        return hashlib.blake2b(repr(desc).encode(), digest_size=20).hexdigest()
+
+    def _paths(self, factory, key):
+        folder = self.folder / factory.__class__.__name__
+        return folder / f"{key}.blend", folder / f"{key}.json"
+
+    def load(self, factory, key):
+        blend_path, meta_path = self._paths(factory, key)
+        if not meta_path.exists():
+            self.misses += 1
+            return None
+
+        meta = json.loads(meta_path.read_text())
+        with bpy.data.libraries.load(str(blend_path), link=False) as (_, data_to):
+            data_to.objects = list(meta["objects"])
+
+        collection = bpy.context.collection
+        for obj in data_to.objects:
+            collection.objects.link(obj)
+        root = data_to.objects[meta["objects"].index(meta["root"])]
+
+        # mark as recently used for eviction
+        os.utime(meta_path)
+        self.hits += 1
+        logger.debug(f"{self.__class__.__name__} hit {key} for {factory}")
+        return root
+
+    def save(self, factory, key, obj):
+        objs = [obj, *obj.children_recursive]
+        blend_path, meta_path = self._paths(factory, key)
+        blend_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # write under private names and rename, the .json last, so readers never see a partial entry
+        tmp = uuid.uuid4().hex
+        tmp_blend = blend_path.with_name(f".{tmp}.blend")
+        tmp_meta = meta_path.with_name(f".{tmp}.json")
+        bpy.data.libraries.write(str(tmp_blend), set(objs))
+        tmp_meta.write_text(
+            json.dumps({"root": obj.name, "objects": [o.name for o in objs]})
+        )
+        os.replace(tmp_blend, blend_path)
+        os.replace(tmp_meta, meta_path)
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for meta_path in self.folder.glob("*/*.json"):
+            blend_path = meta_path.with_suffix(".blend")
+            try:
+                size = blend_path.stat().st_size + meta_path.stat().st_size
+                entries.append((meta_path.stat().st_mtime, size, meta_path, blend_path))
+            except FileNotFoundError:
+                continue  # evicted by another process
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, meta_path, blend_path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_size:
+                break
+            logger.debug(f"{self.__class__.__name__} evicting {meta_path.stem}")
+            meta_path.unlink(missing_ok=True)
+            blend_path.unlink(missing_ok=True)
+            total -= size
+
+    def stats(self):
+        return dict(hits=self.hits, misses=self.misses)
@@ -8,6 +8,7 @@
 
 
 import logging
+import multiprocessing as mp
 import typing
 from copy import deepcopy
 from dataclasses import dataclass
@@ -19,7 +20,7 @@ import bpy
 import gin
 import imageio
 import numpy as np
-from mathutils import Vector
+from mathutils import Euler, Matrix, Vector
 from mathutils.bvhtree import BVHTree
 from numpy.random import uniform as U
 from tqdm import tqdm
@@ -32,8 +33,10 @@ from infinigen.core.util import blender as butil
 from infinigen.core.util import camera
 from infinigen.core.util.blender import SelectObjects, delete
 from infinigen.core.util.logging import Timer
+from infinigen.core.util.math import FixedSeed, int_hash
 from infinigen.core.util.organization import SelectionCriterions
 from infinigen.core.util.random import random_general
+from infinigen.core.util.raycast import BatchRaycaster
 from infinigen.terrain.core import Terrain
 from infinigen.tools.suffixes import get_suffix
 
@@ -43,7 +46,7 @@ logger = logging.getLogger(__name__)
 
 
 @gin.configurable
-def get_sensor_coords(cam, H, W, sparse=False):
+def get_sensor_coords(cam, H, W, sparse=False, as_array=False):
     camd = cam.data
     f_in_m = camd.lens / 1000
     scene = bpy.context.scene
@@ -85,7 +88,6 @@ def get_sensor_coords(cam, H, W, sparse=False):
     coords_z = np.full(coords_x.shape, -f_in_m)
     relative_cam_coords = np.stack((coords_x, coords_y, coords_z), axis=-1)
 
-    cam_coords_vectors = np.empty((H, W), dtype=Vector)
     pixel_locs = np.stack((np.meshgrid(np.arange(W), np.arange(H))), axis=-1).reshape(
         (W * H, 2)
     )  # np.array(list(product(range(H), range(W))))
@@ -93,6 +95,14 @@ def get_sensor_coords(cam, H, W, sparse=False):
         ii = np.random.choice(H * W, size=1000)
         pixel_locs = pixel_locs[ii]
 
+    if as_array:
+        # (len(pixel_locs), 3) world space coords, one row per entry of pixel_locs
+        matrix_world = np.array(cam.matrix_world)
+        rel = relative_cam_coords[pixel_locs[:, 1], pixel_locs[:, 0]]
+        return rel @ matrix_world[:3, :3].T + matrix_world[:3, 3], pixel_locs
+
+    cam_coords_vectors = np.empty((H, W), dtype=Vector)
+
     for x, y in tqdm(pixel_locs, desc="Building Camera Vectors", disable=True):
         pixelVector = Vector(relative_cam_coords[y, x])
         cam_coords_vectors[y, x] = cam.matrix_world @ pixelVector
@@ -197,24 +207,38 @@ def terrain_camera_query(
     vertexwise_min_dist,
     min_dist=0,
 ):
-    dists = []
-    sensor_coords, pix_it = get_sensor_coords(cam, sparse=True)
-    terrain_tags_queries_counts = {q: 0 for q in terrain_tags_queries}
-
-    for x, y in pix_it:
-        direction = (sensor_coords[y, x] - cam.matrix_world.translation).normalized()
-        _, _, index, dist = scene_bvh.ray_cast(cam.matrix_world.translation, direction)
-        if dist is None:
-            continue
-        dists.append(dist)
-        if dist < min_dist or (
+    if isinstance(cam, CameraPose):
+        sensor_coords, pix_it = cam.sensor_coords(sparse=True)
+    else:
+        sensor_coords, pix_it = get_sensor_coords(cam, sparse=True, as_array=True)
+    origin = np.array(cam.matrix_world.translation)
+    directions = sensor_coords - origin
+    directions /= np.linalg.norm(directions, axis=-1, keepdims=True)
+
+    def too_close_to_camera(dist, index):
+        return dist < min_dist or (
             vertexwise_min_dist is not None and dist < vertexwise_min_dist[index]
-        ):
-            logger.debug(f"Found {dist=} < {min_dist=}")
-            dists = None  # means dist < min
-            break
-        for q in terrain_tags_queries:
-            terrain_tags_queries_counts[q] += terrain_tags_queries[q][index]
+        )
+
+    dists, index = BatchRaycaster.wrap(scene_bvh).ray_cast_batch(
+        origin, directions, stop_if=too_close_to_camera
+    )
+    hit = index >= 0
+    dists, index = dists[hit], index[hit]
+
+    too_close = dists < min_dist
+    if vertexwise_min_dist is not None:
+        too_close |= dists < vertexwise_min_dist[index]
+    if too_close.any():
+        logger.debug(f"Found {dists[too_close].min()=} < {min_dist=}")
+        dists = None  # means dist < min
+        index = index[: np.argmax(too_close)]
+    else:
+        dists = dists.tolist()
+
+    terrain_tags_queries_counts = {
+        q: terrain_tags_queries[q][index].sum() for q in terrain_tags_queries
+    }
 
     n_pix = pix_it.shape[0]
 
@@ -236,6 +260,72 @@ class CameraProposal:
                 cam.data.lens = self.focal_length
 
 
+@dataclass
+class CameraPose:
+    """
+    A posed camera as plain data, which keep_cam_pose_proposal can score without moving
+    (or even having access to) the blender camera object.
+    """
+
+    name: str
+    matrix_world: Matrix
+    relative_coords: np.array  # (H * W, 3) camera space sensor points, row major
+    lens: float = None
+    type: str = "CAMERA"
+
+    def sensor_coords(self, sparse=False):
+        # same pixels and random draws as get_sensor_coords(cam, sparse, as_array=True)
+        pixel_index = np.arange(len(self.relative_coords))
+        if sparse:
+            pixel_index = np.random.choice(len(self.relative_coords), size=1000)
+
+        rel = self.relative_coords[pixel_index]
+        if self.lens is not None:
+            rel[:, 2] = -self.lens / 1000
+
+        matrix_world = np.array(self.matrix_world)
+        return rel @ matrix_world[:3, :3].T + matrix_world[:3, 3], pixel_index
+
+
+class CameraRigSnapshot:
+    """
+    Everything needed to pose a camera rig's cameras for a CameraProposal, read once from
+    blender so that proposals can be scored in worker processes.
+    """
+
+    def __init__(self, camera_rig: bpy.types.Object):
+        if camera_rig.parent is not None:
+            raise ValueError(f"{camera_rig.name=} has {camera_rig.parent=}")
+
+        bpy.context.view_layer.update()
+        self.rotation_mode = camera_rig.rotation_mode
+        self.scale = camera_rig.scale.copy()
+
+        self.cameras = []
+        for cam in camera_rig.children:
+            if not cam.type == "CAMERA":
+                raise ValueError(f"{cam.name=} had {cam.type=}")
+            world_coords, _ = get_sensor_coords(cam, as_array=True)
+            world_inv = np.array(cam.matrix_world.inverted())
+            relative_coords = world_coords @ world_inv[:3, :3].T + world_inv[:3, 3]
+            local_matrix = cam.matrix_parent_inverse @ cam.matrix_basis
+            self.cameras.append((cam.name, local_matrix, relative_coords))
+
+        # compute_base_views measures focus distance from the last camera's location
+        self.focus_location = camera_rig.children[-1].location.copy()
+
+    def poses(self, props: "CameraProposal") -> list[CameraPose]:
+        rig_matrix = Matrix.LocRotScale(
+            Vector(props.loc), Euler(props.rot, self.rotation_mode), self.scale
+        )
+        return [
+            CameraPose(
+                name, rig_matrix @ local_matrix, relative_coords, props.focal_length
+            )
+            for name, local_matrix, relative_coords in self.cameras
+        ]
+
+
 @gin.configurable
 def camera_pose_proposal(
     scene_bvh,
@@ -337,7 +427,8 @@ def keep_cam_pose_proposal(
     if not cam.type == "CAMERA":
         raise ValueError(f"{cam.name=} had {cam.type=}")
 
-    bpy.context.view_layer.update()
+    if not isinstance(cam, CameraPose):
+        bpy.context.view_layer.update()
 
     # Reject cameras too close to any placeholder vertex
     v, i, dist_to_placeholder = placeholders_kd.find(cam.matrix_world.translation)
@@ -428,6 +519,141 @@ class AnimPolicyGoToProposals:
         return Vector(res.loc), Vector(res.rot), time, "BEZIER"
 
 
+# state for search_viewpoints_parallel, set before forking so workers inherit it.
+# The terrain is not part of it: its kernels use OpenMP, which is not safe to use in a forked
+# child once the parent has used it, so the terrain sdf test runs in the parent instead.
+_viewpoint_search = None
+
+
+def _score_viewpoint(it):
+    search = _viewpoint_search
+    with FixedSeed(int_hash((search["seed"], it))):
+        if search["center_coordinate"]:
+            props = camera_pose_proposal(
+                scene_bvh=search["scene_bvh"],
+                location_sample=search["location_sample"],
+                center_coordinate=search["center_coordinate"],
+                radius=random_general(search["radius"]),
+                bbox=search["bbox"],
+            )
+        else:
+            props = camera_pose_proposal(
+                scene_bvh=search["scene_bvh"],
+                location_sample=search["location_sample"],
+            )
+
+        if props is None:
+            logger.debug(f"{camera_pose_proposal.__name__} returned {props=} for {it=}")
+            return None
+
+        poses = search["snapshot"].poses(props)
+        all_scores = [
+            keep_cam_pose_proposal(
+                pose,
+                None,
+                search["scene_bvh"],
+                search["placeholders_kd"],
+                **search["kwargs"],
+            )
+            for pose in poses
+        ]
+
+    props = CameraProposal(np.array(props.loc), np.array(props.rot), props.focal_length)
+    if any(score is None for score in all_scores):
+        return props, None, None, None
+    cam_locations = np.array([pose.matrix_world.translation for pose in poses])
+
+    # Compute focus distance, measured the same way as compute_base_views
+    focus_location = search["snapshot"].focus_location
+    destination = poses[-1].matrix_world @ Vector((0.0, 0.0, -1.0))
+    forward_dir = (destination - focus_location).normalized()
+    *_, straight_ahead_dist = search["scene_bvh"].ray_cast(focus_location, forward_dir)
+
+    return props, np.mean(all_scores), straight_ahead_dist, cam_locations
+
+
+def search_viewpoints_parallel(
+    camera_rig: bpy.types.Object,
+    n_min_candidates: int,
+    terrain,
+    scene_bvh: BVHTree,
+    location_sample: typing.Callable,
+    center_coordinate=None,
+    radius=None,
+    bbox=None,
+    placeholders_kd=None,
+    max_tries=30000,
+    visualize=False,
+    n_workers=1,
+    chunksize=8,
+    **kwargs,
+):
+    global _viewpoint_search
+
+    _viewpoint_search = dict(
+        seed=np.random.randint(2**31),
+        snapshot=CameraRigSnapshot(camera_rig),
+        scene_bvh=scene_bvh,
+        location_sample=location_sample,
+        center_coordinate=center_coordinate,
+        radius=radius,
+        bbox=bbox,
+        placeholders_kd=placeholders_kd,
+        kwargs=kwargs,
+    )
+
+    potential_views = []
+    tries = range(1, max_tries)
+    pool = None
+    try:
+        if n_workers > 1:
+            pool = mp.get_context("fork").Pool(n_workers)
+            results = pool.imap(_score_viewpoint, tries, chunksize=chunksize)
+        else:
+            results = map(_score_viewpoint, tries)
+
+        with tqdm(
+            total=n_min_candidates, desc="Searching for camera viewpoints"
+        ) as pbar:
+            # consume results in proposal order, so the kept views match any n_workers
+            for it, result in zip(tries, results):
+                if result is None:
+                    continue
+                props, criterion, straight_ahead_dist, cam_locations = result
+
+                if criterion is not None and terrain is not None:
+                    terrain_sdf = terrain.compute_camera_space_sdf(cam_locations)
+                    if (terrain_sdf <= 0).any():
+                        logger.debug(
+                            f"{it=} rejects {terrain_sdf=} for {cam_locations=}"
+                        )
+                        criterion = None
+
+                if visualize:
+                    criterion_str = (
+                        f"{criterion:.2f}" if criterion is not None else "None"
+                    )
+                    marker = butil.spawn_empty(f"attempt_{it}_{criterion_str}")
+                    marker.location = props.loc
+                    marker.rotation_euler = props.rot
+
+                if criterion is None:
+                    logger.debug(f"{it=} {criterion=}")
+                    continue
+
+                potential_views.append((criterion, props, straight_ahead_dist))
+                pbar.update(1)
+
+                if len(potential_views) >= n_min_candidates:
+                    break
+    finally:
+        if pool is not None:
+            pool.terminate()
+        _viewpoint_search = None
+
+    return potential_views
+
+
 @gin.configurable
 def compute_base_views(
     camera_rig: bpy.types.Object,
@@ -442,70 +668,106 @@ def compute_base_views(
     min_candidates_ratio=20,
     max_tries=30000,
     visualize=False,
+    n_workers=None,
+    chunksize=8,
     **kwargs,
 ):
+    """
+    Search for n_views camera rig poses, keeping the best scoring of
+    min_candidates_ratio * n_views valid candidates.
+
+    n_workers=None applies each proposal to camera_rig and scores it in turn. Otherwise,
+    proposals are scored against a CameraRigSnapshot by n_workers forked processes, with
+    each proposal seeded by its index, so the result does not depend on n_workers. The
+    terrain sdf of the kept proposals is still evaluated in this process.
+    """
+
     potential_views = []
     n_min_candidates = int(min_candidates_ratio * n_views)
 
-    with tqdm(total=n_min_candidates, desc="Searching for camera viewpoints") as pbar:
-        for it in range(1, max_tries):
-            if center_coordinate:
-                props = camera_pose_proposal(
-                    scene_bvh=scene_bvh,
-                    location_sample=location_sample,
-                    center_coordinate=center_coordinate,
-                    radius=random_general(radius),
-                    bbox=bbox,
-                )
-            else:
-                props = camera_pose_proposal(
-                    scene_bvh=scene_bvh, location_sample=location_sample
-                )
+    if n_workers is not None:
+        potential_views = search_viewpoints_parallel(
+            camera_rig,
+            n_min_candidates,
+            terrain,
+            scene_bvh,
+            location_sample,
+            center_coordinate=center_coordinate,
+            radius=radius,
+            bbox=bbox,
+            placeholders_kd=placeholders_kd,
+            max_tries=max_tries,
+            visualize=visualize,
+            n_workers=n_workers,
+            chunksize=chunksize,
+            **kwargs,
+        )
+    else:
+        with tqdm(
+            total=n_min_candidates, desc="Searching for camera viewpoints"
+        ) as pbar:
+            for it in range(1, max_tries):
+                if center_coordinate:
+                    props = camera_pose_proposal(
+                        scene_bvh=scene_bvh,
+                        location_sample=location_sample,
+                        center_coordinate=center_coordinate,
+                        radius=random_general(radius),
+                        bbox=bbox,
+                    )
+                else:
+                    props = camera_pose_proposal(
+                        scene_bvh=scene_bvh, location_sample=location_sample
+                    )
+
+                if props is None:
+                    logger.debug(
+                        f"{camera_pose_proposal.__name__} returned {props=} for {it=}"
+                    )
+                    continue
 
-            if props is None:
-                logger.debug(
-                    f"{camera_pose_proposal.__name__} returned {props=} for {it=}"
-                )
-                continue
+                props.apply(camera_rig)
+
+                all_scores = []
+                for cam in camera_rig.children:
+                    score = keep_cam_pose_proposal(
+                        cam,
+                        terrain,
+                        scene_bvh,
+                        placeholders_kd,
+                        **kwargs,
+                    )
+                    all_scores.append(score)
+
+                if any(score is None for score in all_scores):
+                    criterion = None
+                else:
+                    criterion = np.mean(all_scores)
+
+                if visualize:
+                    criterion_str = (
+                        f"{criterion:.2f}" if criterion is not None else "None"
+                    )
+                    marker = butil.spawn_empty(f"attempt_{it}_{criterion_str}")
+                    marker.location = camera_rig.location
+                    marker.rotation_euler = camera_rig.rotation_euler
+
+                if criterion is None:
+                    logger.debug(f"{it=} {criterion=}")
+                    continue
 
-            props.apply(camera_rig)
+                # Compute focus distance
+                destination = cam.matrix_world @ Vector((0.0, 0.0, -1.0))
+                forward_dir = (destination - cam.location).normalized()
+                *_, straight_ahead_dist = scene_bvh.ray_cast(cam.location, forward_dir)
 
-            all_scores = []
-            for cam in camera_rig.children:
-                score = keep_cam_pose_proposal(
-                    cam,
-                    terrain,
-                    scene_bvh,
-                    placeholders_kd,
-                    **kwargs,
+                potential_views.append(
+                    (criterion, deepcopy(props), straight_ahead_dist)
                 )
-                all_scores.append(score)
-
-            if any(score is None for score in all_scores):
-                criterion = None
-            else:
-                criterion = np.mean(all_scores)
+                pbar.update(1)
 
-            if visualize:
-                criterion_str = f"{criterion:.2f}" if criterion is not None else "None"
-                marker = butil.spawn_empty(f"attempt_{it}_{criterion_str}")
-                marker.location = camera_rig.location
-                marker.rotation_euler = camera_rig.rotation_euler
-
-            if criterion is None:
-                logger.debug(f"{it=} {criterion=}")
-                continue
-
-            # Compute focus distance
-            destination = cam.matrix_world @ Vector((0.0, 0.0, -1.0))
-            forward_dir = (destination - cam.location).normalized()
-            *_, straight_ahead_dist = scene_bvh.ray_cast(cam.location, forward_dir)
-
-            potential_views.append((criterion, deepcopy(props), straight_ahead_dist))
-            pbar.update(1)
-
-            if len(potential_views) >= n_min_candidates:
-                break
+                if len(potential_views) >= n_min_candidates:
+                    break
 
     if len(potential_views) < n_views:
         if visualize:
@@ -542,6 +804,7 @@ def build_bvh_and_attrs(objs, tags_queries):
         bpy.ops.mesh.quads_convert_to_tris(quad_method="BEAUTY", ngon_method="BEAUTY")
     mesh = Mesh(obj=obj)
     delete(obj)
+    bvh = BatchRaycaster(bvh, mesh.vertices, mesh.faces)
 
     camera_selection_answers = {}
     for q0 in tags_queries:
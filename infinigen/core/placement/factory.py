@@ -19,6 +19,7 @@ from infinigen.core.util import blender as butil
 from infinigen.core.util.math import FixedSeed, int_hash
 
 from . import detail
+from .asset_cache import AssetCache
 
 logger = logging.getLogger(__name__)
 
@@ -135,18 +136,38 @@ class AssetFactory:
             bpy.data.materials,
         ]
 
+        cache = AssetCache.instance()
+        cache_key = None
+        if cache.applies_to(self) and not kwargs.get("export", False):
+            distance = cache.quantize_distance(distance)
+            vis_distance = cache.quantize_distance(vis_distance)
+            cache_key = cache.key(self, i, distance, vis_distance, kwargs)
+
         export_path = None
         with (
             FixedSeed(int_hash((self.factory_seed, i))),
             butil.GarbageCollect(gc_targets, verbose=False),
         ):
-            params = self.asset_parameters(distance, vis_distance)
-            params.update(kwargs)
-            obj = self.create_asset(i=i, placeholder=placeholder, **params)
-            # TODO: clean this up
-            if "export" in params and params["export"]:
-                obj, export_path, semantic_mapping = obj
-                assert export_path
+            obj = None
+            if cache_key is not None:
+                obj = cache.load(self, cache_key)
+
+            if obj is None:
+                params = self.asset_parameters(distance, vis_distance)
+                params.update(kwargs)
+                obj = self.create_asset(i=i, placeholder=placeholder, **params)
+                # TODO: clean this up
+                if "export" in params and params["export"]:
+                    obj, export_path, semantic_mapping = obj
+                    assert export_path
+
+                # assets built onto their placeholder cannot be reproduced without it
+                if (
+                    cache_key is not None
+                    and obj is not placeholder
+                    and obj.parent is None
+                ):
+                    cache.save(self, cache_key, obj)
 
         obj.name = f"{repr(self)}.spawn_asset({i})"
 
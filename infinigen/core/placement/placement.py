@@ -155,25 +155,26 @@ def filter_populate_targets(
     vis_cull: float,
     verbose: bool,
 ) -> list[tuple[bpy.types.Object, float, float]]:
-    if verbose:
-        placeholders = tqdm(placeholders)
-
-    results = []
-
-    for i, p in enumerate(placeholders):
+    for p in placeholders:
         classname, *_ = parse_asset_name(p.name)
-
         if classname is None:
             raise ValueError(f"Could not parse {p.name=}, got {classname=}")
 
-        mask, min_dists, min_vis_dists = split_in_view.compute_inview_distances(
-            get_placeholder_points(p),
-            cameras,
-            dist_max=dist_cull,
-            vis_margin=vis_cull,
-            verbose=False,
-        )
+    point_sets = [
+        get_placeholder_points(p)
+        for p in (tqdm(placeholders) if verbose else placeholders)
+    ]
+
+    inview = split_in_view.compute_inview_distances_batch(
+        point_sets,
+        cameras,
+        dist_max=dist_cull,
+        vis_margin=vis_cull,
+        verbose=verbose,
+    )
 
+    results = []
+    for p, (mask, min_dists, min_vis_dists) in zip(placeholders, inview):
         dist = min_dists.min()
         vis_dist = min_vis_dists.min()
 
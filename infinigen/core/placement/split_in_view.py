@@ -10,13 +10,14 @@ import bpy
 import numpy as np
 from mathutils import Matrix
 from mathutils.bvhtree import BVHTree
-from tqdm import trange
+from tqdm import tqdm, trange
 
 from infinigen.core.placement.camera import get_sensor_coords
 from infinigen.core.util import blender as butil
 from infinigen.core.util import camera as cam_util
 from infinigen.core.util.logging import Suppress
 from infinigen.core.util.math import dehomogenize, homogenize
+from infinigen.core.util.raycast import BatchRaycaster
 
 logger = logging.getLogger(__name__)
 
@@ -30,31 +31,45 @@ def raycast_visiblity_mask(
 ):
     bvh = BVHTree.FromObject(obj, bpy.context.evaluated_depsgraph_get())
 
+    # triangles for the batched backend, mapped back to the polygons BVHTree reports
+    mesh = obj.data
+    mesh.calc_loop_triangles()
+    tris = np.zeros((len(mesh.loop_triangles), 3), dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tris.reshape(-1))
+    tri_polys = np.zeros(len(mesh.loop_triangles), dtype=np.int64)
+    mesh.loop_triangles.foreach_get("polygon_index", tri_polys)
+    verts = np.zeros((len(mesh.vertices), 3))
+    mesh.vertices.foreach_get("co", verts.reshape(-1))
+    raycaster = BatchRaycaster(bvh, verts, tris, face_index=tri_polys)
+
     if start is None:
         start = bpy.context.scene.frame_start
     if end is None:
         end = bpy.context.scene.frame_end
 
-    mask = np.zeros(len(obj.data.vertices), dtype=bool)
+    poly_hit = np.zeros(len(mesh.polygons), dtype=bool)
     rangeiter = trange if verbose else range
     for i in rangeiter(start, end + 1):
         bpy.context.scene.frame_set(i)
-        invworld = obj.matrix_world.inverted()
+        invworld = np.array(obj.matrix_world.inverted())
         for cam in cameras:
-            sensor_coords, pix_it = get_sensor_coords(cam)
-            for x, y in pix_it:
-                direction = (
-                    sensor_coords[y, x] - cam.matrix_world.translation
-                ).normalized()
-                origin = cam.matrix_world.translation
-                _, _, index, dist = bvh.ray_cast(
-                    invworld @ origin, invworld.to_3x3() @ direction
-                )
-                if dist is None:
-                    continue
-                for vi in obj.data.polygons[index].vertices:
-                    mask[vi] = True
-
+            sensor_coords, _ = get_sensor_coords(cam, as_array=True)
+            origin = np.array(cam.matrix_world.translation)
+            directions = sensor_coords - origin
+            directions /= np.linalg.norm(directions, axis=-1, keepdims=True)
+            _, index = raycaster.ray_cast_batch(
+                invworld[:3, :3] @ origin + invworld[:3, 3],
+                directions @ invworld[:3, :3].T,
+            )
+            poly_hit[index[index >= 0]] = True
+
+    loop_totals = np.zeros(len(mesh.polygons), dtype=np.int64)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    loop_verts = np.zeros(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+
+    mask = np.zeros(len(mesh.vertices), dtype=bool)
+    mask[loop_verts[np.repeat(poly_hit, loop_totals)]] = True
     return mask
 
 
@@ -170,6 +185,131 @@ def compute_inview_distances(
     return mask, min_dists, min_vis_dists
 
 
+def camera_trajectory(
+    cameras: list[bpy.types.Object],
+    frame_start=None,
+    frame_end=None,
+):
+    """
+    Tabulate the projection of every camera at every frame, visiting each frame only once.
+
+    Returns a dict of arrays stacked over (frame, camera) views:
+    - projmat: (V, 3, 4) world to homogeneous pixel coordinates
+    - K_inv: (V, 3, 3) inverse calibration matrices
+    - RT_inv: (V, 4, 4) camera to world matrices
+    - res: (2,) the camera resolution in pixels
+    """
+
+    if frame_start is None:
+        frame_start = bpy.context.scene.frame_start
+    if frame_end is None:
+        frame_end = bpy.context.scene.frame_end
+
+    assert frame_start < frame_end + 1, (frame_start, frame_end)
+
+    projmats, K_invs, RT_invs = [], [], []
+    for frame in range(frame_start, frame_end + 1):
+        bpy.context.scene.frame_set(frame)
+        for cam in cameras:
+            projmat, K, RT = map(np.array, cam_util.get_3x4_P_matrix_from_blender(cam))
+            projmats.append(projmat)
+            K_invs.append(np.linalg.inv(K))
+            RT_invs.append(np.array(Matrix(RT).to_4x4().inverted()))
+
+    return dict(
+        projmat=np.stack(projmats),
+        K_inv=np.stack(K_invs),
+        RT_inv=np.stack(RT_invs),
+        res=butil.get_camera_res(),
+    )
+
+
+def _trajectory_inview_distances(points, trajectory, dist_max, vis_margin):
+    # same computation as compute_vis_dists, vectorized over all views at once
+    proj = np.einsum("vij,nj->vni", trajectory["projmat"], points)
+    uv, d = dehomogenize(proj), proj[..., -1]
+
+    clamped_uv = np.clip(uv, [0, 0], trajectory["res"])
+    clamped_d = np.maximum(d, 0)
+
+    cam_pos = np.einsum(
+        "vij,vnj->vni",
+        trajectory["K_inv"],
+        homogenize(clamped_uv) * clamped_d[..., None],
+    )
+    clipped_pos = np.einsum("vij,vnj->vni", trajectory["RT_inv"], homogenize(cam_pos))
+    vis_dists = np.linalg.norm(points[:, :-1] - clipped_pos[..., :-1], axis=-1)
+
+    view_mask = np.ones(d.shape, dtype=bool)
+    if dist_max is not None:
+        view_mask &= d < dist_max
+    if vis_margin is not None:
+        view_mask &= vis_dists < vis_margin
+
+    min_dists = np.min(np.where(view_mask, d, np.inf), axis=0, initial=1e7)
+    min_vis_dists = np.min(np.where(view_mask, vis_dists, np.inf), axis=0, initial=1e7)
+    return view_mask.any(axis=0), min_dists, min_vis_dists
+
+
+def compute_inview_distances_batch(
+    point_sets: list[np.array],
+    cameras: list[bpy.types.Object],
+    dist_max,
+    vis_margin,
+    frame_start=None,
+    frame_end=None,
+    trajectory=None,
+    chunk_elements=2**22,
+    verbose=False,
+):
+    """
+    Equivalent to calling compute_inview_distances once per array in point_sets, but
+    evaluates every frame's cameras only once and culls all points in chunked numpy passes.
+
+    Parameters:
+    - point_sets: a list of arrays of 3D points, in world space
+    - trajectory: the output of camera_trajectory, computed here if not provided
+    - chunk_elements: bound on points * views processed per chunk, limits peak memory
+
+    Returns:
+    - a list of (mask, min_dists, min_vis_dists) per point set, as in compute_inview_distances
+    """
+
+    for points in point_sets:
+        assert len(points.shape) == 2 and points.shape[-1] == 3, points.shape
+    if len(point_sets) == 0:
+        return []
+
+    if trajectory is None:
+        trajectory = camera_trajectory(cameras, frame_start, frame_end)
+
+    points = homogenize(np.concatenate(point_sets, axis=0))
+    n_views = len(trajectory["projmat"])
+
+    mask = np.zeros(len(points), dtype=bool)
+    min_dists = np.full(len(points), 1e7)
+    min_vis_dists = np.full(len(points), 1e7)
+
+    chunk = max(1, chunk_elements // max(n_views, 1))
+    starts = range(0, len(points), chunk)
+    if verbose:
+        starts = tqdm(starts, desc=compute_inview_distances_batch.__name__)
+    for s in starts:
+        sl = slice(s, s + chunk)
+        mask[sl], min_dists[sl], min_vis_dists[sl] = _trajectory_inview_distances(
+            points[sl], trajectory, dist_max, vis_margin
+        )
+
+    splits = np.cumsum([len(p) for p in point_sets])[:-1]
+    return list(
+        zip(
+            np.split(mask, splits),
+            np.split(min_dists, splits),
+            np.split(min_vis_dists, splits),
+        )
+    )
+
+
 def split_inview(
     obj: bpy.types.Object,
     cameras: list[bpy.types.Object],
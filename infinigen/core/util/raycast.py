@@ -0,0 +1,182 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import logging
+
+import gin
+import numpy as np
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
+
+logger = logging.getLogger(__name__)
+
+
+def _trimesh_intersector(vertices, faces, backend):
+    import trimesh
+
+    mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+    if backend == "embree":
+        from trimesh.ray.ray_pyembree import RayMeshIntersector
+    elif backend == "triangle":
+        from trimesh.ray.ray_triangle import RayMeshIntersector
+    else:
+        raise ValueError(f"Unrecognized {backend=}")
+    return RayMeshIntersector(mesh)
+
+
+def _fan_triangulate(faces):
+    # (F, k) convex polygons to (F * (k - 2), 3) triangles and the face each came from
+    k = faces.shape[-1]
+    tris = np.stack(
+        [
+            np.repeat(faces[:, :1], k - 2, axis=1),
+            faces[:, 1:-1],
+            faces[:, 2:],
+        ],
+        axis=-1,
+    ).reshape(-1, 3)
+    return tris, np.repeat(np.arange(len(faces)), k - 2)
+
+
+def _default_backend():
+    try:
+        import trimesh.ray
+
+        if trimesh.ray.has_embree:
+            return "embree"
+    except ImportError:
+        pass
+    return "bvhtree"
+
+
+_warned_no_embree = False
+
+
+def _warn_no_embree():
+    global _warned_no_embree
+    if not _warned_no_embree:
+        logger.info(
+            "embree is not installed, casting ray batches one ray at a time with BVHTree. "
+            'Install it with `pip install -e ".[raycast]"` for faster camera placement'
+        )
+        _warned_no_embree = True
+
+
+@gin.configurable
+class BatchRaycaster:
+    """
+    A mathutils BVHTree which can also cast many rays at once from numpy arrays.
+
+    Single queries (ray_cast, find_nearest, overlap) are forwarded to the BVHTree, so a
+    BatchRaycaster can be passed anywhere a scene BVHTree is expected. ray_cast_batch uses
+    trimesh's embree intersector when it is installed (the optional `raycast` extra) and the
+    mesh arrays are known, and otherwise falls back to looping over BVHTree.ray_cast.
+
+    face_index optionally maps triangles of faces back to the face indices the BVHTree
+    reports, for meshes which were triangulated only for the batched backend.
+    """
+
+    def __init__(self, bvh, vertices=None, faces=None, face_index=None, backend=None):
+        self.bvh = bvh
+        self.face_index = face_index
+
+        if backend is None or backend == "auto":
+            backend = _default_backend()
+            if backend == "bvhtree" and vertices is not None:
+                _warn_no_embree()
+        if backend != "bvhtree" and (vertices is None or faces is None):
+            logger.debug(f"{self.__class__.__name__} has no mesh, using bvhtree")
+            backend = "bvhtree"
+        self.backend = backend
+
+        self._intersector = None
+        if backend != "bvhtree":
+            faces = np.asarray(faces)
+            if faces.shape[-1] > 3:
+                faces, fan_index = _fan_triangulate(faces)
+                self.face_index = (
+                    fan_index if face_index is None else face_index[fan_index]
+                )
+            self._intersector = _trimesh_intersector(vertices, faces, backend)
+
+    @classmethod
+    def wrap(cls, bvh):
+        if isinstance(bvh, cls):
+            return bvh
+        return cls(bvh)
+
+    @classmethod
+    def from_mesh(cls, vertices, faces, face_index=None, **kwargs):
+        vertices = np.asarray(vertices, dtype=np.float64)
+        faces = np.asarray(faces, dtype=np.int32)
+        bvh = BVHTree.FromPolygons(vertices.tolist(), faces.tolist())
+        return cls(bvh, vertices, faces, face_index=face_index, **kwargs)
+
+    def __getattr__(self, name):
+        if name == "bvh":
+            raise AttributeError(name)
+        return getattr(self.bvh, name)
+
+    def _ray_cast_bvhtree(self, origins, directions, distance, stop_if):
+        dists = np.full(len(origins), np.inf)
+        index = np.full(len(origins), -1, dtype=np.int64)
+        for i, (o, d) in enumerate(zip(origins.tolist(), directions.tolist())):
+            if distance is None:
+                _, _, idx, dist = self.bvh.ray_cast(Vector(o), Vector(d))
+            else:
+                _, _, idx, dist = self.bvh.ray_cast(Vector(o), Vector(d), distance)
+            if dist is not None:
+                dists[i], index[i] = dist, idx
+                if stop_if is not None and stop_if(dist, idx):
+                    break
+        return dists, index
+
+    def _ray_cast_trimesh(self, origins, directions, distance):
+        dists = np.full(len(origins), np.inf)
+        index = np.full(len(origins), -1, dtype=np.int64)
+        if len(origins) == 0:
+            return dists, index
+
+        # BVHTree reports distances along the given direction, so measure them the same way
+        norms = np.linalg.norm(directions, axis=-1)
+        unit = directions / norms[:, None]
+        index_tri, index_ray, locations = self._intersector.intersects_id(
+            origins, unit, multiple_hits=False, return_locations=True
+        )
+        hit_dists = np.linalg.norm(locations - origins[index_ray], axis=-1)
+        if distance is not None:
+            keep = hit_dists <= distance
+            index_tri, index_ray, hit_dists = (
+                index_tri[keep],
+                index_ray[keep],
+                hit_dists[keep],
+            )
+        dists[index_ray] = hit_dists
+        index[index_ray] = index_tri
+        if self.face_index is not None:
+            hit = index >= 0
+            index[hit] = self.face_index[index[hit]]
+        return dists, index
+
+    def ray_cast_batch(self, origins, directions, distance=None, stop_if=None):
+        """
+        Cast one ray per row of origins / directions, both (N, 3) or broadcastable to it.
+
+        stop_if(dist, index) optionally ends the query early at the first hit for which it
+        returns True; rays after that hit may then be reported as misses. Only the one ray at a
+        time bvhtree backend stops early, the batched backends cast every ray anyway.
+
+        Returns:
+        - dists: (N,) distance to the first hit along each ray, np.inf for misses
+        - index: (N,) face index of the first hit, -1 for misses
+        """
+        origins, directions = np.broadcast_arrays(
+            np.asarray(origins, dtype=np.float64),
+            np.asarray(directions, dtype=np.float64),
+        )
+        origins = np.ascontiguousarray(origins.reshape(-1, 3))
+        directions = np.ascontiguousarray(directions.reshape(-1, 3))
+
+        if self._intersector is None:
+            return self._ray_cast_bvhtree(origins, directions, distance, stop_if)
+        return self._ray_cast_trimesh(origins, directions, distance)
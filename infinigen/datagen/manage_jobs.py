@@ -54,8 +54,10 @@ from infinigen.datagen.states import (
     JobState,
     SceneState,
     cancel_job,
+    refresh_job_states,
 )
 from infinigen.datagen.util import upload_util
+from infinigen.datagen.util.scene_db import JOBSTATE_SUFFIX, SceneDB
 from infinigen.datagen.util.submitit_emulator import (
     ImmediateLocalExecutor,
     LocalScheduleHandler,
@@ -213,7 +215,53 @@ def local_submit_cmd(
     return executor.submit(cmd)
 
 
+SQLITE_DB_NAME = "scenes_db.sqlite"
+
+
+def init_db_from_sqlite(output_folder: Path):
+    db = SceneDB(output_folder / SQLITE_DB_NAME)
+    saved = db.load()
+    succeeded = defaultdict(list)
+    for seed, taskname in db.tasks_in_state(JobState.Succeeded):
+        succeeded[seed].append(taskname)
+    db.close()
+
+    def init_scene(saved_scene):
+        # never launched, equivalent to having no seed folder below
+        if not any(k.endswith("_submitted") for k in saved_scene):
+            return None
+
+        seed = saved_scene["seed"]
+        scene_dict = {"seed": seed, "all_done": SceneState.NotDone}
+        if "configs" in saved_scene:
+            scene_dict["configs"] = list(saved_scene["configs"])
+
+        tasknames = set(succeeded[seed])
+
+        # tasks may have finished after the last save, only unfinished scenes need their logs checked
+        if saved_scene.get("all_done") == SceneState.NotDone:
+            logs = output_folder / seed / "logs"
+            if not logs.exists():
+                logger.warning(f"Skipping {seed=} due to missing {logs}")
+                return None
+            finish_key = "FINISH_"
+            tasknames.update(
+                f.name[len(finish_key) :] for f in logs.glob(finish_key + "*")
+            )
+
+        for taskname in tasknames:
+            scene_dict[f"{taskname}_submitted"] = True
+            scene_dict[f"{taskname}_job_obj"] = JOB_OBJ_SUCCEEDED
+
+        return scene_dict
+
+    return [init_scene(s) for s in saved]
+
+
 def init_db_from_existing(output_folder: Path):
+    if (output_folder / SQLITE_DB_NAME).exists():
+        return init_db_from_sqlite(output_folder)
+
     # TODO in future: directly use existing_db (with some cleanup / checking).
 
     db_path = output_folder / "scenes_db.csv"
@@ -511,6 +559,9 @@ def write_html_summary(all_scenes, output_folder, max_size=5000):
 def monitor_existing_jobs(all_scenes, aggressive_cancel_on_crash=False):
     state_counts = defaultdict(int)
 
+    # one bulk sacct query for every slurm job, instead of one seff per job below
+    refresh_job_states(all_scenes)
+
     for scene in all_scenes:
         seed = scene["seed"]
         scene["num_running"], scene["num_done"] = 0, 0
@@ -522,6 +573,7 @@ def monitor_existing_jobs(all_scenes, aggressive_cancel_on_crash=False):
             if state == JobState.NotQueued:
                 continue
 
+            scene[f"{taskname}{JOBSTATE_SUFFIX}"] = state
             taskname_stem = taskname.split("_")[0]
             state_counts[(state, taskname_stem)] += 1
             scene["num_done"] += state in CONCLUDED_JOBSTATES
@@ -674,17 +726,22 @@ def compute_control_state(args, totals, elapsed, num_concurrent):
     return control_state
 
 
+def poll_local_jobs():
+    if LocalScheduleHandler._inst is not None:
+        sys.path = ORIG_SYS_PATH  # hacky workaround because bpy module breaks with multiprocessing
+        LocalScheduleHandler.instance().poll()
+        sys.path = BPY_SYS_PATH
+
+
 @gin.configurable
 def manage_datagen_jobs(
     all_scenes: list[dict],
     elapsed: float,
     num_concurrent: int,
     disk_sleep_threshold=0.99,
+    scene_db: SceneDB = None,
 ):
-    if LocalScheduleHandler._inst is not None:
-        sys.path = ORIG_SYS_PATH  # hacky workaround because bpy module breaks with multiprocessing
-        LocalScheduleHandler.instance().poll()
-        sys.path = BPY_SYS_PATH
+    poll_local_jobs()
 
     state_counts = monitor_existing_jobs(all_scenes)
     stats, totals = stats_summary(state_counts)
@@ -696,7 +753,12 @@ def manage_datagen_jobs(
         new_jobs
     )  # may be less due to jobs_to_launch optional kwargs, or running out of num_jobs
 
-    pd.DataFrame.from_records(all_scenes).to_csv(args.output_folder / "scenes_db.csv")
+    if scene_db is not None:
+        scene_db.save(all_scenes)
+    else:
+        pd.DataFrame.from_records(all_scenes).to_csv(
+            args.output_folder / "scenes_db.csv"
+        )
 
     # Dont launch new scenes if disk is getting full
     if control_state["disk_usage"] > disk_sleep_threshold:
@@ -715,6 +777,9 @@ def manage_datagen_jobs(
         logger.info(f"{scene['seed']} - running {taskname}")
         run_task(queue_func, args.output_folder / str(scene["seed"]), scene, taskname)
 
+    # start anything just queued locally now, rather than on the next call
+    poll_local_jobs()
+
     log_stats = copy(stats)
     log_stats.update({f"control_state/{k}": v for k, v in control_state.items()})
     log_stats.update({f"{k}/total": v for k, v in totals.items()})
@@ -744,7 +809,13 @@ def print_stats_block(
 
 
 @gin.configurable
-def main(args, shuffle=True, wandb_project="render", upload_commandfile_method=None):
+def main(
+    args,
+    shuffle=True,
+    wandb_project="render",
+    upload_commandfile_method=None,
+    scene_db_backend="sqlite",
+):
     command_path = args.output_folder / "datagen_command.sh"
     with command_path.open("w") as f:
         f.write(" ".join(sys.argv))
@@ -789,6 +860,14 @@ def main(args, shuffle=True, wandb_project="render", upload_commandfile_method=N
     else:
         all_scenes = sorted(all_scenes, key=lambda j: j["seed"])
 
+    match scene_db_backend:
+        case "sqlite":
+            scene_db = SceneDB(args.output_folder / SQLITE_DB_NAME)
+        case "csv":
+            scene_db = None
+        case _:
+            raise ValueError(f"Unrecognized {scene_db_backend=}")
+
     start_time = datetime.now()
     while any(j["all_done"] == SceneState.NotDone for j in all_scenes):
         now = datetime.now()
@@ -799,7 +878,9 @@ def main(args, shuffle=True, wandb_project="render", upload_commandfile_method=N
             )
 
         log_stats = manage_datagen_jobs(
-            all_scenes, elapsed=(datetime.now() - start_time).total_seconds()
+            all_scenes,
+            elapsed=(datetime.now() - start_time).total_seconds(),
+            scene_db=scene_db,
         )
 
         if wandb is not None:
@@ -807,7 +888,11 @@ def main(args, shuffle=True, wandb_project="render", upload_commandfile_method=N
 
         print_stats_block(args.output_folder, start_time, log_stats)
 
-        time.sleep(2)
+        if LocalScheduleHandler._inst is not None:
+            # wakes early when a local job exits, so its slot is reused immediately
+            LocalScheduleHandler.instance().wait(2)
+        else:
+            time.sleep(2)
 
     any_crashed = any(j.get("any_fatal_crash", False) for j in all_scenes)
     sys.exit(1 if any_crashed else 0)
@@ -6,6 +6,7 @@
 # - Lahav Lipson: stereo version, local rendering
 # - Hei Law: initial version
 
+import logging
 import subprocess
 import time
 from pathlib import Path
@@ -14,6 +15,8 @@ import gin
 
 from infinigen.datagen.util.submitit_emulator import LocalJob
 
+logger = logging.getLogger(__name__)
+
 
 class JobState:
     NotQueued = "notqueued"
@@ -53,6 +56,116 @@ def seff(job_obj, retry_on_error=True):
             time.sleep(1)
 
 
+# slurm states which a job can never leave, so their sacct results never need refreshing
+SLURM_TERMINAL_STATES = {
+    "COMPLETED",
+    "FAILED",
+    "CANCELLED",
+    "TIMEOUT",
+    "OUT_OF_MEMORY",
+    "NODE_FAIL",
+    "BOOT_FAIL",
+    "DEADLINE",
+}
+
+
+@gin.configurable
+class SlurmStatusCache:
+    """
+    Looks up the state of all in-flight slurm jobs with one sacct call per manage_jobs loop, rather than
+    one seff call per job. Terminal states are remembered forever. Jobs which sacct did not report
+    (eg submitted moments ago, or sacct is unavailable) fall back to seff.
+    """
+
+    _inst = None
+
+    @classmethod
+    def instance(cls):
+        if cls._inst is None:
+            cls._inst = cls()
+        return cls._inst
+
+    def __init__(
+        self, sacct_path="/usr/bin/sacct", max_ids_per_query=500, enabled=True
+    ):
+        self.sacct_path = sacct_path
+        self.max_ids_per_query = max_ids_per_query
+        self.enabled = enabled
+
+        self.terminal = {}  # job_id -> state, never refreshed
+        self.current = {}  # job_id -> state, as of the last refresh()
+        self.n_queries = 0
+
+    def query(self, job_ids: list[str]) -> dict[str, str]:
+        res = {}
+        for i in range(0, len(job_ids), self.max_ids_per_query):
+            chunk = job_ids[i : i + self.max_ids_per_query]
+            cmd = [self.sacct_path, "-X", "-n", "-P", "-o", "JobID,State"]
+            cmd += ["-j", ",".join(chunk)]
+            out = subprocess.check_output(cmd).decode()
+            self.n_queries += 1
+
+            for line in out.splitlines():
+                if "|" not in line:
+                    continue
+                job_id, state = line.split("|")[:2]
+                if not state.strip():
+                    continue
+                # eg "CANCELLED by 1234"
+                res[job_id.strip()] = state.split()[0]
+
+        return res
+
+    def refresh(self, job_ids):
+        self.current = {}
+        if not self.enabled:
+            return
+
+        todo = sorted(set(str(j) for j in job_ids) - self.terminal.keys())
+        if len(todo) == 0:
+            return
+
+        try:
+            states = self.query(todo)
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.warning(f"{self.sacct_path} failed with {e}, falling back to seff")
+            return
+
+        for job_id, state in states.items():
+            if state in SLURM_TERMINAL_STATES:
+                self.terminal[job_id] = state
+            else:
+                self.current[job_id] = state
+
+        logger.debug(
+            f"{self.__class__.__name__} queried {len(todo)} jobs, "
+            f"{len(self.terminal)} terminal {len(self.current)} live"
+        )
+
+    def status(self, job_obj) -> str:
+        job_id = str(job_obj.job_id)
+        if (res := self.terminal.get(job_id)) is not None:
+            return res
+        if (res := self.current.get(job_id)) is not None:
+            return res
+        return seff(job_obj)
+
+
+def slurm_job_objs(all_scenes: list[dict]):
+    for scene in all_scenes:
+        for k, v in scene.items():
+            if not k.endswith("_job_obj") or isinstance(v, (str, LocalJob)):
+                continue
+            if hasattr(v, "job_id"):
+                yield v
+
+
+def refresh_job_states(all_scenes: list[dict]):
+    job_ids = [j.job_id for j in slurm_job_objs(all_scenes)]
+    if len(job_ids):
+        SlurmStatusCache.instance().refresh(job_ids)
+
+
 def get_scene_state(scene: dict, taskname: str, scene_folder: Path):
     if not scene.get(f"{taskname}_submitted", False):
         return JobState.NotQueued
@@ -73,7 +186,7 @@ def get_scene_state(scene: dict, taskname: str, scene_folder: Path):
     elif isinstance(job_obj, LocalJob):
         res = job_obj.status()
     elif hasattr(job_obj, "job_id"):
-        res = seff(job_obj)
+        res = SlurmStatusCache.instance().status(job_obj)
     else:
         raise TypeError(f"Unrecognized {job_obj=}")
 
@@ -0,0 +1,116 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import json
+import logging
+import sqlite3
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+JOBSTATE_SUFFIX = "_jobstate"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenes (
+    seed TEXT PRIMARY KEY,
+    idx INTEGER NOT NULL,
+    all_done TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    seed TEXT NOT NULL,
+    taskname TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (seed, taskname)
+);
+CREATE INDEX IF NOT EXISTS scenes_idx ON scenes (idx);
+CREATE INDEX IF NOT EXISTS scenes_all_done ON scenes (all_done);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state);
+"""
+
+
+def _jsonable(v):
+    if v is None or isinstance(v, (str, int, float, bool)):
+        return v
+    if isinstance(v, (list, tuple)):
+        return [_jsonable(x) for x in v]
+    if isinstance(v, Path):
+        return str(v)
+    if hasattr(v, "job_id"):
+        # submitit / LocalJob objects cannot be restored, keep just enough to identify them
+        return f"job_id:{v.job_id}"
+    return repr(v)
+
+
+class SceneDB:
+    """
+    SQLite store for the scene dicts managed by manage_jobs.
+
+    save() only rewrites scenes whose contents changed since they were last saved, in a single transaction,
+    so the db on disk is always a consistent snapshot of some loop iteration.
+    Per-task states recorded by monitor_existing_jobs under `{taskname}_jobstate` go into a separate indexed
+    table, which lets a resumed run find the succeeded tasks without rescanning the output folder.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(_SCHEMA)
+        self._written = {}  # seed -> (idx, serialized data) as last written
+
+    def close(self):
+        self.conn.close()
+
+    def save(self, all_scenes: list[dict]) -> int:
+        """
+        Returns the number of scenes written
+        """
+
+        scene_rows, task_rows = [], []
+        for idx, scene in enumerate(all_scenes):
+            seed = str(scene["seed"])
+            data = json.dumps(
+                {k: _jsonable(v) for k, v in scene.items()}, sort_keys=True
+            )
+            if self._written.get(seed) == (idx, data):
+                continue
+
+            scene_rows.append((seed, idx, scene.get("all_done"), data))
+            task_rows += [
+                (seed, k[: -len(JOBSTATE_SUFFIX)], v)
+                for k, v in scene.items()
+                if k.endswith(JOBSTATE_SUFFIX)
+            ]
+
+        if len(scene_rows) == 0:
+            return 0
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO scenes (seed, idx, all_done, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(seed) DO UPDATE SET "
+                "idx=excluded.idx, all_done=excluded.all_done, data=excluded.data",
+                scene_rows,
+            )
+            self.conn.executemany(
+                "INSERT INTO tasks (seed, taskname, state) VALUES (?, ?, ?) "
+                "ON CONFLICT(seed, taskname) DO UPDATE SET state=excluded.state",
+                task_rows,
+            )
+
+        for seed, idx, _, data in scene_rows:
+            self._written[seed] = (idx, data)
+
+        logger.debug(f"{self.__class__.__name__} wrote {len(scene_rows)} scenes")
+        return len(scene_rows)
+
+    def load(self) -> list[dict]:
+        rows = self.conn.execute("SELECT data FROM scenes ORDER BY idx")
+        return [json.loads(data) for (data,) in rows]
+
+    def tasks_in_state(self, state: str) -> list[tuple[str, str]]:
+        rows = self.conn.execute(
+            "SELECT seed, taskname FROM tasks WHERE state = ? ORDER BY seed, taskname",
+            (state,),
+        )
+        return list(rows)
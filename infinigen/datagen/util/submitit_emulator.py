@@ -7,12 +7,17 @@
 # - David Yan - Bugfix
 
 
+import collections
 import copy
 import itertools
 import logging
 import os
 import re
+import select
+import signal
 import subprocess
+import threading
+import time
 from dataclasses import dataclass
 from multiprocessing import Process
 from pathlib import Path
@@ -176,6 +181,15 @@ class ImmediateLocalExecutor:
 
 @gin.configurable
 class LocalScheduleHandler:
+    """
+    Runs queued jobs as local child processes, limited by the available GPU slots
+
+    Pending and running jobs are kept separately, so polling costs scale with the number of live jobs
+    rather than every job ever submitted. The GPU inventory is queried once and cached until
+    refresh_resources() is called. A SIGCHLD handler wakes wait() as soon as a running job exits, so the
+    caller can poll() and hand the freed slot to the next pending job straight away.
+    """
+
     _inst = None
 
     @classmethod
@@ -185,10 +199,80 @@ class LocalScheduleHandler:
         return cls._inst
 
     def __init__(self, jobs_per_gpu=1, use_gpu=True):
-        self.queue = []
+        self.pending = collections.deque()
+        self.running = {}  # job_id -> job_rec
         self.jobs_per_gpu = jobs_per_gpu
         self.use_gpu = use_gpu
 
+        self._total = None
+        self._available = None
+
+        self._owner_pid = os.getpid()
+        self._wakeup_r, self._wakeup_w = None, None
+        self._prev_sigchld = None
+        self._install_sigchld_handler()
+
+    def _install_sigchld_handler(self):
+        if threading.current_thread() is not threading.main_thread():
+            logger.debug(
+                f"{self.__class__.__name__} not on main thread, wait() will not wake early"
+            )
+            return
+
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        self._prev_sigchld = signal.signal(signal.SIGCHLD, self._on_sigchld)
+
+    def _on_sigchld(self, signum, frame):
+        # forked children inherit this handler, only the scheduling process should be woken
+        if os.getpid() == self._owner_pid:
+            try:
+                os.write(self._wakeup_w, b"\0")
+            except BlockingIOError:
+                pass  # pipe already full, a wakeup is pending anyway
+
+        if callable(self._prev_sigchld):
+            self._prev_sigchld(signum, frame)
+
+    def _any_running_exited(self):
+        for job_rec in self.running.values():
+            proc = job_rec["job"].process
+            if proc is None or proc.exitcode is not None:
+                return True
+        return False
+
+    def _drain_wakeups(self):
+        try:
+            while os.read(self._wakeup_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def wait(self, timeout: float):
+        """
+        Sleep for up to `timeout` seconds, returning early if one of our running jobs exits
+
+        SIGCHLD also fires for unrelated children (eg subprocess.check_output calls made by the
+        caller), so wakeups are only honored once a tracked job has actually exited.
+        """
+
+        if self._wakeup_r is None:
+            time.sleep(timeout)
+            return
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            ready, _, _ = select.select([self._wakeup_r], [], [], remaining)
+            if not ready:
+                return
+            self._drain_wakeups()
+            if self._any_running_exited():
+                return
+
     def enqueue(
         self, command: str, params: dict, log_folder: Path, stdout_passthrough: bool
     ):
@@ -209,11 +293,14 @@ class LocalScheduleHandler:
         stderr_file.touch()
         stdout_file.touch()
 
-        self.queue.append(job_rec)
+        self.pending.append(job_rec)
         return job
 
     @gin.configurable
     def total_resources(self) -> set:
+        if self._total is not None:
+            return self._total
+
         resources = {}
 
         if self.use_gpu:
@@ -237,28 +324,62 @@ class LocalScheduleHandler:
                 itertools.product(gpus_uuids, range(self.jobs_per_gpu))
             )
 
+        self._total = resources
         return resources
 
+    def refresh_resources(self):
+        # forget the cached inventory, eg if GPUs were added or removed while running
+        self._total = None
+        self._available = None
+
     def resources_available(self, total) -> set:
-        resources = copy.copy(total)
+        resources = copy.deepcopy(total)
 
-        for job_rec in self.queue:
-            if job_rec["job"].status() != "RUNNING":
-                continue
-            if (g := job_rec["gpu_assignment"]) is not None:
+        for job_rec in self.running.values():
+            if (g := job_rec["gpu_assignment"]) is not None and "gpus" in resources:
                 resources["gpus"] -= g
 
         return resources
 
+    def reap(self) -> int:
+        """
+        Move finished jobs out of self.running and return their resources
+
+        Returns the number of jobs reaped
+        """
+
+        finished = []
+        for job_id, job_rec in self.running.items():
+            proc = job_rec["job"].process
+            # process is None once LocalJob.status() has already collected it
+            if proc is None or proc.exitcode is not None:
+                finished.append(job_id)
+
+        for job_id in finished:
+            job_rec = self.running.pop(job_id)
+            g = job_rec["gpu_assignment"]
+            if g is not None and self._available is not None:
+                self._available["gpus"] |= g & self._total["gpus"]
+
+        return len(finished)
+
     def poll(self):
-        total = self.total_resources()
-        available = self.resources_available(total)
-        logger.debug(f"Checked resources, {total=} {available=}")
+        n_reaped = self.reap()
+
+        if self._available is None:
+            total = self.total_resources()
+            self._available = self.resources_available(total)
+            logger.debug(f"Checked resources, {total=} available={self._available}")
+
+        if n_reaped:
+            logger.debug(f"Reaped {n_reaped} jobs, available={self._available}")
 
-        for job_rec in self.queue:
-            if job_rec["job"].status() != "PENDING":
-                continue
-            self.attempt_dispatch_job(job_rec, available, total)
+        still_pending = collections.deque()
+        while self.pending:
+            job_rec = self.pending.popleft()
+            if not self.attempt_dispatch_job(job_rec, self._available, self._total):
+                still_pending.append(job_rec)
+        self.pending = still_pending
 
     def dispatch(self, job_rec, resources):
         gpu_assignment = resources.get("gpus", None)
@@ -276,14 +397,16 @@ class LocalScheduleHandler:
             stdout_passthrough=job_rec["stdout_passthrough"],
         )
         job_rec["gpu_assignment"] = gpu_assignment
+        self.running[job_rec["job"].job_id] = job_rec
 
     def attempt_dispatch_job(
         self, job_rec, available: set, total: set, select_gpus="first"
-    ):
+    ) -> bool:
         n_gpus = job_rec["params"].get("gpus", 0) or 0
 
         if n_gpus == 0 or not self.use_gpu:
-            return self.dispatch(job_rec, resources={})
+            self.dispatch(job_rec, resources={})
+            return True
 
         if n_gpus <= len(available["gpus"]):
             if select_gpus == "first":
@@ -293,7 +416,10 @@ class LocalScheduleHandler:
             else:
                 raise ValueError(f"Unrecognized {select_gpus=}")
             available["gpus"] -= gpus
-            return self.dispatch(job_rec, resources={"gpus": gpus})
+            self.dispatch(job_rec, resources={"gpus": gpus})
+            return True
+
+        return False
 
 
 class ScheduledLocalExecutor:
@@ -5,8 +5,12 @@
 
 
 import logging
+import multiprocessing as mp
 import os
-from ctypes import c_int32
+import sys
+import time
+from contextlib import contextmanager
+from ctypes import _CFuncPtr, c_int32
 from pathlib import Path
 
 import bpy
@@ -40,6 +44,7 @@ from infinigen.core.util.organization import (
     Transparency,
 )
 from infinigen.core.util.random import weighted_sample
+from infinigen.core.util.raycast import BatchRaycaster
 from infinigen.core.util.test_utils import import_item
 from infinigen.OcMesher.ocmesher import OcMesher as UntexturedOcMesher
 from infinigen.OcMesher.ocmesher import __version__ as ocmesher_version
@@ -50,17 +55,19 @@ from infinigen.terrain.mesher import (
     UniformMesher,
 )
 from infinigen.terrain.scene import scene, transfer_scene_info
-from infinigen.terrain.surface_kernel.core import SurfaceKernel
+from infinigen.terrain.surface_kernel.core import KernelizerCache, SurfaceKernel
 from infinigen.terrain.utils import (
     AttributeType,
     FieldsType,
     Mesh,
+    MeshBuilder,
     Vars,
     get_caminfo,
     load_cdll,
     move_modifier,
     write_attributes,
 )
+from infinigen.terrain.utils.sdf_cache import SDFTileCache
 
 ocmesher_version_expected = "2.0"
 if ocmesher_version != ocmesher_version_expected:
@@ -75,6 +82,33 @@ hidden_in_viewport = [ElementNames.Atmosphere]
 ASSET_ENV_VAR = "INFINIGEN_ASSET_FOLDER"
 
 
+@contextmanager
+def _spawnable_sys_path():
+    # bpy adds its scripts/modules folders to sys.path, and spawned children would then find the
+    # bpy python package there instead of the bpy module; they add the folders again on import
+    blender_dirs = [Path(bpy.utils.resource_path(t)) for t in ["LOCAL", "USER"]]
+    saved = list(sys.path)
+    sys.path[:] = [
+        p for p in saved if not any(Path(p).is_relative_to(d) for d in blender_dirs)
+    ]
+    try:
+        yield
+    finally:
+        sys.path[:] = saved
+
+
+def _init_export_worker(config_str):
+    # spawned workers start without the gin bindings of the parent
+    gin.parse_config(config_str, skip_unknown=True)
+
+
+def _run_export_job(job):
+    mesh_name, mesher, elements = job
+    start = time.perf_counter()
+    mesh = mesher(elements)
+    return mesh, time.perf_counter() - start
+
+
 @gin.configurable
 def get_surface_type(surface, degrade_sdf_to_displacement=True):
     if not degrade_sdf_to_displacement:
@@ -96,26 +130,45 @@ def process_surface_input(_input, default):
         return [(import_item(k), float(v)) for k, v in _input]
 
 
-class OcMesher(UntexturedOcMesher):
+class PicklableOcMesher(UntexturedOcMesher):
+    # the library functions bound by OcMesher cannot be pickled, rebind them when unpickled in an export worker
     def __init__(self, cameras, bounds, **kwargs):
-        UntexturedOcMesher.__init__(self, get_caminfo(cameras)[0], bounds, **kwargs)
+        caminfo = get_caminfo(cameras)[0]
+        self._init_args = (caminfo, bounds, kwargs)
+        UntexturedOcMesher.__init__(self, caminfo, bounds, **kwargs)
 
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if not isinstance(v, _CFuncPtr)}
+
+    def __setstate__(self, state):
+        caminfo, bounds, kwargs = state["_init_args"]
+        UntexturedOcMesher.__init__(self, caminfo, bounds, **kwargs)
+        self.__dict__.update(state)
+
+
+class OcMesher(PicklableOcMesher):
     def __call__(self, kernels):
         sdf_kernels = [(lambda x, k0=k: k0(x)[Vars.SDF]) for k in kernels]
         meshes, in_view_tags = UntexturedOcMesher.__call__(self, sdf_kernels)
         with Timer("compute attributes"):
             write_attributes(kernels, None, meshes)
-            for mesh, tag in zip(meshes, in_view_tags):
-                mesh.vertex_attributes[Tags.OutOfView] = (~tag).astype(np.int32)
         with Timer("concat meshes"):
-            mesh = Mesh.cat(meshes)
+            # each element's mesh is copied once, straight into the output buffers
+            builder = MeshBuilder()
+            for mesh, tag in zip(meshes, in_view_tags):
+                builder.add(
+                    mesh.vertices,
+                    mesh.faces,
+                    {
+                        **mesh.vertex_attributes,
+                        Tags.OutOfView: (~tag).astype(np.int32),
+                    },
+                )
+            mesh = builder.build()
         return mesh
 
 
-class CollectiveOcMesher(UntexturedOcMesher):
-    def __init__(self, cameras, bounds, **kwargs):
-        UntexturedOcMesher.__init__(self, get_caminfo(cameras)[0], bounds, **kwargs)
-
+class CollectiveOcMesher(PicklableOcMesher):
     def __call__(self, kernels):
         sdf_kernels = [
             lambda x: np.stack([k(x)[Vars.SDF] for k in kernels], -1).min(axis=-1)
@@ -157,6 +210,7 @@ class Terrain:
         whole_bbox=None,
         populated_bounds=(-75, 75, -75, 75, -25, 55),
         bounds=(-500, 500, -500, 500, -500, 500),
+        export_workers=1,
     ):
         dll = load_cdll(
             str(
@@ -179,6 +233,7 @@ class Terrain:
         self.min_distance = min_distance
         self.populated_bounds = populated_bounds
         self.bounds = bounds
+        self.export_workers = export_workers
 
         self.surface_registry = {
             "atmosphere": process_surface_input(
@@ -246,9 +301,17 @@ class Terrain:
             transfer_scene_info(self, scene_infos)
             Terrain.instance = self
 
+        if str(self.on_the_fly_asset_folder) not in ["", "."]:
+            sdf_cache = SDFTileCache(self.on_the_fly_asset_folder / "sdf_cache")
+            KernelizerCache.instance().folder = (
+                self.on_the_fly_asset_folder / "surface_kernels"
+            )
+        else:
+            sdf_cache = None
         for e in self.elements:
             self.elements[e].height_offset = height_offset
             self.elements[e].whole_bbox = whole_bbox
+            self.elements[e].sdf_cache = sdf_cache
 
     def __del__(self):
         self.cleanup()
@@ -267,6 +330,7 @@ class Terrain:
     ):
         meshes_dict = {}
         attributes_dict = {}
+        jobs = []
         if not main_terrain_only or TerrainNames.OpaqueTerrain == self.main_terrain:
             opaque_elements = [
                 element
@@ -283,9 +347,7 @@ class Terrain:
                     mesher = UniformMesher(self.populated_bounds)
                 else:
                     raise ValueError("unrecognized mesher_backend")
-                with Timer(f"meshing {TerrainNames.OpaqueTerrain}"):
-                    mesh = mesher([element for element in opaque_elements])
-                    meshes_dict[TerrainNames.OpaqueTerrain] = mesh
+                jobs.append((TerrainNames.OpaqueTerrain, mesher, opaque_elements))
                 for element in opaque_elements:
                     attributes_dict[TerrainNames.OpaqueTerrain].update(
                         element.attributes
@@ -318,9 +380,7 @@ class Terrain:
                     mesher = UniformMesher(self.populated_bounds, enclosed=True)
                 else:
                     raise ValueError("unrecognized mesher_backend")
-                with Timer(f"meshing {element.__class__.name}"):
-                    mesh = mesher([element])
-                    meshes_dict[element.__class__.name] = mesh
+                jobs.append((element.__class__.name, mesher, [element]))
                 attributes_dict[element.__class__.name] = element.attributes
 
         if (
@@ -344,16 +404,20 @@ class Terrain:
                     mesher = UniformMesher(self.populated_bounds)
                 else:
                     raise ValueError("unrecognized mesher_backend")
-                with Timer(f"meshing {TerrainNames.CollectiveTransparentTerrain}"):
-                    mesh = mesher(
-                        [element for element in collective_transparent_elements]
+                jobs.append(
+                    (
+                        TerrainNames.CollectiveTransparentTerrain,
+                        mesher,
+                        collective_transparent_elements,
                     )
-                    meshes_dict[TerrainNames.CollectiveTransparentTerrain] = mesh
+                )
                 for element in collective_transparent_elements:
                     attributes_dict[TerrainNames.CollectiveTransparentTerrain].update(
                         element.attributes
                     )
 
+        meshes_dict.update(self.run_meshers(jobs))
+
         if main_terrain_only or cameras is not None:
             for mesh_name in meshes_dict:
                 mesh_name_unapplied = mesh_name
@@ -400,6 +464,39 @@ class Terrain:
 
         return meshes_dict, attributes_dict
 
+    def run_meshers(self, jobs):
+        """
+        Run (mesh_name, mesher, elements) jobs and return {mesh_name: mesh} in job order.
+
+        With export_workers > 1 the jobs run in worker processes rather than threads, since each
+        mesher library keeps its working state in globals shared by all its instances. The workers
+        are spawned, not forked, as the parent has already run OpenMP kernels and forking it may
+        deadlock; meshers and elements are pickled to them and reload their libraries.
+        """
+        n_workers = min(self.export_workers, len(jobs))
+        if n_workers <= 1:
+            meshes = {}
+            for mesh_name, mesher, elements in jobs:
+                with Timer(f"meshing {mesh_name}"):
+                    meshes[mesh_name] = mesher(elements)
+            return meshes
+
+        with Timer(f"meshing {[job[0] for job in jobs]} with {n_workers} workers"):
+            with _spawnable_sys_path():
+                pool = mp.get_context("spawn").Pool(
+                    n_workers,
+                    initializer=_init_export_worker,
+                    initargs=(gin.config_str(),),
+                )
+            with pool:
+                results = pool.map(_run_export_job, jobs, chunksize=1)
+
+        meshes = {}
+        for (mesh_name, _, _), (mesh, wall_time) in zip(jobs, results):
+            logger.info(f"meshing {mesh_name} took {wall_time:.2f}s")
+            meshes[mesh_name] = mesh
+        return meshes
+
     def sample_surface_templates(self):
         with FixedSeed(int_hash(["terrain surface", self.seed])):
             self.surfaces = {}
@@ -710,7 +807,11 @@ class Terrain:
         )
 
         depsgraph = bpy.context.evaluated_depsgraph_get()
-        scene_bvh = BVHTree.FromObject(terrain_obj, depsgraph)
+        scene_bvh = BatchRaycaster(
+            BVHTree.FromObject(terrain_obj, depsgraph),
+            terrain_mesh.vertices,
+            terrain_mesh.faces,
+        )
         delete(terrain_obj)
 
         return scene_bvh, camera_selection_answers, vertexwise_min_dist
@@ -28,6 +28,8 @@ class Atmosphere(Element):
         transparency=Transparency.IndividualTransparent,
     ):
         self.device = device
+        self.height = height
+        self.spherical_radius = spherical_radius
         self.int_params = AC(np.array([], dtype=np.int32))
         self.float_params = AC(
             np.array([height, spherical_radius, hacky_offset], dtype=np.float32)
@@ -38,3 +40,7 @@ class Atmosphere(Element):
 
         self.meta_params = [waterbody is not None]
         Element.__init__(self, "atmosphere", material, transparency)
+
+    def _sdf_lower_bound(self, positions):
+        # the kernel takes max(altitude - height, ...)
+        return self._altitude(positions, self.spherical_radius) - self.height
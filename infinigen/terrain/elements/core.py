@@ -11,11 +11,29 @@ import numpy as np
 from numpy import ascontiguousarray as AC
 
 from infinigen.core.util.organization import Materials
-from infinigen.terrain.utils import ASFLOAT, ASINT, Vars, load_cdll, register_func
+from infinigen.terrain.utils import (
+    ASFLOAT,
+    ASINT,
+    CFuncsPicklable,
+    Vars,
+    load_cdll,
+    register_func,
+)
+
+# upper bound on |Perlin(...)| from the terrain kernels (fractal sum of octaves, amplitudes 1/1.75, 1/3.5, ...)
+PERLIN_BOUND = 1.2
+
+
+def height_band_bbox(z_min, z_max):
+    """sdf_bbox of an element which is empty outside z_min <= z <= z_max, at any x and y"""
+    return (
+        np.array([-np.inf, -np.inf, z_min], dtype=np.float32),
+        np.array([np.inf, np.inf, z_max], dtype=np.float32),
+    )
 
 
 @gin.configurable
-class Element:
+class Element(CFuncsPicklable):
     called_time = {}
 
     def __init__(self, lib_name, material, transparency):
@@ -62,14 +80,6 @@ class Element:
         self.material = material
         self.transparency = transparency
 
-        if hasattr(self, "meta_params"):
-            meta_param = self.meta_params[0]
-            if len(self.meta_params) > 1:
-                meta_param2 = self.meta_params[1]
-            else:
-                meta_param2 = 0
-        else:
-            meta_param = meta_param2 = 0
         if not hasattr(self, "int_params2"):
             self.int_params2 = np.zeros(0, dtype=np.int32)
         if not hasattr(self, "float_params2"):
@@ -78,6 +88,26 @@ class Element:
             self.int_params3 = np.zeros(0, dtype=np.int32)
         if not hasattr(self, "float_params3"):
             self.float_params3 = np.zeros(0, dtype=np.float32)
+        self._init_cdll()
+        self.displacement = []
+        self.height_offset = 0
+        self.whole_bbox = None
+        # optional localized support: outside sdf_bbox = (min, max) corners, sdf >= sdf_bbox_slope * distance to the box
+        self.sdf_bbox = None
+        self.sdf_bbox_slope = 0
+        # optional SDFTileCache, set by Terrain
+        self.sdf_cache = None
+
+    def _init_cdll(self):
+        # the element library keeps its parameters in globals, also redone after unpickling
+        if hasattr(self, "meta_params"):
+            meta_param = self.meta_params[0]
+            if len(self.meta_params) > 1:
+                meta_param2 = self.meta_params[1]
+            else:
+                meta_param2 = 0
+        else:
+            meta_param = meta_param2 = 0
         self.init(
             meta_param,
             meta_param2,
@@ -94,16 +124,70 @@ class Element:
             len(self.float_params3),
             ASFLOAT(self.float_params3),
         )
-        self.displacement = []
-        self.height_offset = 0
-        self.whole_bbox = None
+
+    def _whole_bbox_mask(self, positions):
+        return (positions >= self.whole_bbox[0].reshape((1, 3))).all(axis=-1) & (
+            positions <= self.whole_bbox[1].reshape((1, 3))
+        ).all(axis=-1)
+
+    def _sdf_lower_bound(self, positions):
+        # positions already include height_offset; override for elements with a cheap analytic bound
+        if self.sdf_bbox is None:
+            return None
+        lo, hi = np.asarray(self.sdf_bbox[0]), np.asarray(self.sdf_bbox[1])
+        dist = np.linalg.norm(
+            np.maximum(np.maximum(lo - positions, positions - hi), 0), axis=-1
+        )
+        return np.where(dist > 0, self.sdf_bbox_slope * dist, -np.inf)
+
+    @staticmethod
+    def _altitude(positions, spherical_radius):
+        if spherical_radius > 0:
+            return np.linalg.norm(positions, axis=-1) - spherical_radius
+        return positions[:, 2]
+
+    def sdf_lower_bound(self, positions):
+        """
+        Conservative per-point lower bound on self(positions)[Vars.SDF], or None if unknown.
+        Used by mesher.culling to skip points where this element cannot be the minimum.
+        """
+        if self.displacement != []:
+            return None
+        shifted = positions.copy()
+        shifted[:, 2] += self.height_offset
+        bound = self._sdf_lower_bound(shifted)
+        if bound is None and self.whole_bbox is None:
+            return None
+        if bound is None:
+            bound = np.full(len(positions), -np.inf)
+        else:
+            # slack for float32 rounding in the kernels
+            bound = bound - 1e-4 * (1 + np.abs(bound))
+        if self.whole_bbox is not None:
+            bound = np.where(self._whole_bbox_mask(positions), 1e6, bound)
+        return bound
 
     def __call__(self, positions, sdf_only=False):
+        key = None
+        if self.sdf_cache is not None:
+            key = self.sdf_cache.key(self, positions, sdf_only)
+            if key is not None:
+                ret = self.sdf_cache.load(key)
+                if ret is not None:
+                    return ret
+        ret = self._evaluate(positions, sdf_only)
+        if key is not None:
+            self.sdf_cache.save(key, ret)
+        return ret
+
+    def _evaluate(self, positions, sdf_only):
         if self.whole_bbox is not None:
-            mask = (positions >= self.whole_bbox[0].reshape((1, 3))).all(axis=-1) & (
-                positions <= self.whole_bbox[1].reshape((1, 3))
-            ).all(axis=-1)
-        positions[:, 2] += self.height_offset
+            mask = self._whole_bbox_mask(positions)
+        if self.height_offset != 0:
+            # offset a copy: shifting the caller's array and back does not round trip exactly, and
+            # meshers pass the same array to every element, the sdf cache and the culling bounds
+            positions = positions.copy()
+            positions[:, 2] += self.height_offset
         N = len(positions)
         sdf = AC(np.zeros(N, dtype=np.float32))
         auxs = []
@@ -114,12 +198,24 @@ class Element:
                 auxs.append(AC(np.zeros(N * len(self.aux_names), dtype=np.float32)))
             else:
                 auxs.append(None)
-        self.call(
-            N,
-            ASFLOAT(AC(positions.astype(np.float32))),
-            ASFLOAT(sdf),
-            *[POINTER(c_float)() if x is None else ASFLOAT(x) for x in auxs],
-        )
+        if self.whole_bbox is not None and not flag and self.displacement == []:
+            # only the sdf is returned and masked points are overwritten below, so skip them
+            valid = np.nonzero(~mask)[0]
+            sdf_valid = AC(np.zeros(len(valid), dtype=np.float32))
+            self.call(
+                len(valid),
+                ASFLOAT(AC(positions[valid].astype(np.float32))),
+                ASFLOAT(sdf_valid),
+                *[POINTER(c_float)() for _ in auxs],
+            )
+            sdf[valid] = sdf_valid
+        else:
+            self.call(
+                N,
+                ASFLOAT(AC(positions.astype(np.float32))),
+                ASFLOAT(sdf),
+                *[POINTER(c_float)() if x is None else ASFLOAT(x) for x in auxs],
+            )
 
         if self.whole_bbox is not None:
             sdf[mask] = 1e6
@@ -140,7 +236,6 @@ class Element:
         for surface in self.displacement:
             ret.update(surface({Vars.Position: positions, **ret}))
             ret[Vars.SDF] -= ret.pop(Vars.Offset)
-        positions[:, 2] -= self.height_offset
         return ret
 
     def get_heightmap(self, X, Y):
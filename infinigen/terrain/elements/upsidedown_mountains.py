@@ -26,7 +26,7 @@ from infinigen.terrain.assets.upsidedown_mountains import (
 )
 from infinigen.terrain.utils import random_int, random_int_large
 
-from .core import Element
+from .core import PERLIN_BOUND, Element, height_band_bbox
 
 
 @gin.configurable
@@ -80,6 +80,19 @@ class UpsidedownMountains(Element):
 
         Element.__init__(self, "upsidedown_mountains", material, transparency)
         self.tag = ElementTag.UpsidedownMountains
+        self._set_sdf_bbox()
+
+    def _set_sdf_bbox(self):
+        # the sdf is the vertical distance to the band between the perturbed peak - downside and
+        # peak/upside heightmaps (which are 0 outside the instances), so it grows as height outside it
+        floating_height, perturb_scale = self.float_params[[1, 6]]
+        upside, downside, peak = np.split(self.float_params[7:], 3)
+        perturb = perturb_scale * PERLIN_BOUND
+        self.sdf_bbox = height_band_bbox(
+            floating_height + min(peak.min(), 0) - max(downside.max(), 0) - perturb,
+            floating_height + max(peak.max(), upside.max() + perturb, perturb),
+        )
+        self.sdf_bbox_slope = 1
 
     @gin.configurable
     def load_assets(
@@ -17,7 +17,7 @@ from infinigen.core.util.organization import (
 )
 from infinigen.terrain.utils import random_int
 
-from .core import Element
+from .core import PERLIN_BOUND, Element, height_band_bbox
 
 
 @gin.configurable
@@ -80,3 +80,16 @@ class WarpedRocks(Element):
         self.meta_params = [caves is not None]
         Element.__init__(self, "warped_rocks", material, transparency)
         self.tag = ElementTag.WarpedRocks
+        self._set_sdf_bbox()
+
+    def _set_sdf_bbox(self):
+        # sdf = (z - slope) * supressing_param + content and caves only carve, so above the highest
+        # slope plus content the sdf grows at least as supressing_param * height
+        supressing_param, content_scale = self.float_params[[0, 4]]
+        slope_scale, slope_shift = np.abs(self.float_params[11]), self.float_params[12]
+        self.sdf_bbox = height_band_bbox(
+            -np.inf,
+            slope_shift
+            + PERLIN_BOUND * (slope_scale + abs(content_scale) / supressing_param),
+        )
+        self.sdf_bbox_slope = supressing_param
@@ -34,6 +34,7 @@ class Waterbody(Element):
     ):
         self.device = device
         self.height = height
+        self.spherical_radius = spherical_radius
 
         self.int_params = AC(np.zeros(0, dtype=np.int32))
         self.float_params = AC(np.array([height, spherical_radius], dtype=np.float32))
@@ -50,3 +51,7 @@ class Waterbody(Element):
 
         Element.__init__(self, "waterbody", material, transparency)
         self.tag = ElementTag.Liquid
+
+    def _sdf_lower_bound(self, positions):
+        # the kernel's sdf is exactly altitude - height
+        return self._altitude(positions, self.spherical_radius) - self.height
@@ -415,6 +415,22 @@ cdef class Cell:
 
     ## Called from marching cube function
 
+    cdef void reset(self):
+        """ Clear all results and face layers, so the cell can be reused for another volume of the same shape.
+        """
+        cdef int i, j
+        for i in range(self.nx*self.ny*4):
+            self.faceLayer1[i] = -1
+            self.faceLayer2[i] = -1
+        self.faceLayer = self.faceLayer1
+        for i in range(self._vertexCount):
+            self._values[i] = 0.0
+            for j in range(3):
+                self._normals[i*3+j] = 0.0
+        self._vertexCount = 0
+        self._faceCount = 0
+
+
     cdef void new_z_value(self):
         """ This method should be called each time a new z layer is entered.
         We will swap the layers with face information and empty the second.
@@ -969,6 +985,19 @@ def marching_cubes(cnp.float32_t[:, :, :] im not None, cnp.float64_t isovalue,
     # Create cell to use throughout
     cdef Cell cell = Cell(luts, Nx, Ny, Nz)
 
+    _march(cell, luts, im, isovalue, st, classic, mask)
+
+    # Done
+    return *cell.get_vertices(), cell.get_faces(), cell.get_normals(), cell.get_values()
+
+
+cdef _march(Cell cell, LutProvider luts, cnp.float32_t[:, :, :] im, cnp.float64_t isovalue,
+            int st, int classic, cnp.ndarray[cnp.npy_bool, ndim=3, cast=True] mask):
+    """ Run marching cubes over im, appending the results to cell.
+    """
+    cdef int Nx, Ny, Nz
+    Nx, Ny, Nz = im.shape[2], im.shape[1], im.shape[0]
+
     # Typedef variables
     cdef int x, y, z, x_st, y_st, z_st
     cdef int nt
@@ -1020,8 +1049,62 @@ def marching_cubes(cnp.float32_t[:, :, :] im not None, cnp.float64_t isovalue,
                             config = luts.CASES.get2(cell.index, 1)
                             the_big_switch(luts, cell, case, config)
 
-    # Done
-    return *cell.get_vertices(), cell.get_faces(), cell.get_normals(), cell.get_values()
+
+def marching_cubes_batch(cnp.float32_t[:, :, :, :] ims not None, cnp.float64_t isovalue,
+                         LutProvider luts, int classic=0):
+    """ marching_cubes_batch(ims, cnp.float64_t isovalue, LutProvider luts, int classic=0)
+    Apply marching cubes to each volume in a batch of equally sized volumes.
+
+    Equivalent to calling marching_cubes(ims[b], isovalue, luts, 1, classic) for every b,
+    but reuses one cell for the whole batch, so many small volumes cost a single call.
+    Volumes without a surface contribute no vertices or faces instead of raising.
+    Returns (vertices_integral, vertices_fractal, faces, vertex_counts, face_counts), where
+    faces index into the vertices of their own volume and face_counts counts triangles.
+    """
+    cdef int B, Nx, Ny, Nz
+    B, Nx, Ny, Nz = ims.shape[0], ims.shape[3], ims.shape[2], ims.shape[1]
+
+    cdef Cell cell = Cell(luts, Nx, Ny, Nz)
+    vertex_counts = np.zeros(B, np.int32)
+    face_counts = np.zeros(B, np.int32)
+    cdef cnp.int32_t [:] vertex_counts_ = vertex_counts
+    cdef cnp.int32_t [:] face_counts_ = face_counts
+
+    # outputs grow by doubling, the cell's buffers are copied in after each volume
+    cdef int n_verts = 0, n_faces = 0, i, j, b
+    vertices_integral = np.empty((max(B, 1) * 4, 3), np.int32)
+    vertices_fractal = np.empty((max(B, 1) * 4, 3), np.float32)
+    faces = np.empty(max(B, 1) * 12, np.int32)
+    cdef cnp.int32_t [:, :] vertices_integral_ = vertices_integral
+    cdef cnp.float32_t [:, :] vertices_fractal_ = vertices_fractal
+    cdef int [:] faces_ = faces
+
+    for b in range(B):
+        cell.reset()
+        _march(cell, luts, ims[b], isovalue, 1, classic, None)
+        vertex_counts_[b] = cell._vertexCount
+        face_counts_[b] = cell._faceCount // 3
+
+        if n_verts + cell._vertexCount > vertices_integral_.shape[0]:
+            vertices_integral = np.resize(vertices_integral, (2 * (n_verts + cell._vertexCount), 3))
+            vertices_fractal = np.resize(vertices_fractal, (2 * (n_verts + cell._vertexCount), 3))
+            vertices_integral_ = vertices_integral
+            vertices_fractal_ = vertices_fractal
+        if n_faces + cell._faceCount > faces_.shape[0]:
+            faces = np.resize(faces, 2 * (n_faces + cell._faceCount))
+            faces_ = faces
+
+        for i in range(cell._vertexCount):
+            for j in range(3):
+                vertices_integral_[n_verts + i, j] = cell._vertices_integral[i*3+j]
+                vertices_fractal_[n_verts + i, j] = cell._vertices_fractal[i*3+j]
+        for i in range(cell._faceCount):
+            faces_[n_faces + i] = cell._faces[i]
+        n_verts += cell._vertexCount
+        n_faces += cell._faceCount
+
+    return (vertices_integral[:n_verts], vertices_fractal[:n_verts], faces[:n_faces],
+            vertex_counts, face_counts)
 
 
 
@@ -235,6 +235,49 @@ def _marching_cubes_lewiner(
     return vertices_integral, vertices_fractal, faces, normals, values
 
 
+def marching_cubes_batch(volumes, level):
+    """Lewiner marching cubes on each of a batch of equally sized volumes in a single call.
+
+    Matches calling marching_cubes(volumes[b], level) for every b with the default
+    arguments, except that volumes without a surface yield no vertices instead of raising.
+
+    Parameters
+    ----------
+    volumes : (B, M, N, P) array
+        Batch of input volumes.
+    level : float
+        Contour value to search for isosurfaces in each volume.
+
+    Returns
+    -------
+    verts_int, verts_frac : (V, 3) arrays
+        Vertices of all volumes, concatenated in batch order.
+    faces : (F, 3) array
+        Faces of all volumes, each indexing the vertices of its own volume.
+    vert_counts, face_counts : (B,) arrays
+        Number of vertices and faces contributed by each volume.
+    """
+    if not isinstance(volumes, np.ndarray) or (volumes.ndim != 4):
+        raise ValueError("Input volumes should be a 4D numpy array.")
+    if volumes.shape[1] < 2 or volumes.shape[2] < 2 or volumes.shape[3] < 2:
+        raise ValueError("Input volumes must be at least 2x2x2.")
+    volumes = np.ascontiguousarray(volumes, np.float32)
+
+    L = _get_mc_luts()
+    func = _marching_cubes_lewiner_cy.marching_cubes_batch
+    verts_int, verts_frac, faces, vert_counts, face_counts = func(
+        volumes, float(level), L, False
+    )
+
+    # same finishing touches as _marching_cubes_lewiner with default arguments
+    verts_int = np.fliplr(verts_int)
+    verts_frac = np.fliplr(verts_frac)
+    faces = np.fliplr(faces.reshape(-1, 3))
+    verts_frac[np.abs(verts_frac) < 1e-30] = 0
+    verts_frac[np.abs(verts_frac - 1) < 1e-30] = 1
+    return verts_int, verts_frac, faces, vert_counts, face_counts
+
+
 def _to_array(args):
     shape, text = args
     byts = base64.decodebytes(text.encode("utf-8"))
@@ -16,6 +16,7 @@ from infinigen.core.util.organization import Tags
 from infinigen.terrain.utils import (
     ASDOUBLE,
     ASINT,
+    CFuncsPicklable,
     Mesh,
     load_cdll,
     register_func,
@@ -38,7 +39,7 @@ class Timer(tTimer):
 
 
 @gin.configurable
-class CubeSphericalMesher:
+class CubeSphericalMesher(CFuncsPicklable):
     def __init__(
         self,
         cam_pose,
@@ -196,7 +197,9 @@ class CubeSphericalMesher:
             f"compute emptytest sdf of #{len(positions)} (6x{test_L + 1}^2x{test_R + 1})"
         ):
             sdf = AC(
-                self.kernel_caller(kernels, positions).min(axis=-1).astype(np.float64)
+                self.kernel_caller(kernels, positions, min_only=True)
+                .min(axis=-1)
+                .astype(np.float64)
             )
 
         with Timer("initial_update"):
@@ -217,7 +220,7 @@ class CubeSphericalMesher:
                 self.get_coarse_queries(ASDOUBLE(positions), ASINT(position_bounds))
             with Timer("compute coarse sdf"):
                 sdf = AC(
-                    self.kernel_caller(kernels, positions)
+                    self.kernel_caller(kernels, positions, min_only=True)
                     .min(axis=-1)
                     .astype(np.float64)
                 )
@@ -295,7 +298,7 @@ class CubeSphericalMesher:
                                 self.complete_depth_test_relax, b, ASDOUBLE(positions)
                             )
                             sdf = AC(
-                                self.kernel_caller(kernels, positions)
+                                self.kernel_caller(kernels, positions, min_only=True)
                                 .min(axis=-1)
                                 .astype(np.float64)
                             )
@@ -312,7 +315,7 @@ class CubeSphericalMesher:
                     self.finefront_get_queries(ASDOUBLE(positions))
                 with Timer("compute finefront sdf"):
                     sdf = AC(
-                        self.kernel_caller(kernels, positions)
+                        self.kernel_caller(kernels, positions, min_only=True)
                         .min(axis=-1)
                         .astype(np.float64)
                     )
@@ -362,7 +365,7 @@ class CubeSphericalMesher:
 
             with Timer("compute stitching sdf"):
                 sdf = AC(
-                    self.kernel_caller(kernels, positions)
+                    self.kernel_caller(kernels, positions, min_only=True)
                     .min(axis=-1)
                     .astype(np.float64)
                 )
@@ -406,7 +409,9 @@ class CubeSphericalMesher:
             for it in range_it:
                 self.bisection_get_positions(ASDOUBLE(positions))
                 sdf = np.ascontiguousarray(
-                    self.kernel_caller(kernels, positions.reshape((-1, 3)))
+                    self.kernel_caller(
+                        kernels, positions.reshape((-1, 3)), min_only=True
+                    )
                     .min(axis=-1)
                     .astype(np.float64)
                 )
@@ -0,0 +1,47 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import numpy as np
+
+from infinigen.terrain.utils import Vars
+
+CULLED_SDF = 1e6
+
+
+def sdf_lower_bound(kernel, XYZ):
+    f = getattr(kernel, "sdf_lower_bound", None)
+    if f is None:
+        return None
+    return f(XYZ)
+
+
+def culled_kernel_sdfs(kernels, XYZ):
+    """
+    Evaluate the SDF of each kernel at XYZ, stacked along the last axis, such that the min over the last axis
+    is exact but each individual column need not be.
+
+    Kernels which advertise a lower bound on their SDF (see Element.sdf_lower_bound) are only evaluated at
+    points where that bound is below the running minimum of the kernels evaluated so far, since elsewhere they
+    cannot be the minimum. Their column is CULLED_SDF at skipped points.
+    """
+
+    N = len(XYZ)
+    bounds = [sdf_lower_bound(k, XYZ) for k in kernels]
+
+    # unbounded kernels go first, so the bounded ones are compared against as low a minimum as possible
+    order = sorted(range(len(kernels)), key=lambda i: bounds[i] is not None)
+
+    sdfs = [None] * len(kernels)
+    curr_min = np.full(N, np.inf, dtype=np.float32)
+    for i in order:
+        if bounds[i] is None:
+            sdf = kernels[i](XYZ, sdf_only=1)[Vars.SDF]
+        else:
+            idx = np.nonzero(bounds[i] < curr_min)[0]
+            sdf = np.full(N, CULLED_SDF, dtype=np.float32)
+            if len(idx):
+                sdf[idx] = kernels[i](XYZ[idx], sdf_only=1)[Vars.SDF]
+        np.minimum(curr_min, sdf, out=curr_min)
+        sdfs[i] = sdf
+
+    return np.stack(sdfs, -1)
@@ -15,6 +15,7 @@ from tqdm import tqdm
 from infinigen.terrain.utils import (
     ASDOUBLE,
     ASINT,
+    CFuncsPicklable,
     Mesh,
     load_cdll,
     register_func,
@@ -37,7 +38,7 @@ class Timer(tTimer):
 
 
 @gin.configurable
-class FrontviewSphericalMesher:
+class FrontviewSphericalMesher(CFuncsPicklable):
     def __init__(
         self,
         cam_pose,
@@ -190,7 +191,9 @@ class FrontviewSphericalMesher:
             f"compute emptytest sdf of #{(test_H + 1) * (test_W + 1) * (test_R + 1)}"
         ):
             sdf = AC(
-                self.kernel_caller(kernels, positions).min(axis=-1).astype(np.float64)
+                self.kernel_caller(kernels, positions, min_only=True)
+                .min(axis=-1)
+                .astype(np.float64)
             )
 
         with Timer("initial_update"):
@@ -210,7 +213,7 @@ class FrontviewSphericalMesher:
                 self.get_coarse_queries(ASDOUBLE(positions), ASINT(position_bounds))
             with Timer("compute coarse sdf"):
                 sdf = AC(
-                    self.kernel_caller(kernels, positions)
+                    self.kernel_caller(kernels, positions, min_only=True)
                     .min(axis=-1)
                     .astype(np.float64)
                 )
@@ -258,7 +261,9 @@ class FrontviewSphericalMesher:
             for it in range_it:
                 self.bisection_get_positions(-1, ASDOUBLE(positions))
                 sdf = np.ascontiguousarray(
-                    self.kernel_caller(kernels, positions.reshape((-1, 3)))
+                    self.kernel_caller(
+                        kernels, positions.reshape((-1, 3)), min_only=True
+                    )
                     .min(axis=-1)
                     .astype(np.float64)
                 )
@@ -296,7 +301,7 @@ class FrontviewSphericalMesher:
                             self.complete_depth_test_relax, b, ASDOUBLE(positions)
                         )
                         sdf = AC(
-                            self.kernel_caller(kernels, positions)
+                            self.kernel_caller(kernels, positions, min_only=True)
                             .min(axis=-1)
                             .astype(np.float64)
                         )
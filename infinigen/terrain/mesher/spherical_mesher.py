@@ -4,34 +4,36 @@
 # Authors: Zeyu Ma
 
 
+from functools import partial
+
 import gin
 import numpy as np
 
 from infinigen.core.util.logging import Timer
-from infinigen.terrain.utils import Mesh, Vars, get_caminfo
+from infinigen.terrain.utils import Mesh, Vars, camera_annotation_poses, get_caminfo
 
 from .cube_spherical_mesher import CubeSphericalMesher
+from .culling import culled_kernel_sdfs
 from .frontview_spherical_mesher import FrontviewSphericalMesher
 
 magnifier = 1e6
 
 
 @gin.configurable
-def kernel_caller(kernels, XYZ, bounds=None):
-    sdfs = []
-    for kernel in kernels:
-        ret = kernel(XYZ, sdf_only=1)
-        sdf = ret[Vars.SDF]
-        if bounds is not None:
-            out_bound = np.zeros(len(XYZ), dtype=bool)
-            for i in range(3):
-                out_bound |= XYZ[:, i] <= bounds[i * 2]
-                out_bound |= XYZ[:, i] >= bounds[i * 2 + 1]
-            sdf[out_bound] = (
-                1e6  # because of skimage mc only provides coords, which is has precision limit
-            )
-        sdfs.append(sdf)
-    ret = np.stack(sdfs, -1)
+def kernel_caller(kernels, XYZ, bounds=None, min_only=False):
+    # min_only: caller only needs .min(axis=-1), so elements which cannot be the minimum may be skipped
+    if min_only:
+        ret = culled_kernel_sdfs(kernels, XYZ)
+    else:
+        ret = np.stack([kernel(XYZ, sdf_only=1)[Vars.SDF] for kernel in kernels], -1)
+    if bounds is not None:
+        out_bound = np.zeros(len(XYZ), dtype=bool)
+        for i in range(3):
+            out_bound |= XYZ[:, i] <= bounds[i * 2]
+            out_bound |= XYZ[:, i] >= bounds[i * 2 + 1]
+        ret[out_bound] = (
+            1e6  # because of skimage mc only provides coords, which is has precision limit
+        )
     return ret
 
 
@@ -139,9 +141,7 @@ class OpaqueSphericalMesher(SphericalMesher):
             test_downscale=test_downscale,
             complete_depth_test=self.complete_depth_test,
         )
-        self.frontview_mesher.kernel_caller = lambda k, xyz: kernel_caller(
-            k, xyz, self.bounds
-        )
+        self.frontview_mesher.kernel_caller = partial(kernel_caller, bounds=self.bounds)
         self.background_mesher = CubeSphericalMesher(
             self.cam_pose,
             self.r_min,
@@ -154,8 +154,8 @@ class OpaqueSphericalMesher(SphericalMesher):
             N0=N0,
             N1=N1,
         )
-        self.background_mesher.kernel_caller = lambda k, xyz: kernel_caller(
-            k, xyz, self.bounds
+        self.background_mesher.kernel_caller = partial(
+            kernel_caller, bounds=self.bounds
         )
 
     def __call__(self, kernels):
@@ -181,8 +181,11 @@ class TransparentSphericalMesher(SphericalMesher):
         camera_annotation_frames=None,
     ):
         SphericalMesher.__init__(self, cameras, bounds)
-        self.cameras = cameras
-        self.camera_annotation_frames = camera_annotation_frames
+        # read the camera poses now, the mesher may run in a worker process without the blender scene
+        self.camera_annotation_poses = None
+        if camera_annotation_frames is not None:
+            s, e = camera_annotation_frames
+            self.camera_annotation_poses = camera_annotation_poses(cameras, s, e)
         assert bool(base_90d_resolution is None) ^ bool(pixels_per_cube is None)
         if base_90d_resolution is None:
             base_90d_resolution = int(
@@ -224,12 +227,11 @@ class TransparentSphericalMesher(SphericalMesher):
             N1=N1,
             complete_depth_test=self.complete_depth_test,
         )
-        self.mesher.kernel_caller = lambda k, xyz: kernel_caller(k, xyz, self.bounds)
+        self.mesher.kernel_caller = partial(kernel_caller, bounds=self.bounds)
 
     def __call__(self, kernels):
         with Timer("TransparentSphericalMesher"):
             mesh = self.mesher(kernels)
-            if self.camera_annotation_frames is not None:
-                s, e = self.camera_annotation_frames
-                mesh.camera_annotation(self.cameras, s, e)
+            if self.camera_annotation_poses is not None:
+                mesh.camera_annotation_from_poses(*self.camera_annotation_poses)
             return mesh
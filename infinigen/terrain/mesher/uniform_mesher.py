@@ -13,6 +13,7 @@ from numpy import ascontiguousarray as AC
 from infinigen.terrain.utils import (
     ASDOUBLE,
     ASINT,
+    CFuncsPicklable,
     Mesh,
     Vars,
     load_cdll,
@@ -21,13 +22,15 @@ from infinigen.terrain.utils import (
 )
 from infinigen.terrain.utils import Timer as tTimer
 
+from .culling import culled_kernel_sdfs
+
 logger = logging.getLogger(__name__)
 
 try:
-    from ._marching_cubes_lewiner import marching_cubes
+    from ._marching_cubes_lewiner import marching_cubes, marching_cubes_batch
 except ImportError:
     logger.warning("Could not import marching_cubes, terrain is likely not installed")
-    marching_cubes = None
+    marching_cubes = marching_cubes_batch = None
 
 
 @gin.configurable("UniformMesherTimer")
@@ -37,7 +40,7 @@ class Timer(tTimer):
 
 
 @gin.configurable
-class UniformMesher:
+class UniformMesher(CFuncsPicklable):
     def __init__(
         self,
         bounds,
@@ -45,10 +48,12 @@ class UniformMesher:
         upscale=3,
         enclosed=False,
         bisection_iters=10,
+        batched_marching_cubes=True,
         device="cpu",
         verbose=False,
     ):
         self.enclosed = enclosed
+        self.batched_marching_cubes = batched_marching_cubes
         self.upscale = upscale
         self.bounds = bounds
 
@@ -112,6 +117,20 @@ class UniformMesher:
                 c_int32,
             ],
         )
+        register_func(
+            self,
+            dll,
+            "update_batch",
+            [
+                c_int32,
+                POINTER(c_double),
+                POINTER(c_int32),
+                POINTER(c_double),
+                POINTER(c_int32),
+                POINTER(c_int32),
+                POINTER(c_int32),
+            ],
+        )
         register_func(self, dll, "get_cnt", restype=c_int32)
         register_func(self, dll, "get_coarse_mesh_cnt", [POINTER(c_int32)])
         register_func(self, dll, "bisection_get_positions", [POINTER(c_double)])
@@ -120,23 +139,40 @@ class UniformMesher:
             self, dll, "get_final_mesh", [POINTER(c_double), POINTER(c_int32)]
         )
 
-    def kernel_caller(self, kernels, XYZ):
-        sdfs = []
-        for kernel in kernels:
-            ret = kernel(XYZ, sdf_only=1)
-            sdf = ret[Vars.SDF]
-            if self.enclosed:
-                out_bound = (
-                    (XYZ[:, 0] < self.x_min + self.closing_margin)
-                    | (XYZ[:, 0] > self.x_max - self.closing_margin)
-                    | (XYZ[:, 1] < self.y_min + self.closing_margin)
-                    | (XYZ[:, 1] > self.y_max - self.closing_margin)
-                    | (XYZ[:, 2] < self.z_min + self.closing_margin)
-                    | (XYZ[:, 2] > self.z_max - self.closing_margin)
-                )
-                sdf[out_bound] = 1e6
-            sdfs.append(sdf)
-        return np.stack(sdfs, -1)
+    def kernel_caller(self, kernels, XYZ, min_only=False):
+        # min_only: caller only needs .min(axis=-1), so elements which cannot be the minimum may be skipped
+        if min_only:
+            sdfs = culled_kernel_sdfs(kernels, XYZ)
+        else:
+            sdfs = np.stack(
+                [kernel(XYZ, sdf_only=1)[Vars.SDF] for kernel in kernels], -1
+            )
+        if self.enclosed:
+            out_bound = (
+                (XYZ[:, 0] < self.x_min + self.closing_margin)
+                | (XYZ[:, 0] > self.x_max - self.closing_margin)
+                | (XYZ[:, 1] < self.y_min + self.closing_margin)
+                | (XYZ[:, 1] > self.y_max - self.closing_margin)
+                | (XYZ[:, 2] < self.z_min + self.closing_margin)
+                | (XYZ[:, 2] > self.z_max - self.closing_margin)
+            )
+            sdfs[out_bound] = 1e6
+        return sdfs
+
+    def update_blocks(self, cnt, sdf):
+        S = self.upscale + 1
+        verts_int, verts_frac, faces, vert_counts, face_counts = marching_cubes_batch(
+            sdf.reshape(cnt, S, S, S), 0
+        )
+        self.update_batch(
+            cnt,
+            ASDOUBLE(sdf),
+            ASINT(AC(verts_int, dtype=np.int32)),
+            ASDOUBLE(AC(verts_frac, dtype=np.float64)),
+            ASINT(AC(vert_counts, dtype=np.int32)),
+            ASINT(AC(faces, dtype=np.int32)),
+            ASINT(AC(face_counts, dtype=np.int32)),
+        )
 
     def __call__(self, kernels):
         if marching_cubes is None:
@@ -168,7 +204,9 @@ class UniformMesher:
 
         with Timer("compute sdf"):
             sdf = AC(
-                self.kernel_caller(kernels, positions).min(axis=-1).astype(np.float64)
+                self.kernel_caller(kernels, positions, min_only=True)
+                .min(axis=-1)
+                .astype(np.float64)
             )
 
         with Timer("initial_update"):
@@ -186,23 +224,29 @@ class UniformMesher:
                 self.get_fine_queries(ASDOUBLE(positions))
             with Timer("compute fine sdf and run marching cube"):
                 sdf = np.ascontiguousarray(
-                    self.kernel_caller(kernels, positions.reshape((-1, 3)))
+                    self.kernel_caller(
+                        kernels, positions.reshape((-1, 3)), min_only=True
+                    )
                     .min(axis=-1)
                     .astype(np.float64)
                 )
-                for i in range(cnt):
-                    verts_int, verts_frac, faces, _, _ = marching_cubes(
-                        sdf[i * block_size : (i + 1) * block_size].reshape(S, S, S), 0
-                    )
-                    self.update(
-                        i,
-                        ASDOUBLE(sdf),
-                        ASINT(AC(verts_int.astype(np.int32))),
-                        ASDOUBLE(AC(verts_frac.astype(np.float64))),
-                        len(verts_frac),
-                        ASINT(AC(faces.astype(np.int32))),
-                        len(faces),
-                    )
+                if self.batched_marching_cubes:
+                    self.update_blocks(cnt, sdf)
+                else:
+                    for i in range(cnt):
+                        verts_int, verts_frac, faces, _, _ = marching_cubes(
+                            sdf[i * block_size : (i + 1) * block_size].reshape(S, S, S),
+                            0,
+                        )
+                        self.update(
+                            i,
+                            ASDOUBLE(sdf),
+                            ASINT(AC(verts_int.astype(np.int32))),
+                            ASDOUBLE(AC(verts_frac.astype(np.float64))),
+                            len(verts_frac),
+                            ASINT(AC(faces.astype(np.int32))),
+                            len(faces),
+                        )
 
             with Timer("update"):
                 cnt = self.get_cnt()
@@ -225,7 +269,9 @@ class UniformMesher:
             for it in range_it:
                 self.bisection_get_positions(ASDOUBLE(positions))
                 sdf = np.ascontiguousarray(
-                    self.kernel_caller(kernels, positions.reshape((-1, 3)))
+                    self.kernel_caller(
+                        kernels, positions.reshape((-1, 3)), min_only=True
+                    )
                     .min(axis=-1)
                     .astype(np.float64)
                 )
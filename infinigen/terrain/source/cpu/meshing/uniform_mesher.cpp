@@ -157,12 +157,13 @@ extern "C" {
     // 2 new created
     // 3 ever explored
 
-    void update(
+    // marks neighbors of block c sharing a boundary with an iso surface and writes its mesh at the given offsets
+    void update_block(
         int c,
         double *sdf,
         int *verts_int,
-        double *verts_frac, int N,
-        int *faces, int M
+        double *verts_frac, int N, int N_offset,
+        int *faces, int M, int M_offset
     ) {
         using namespace pretest;
         int x_N = specs::N_coarse[0], y_N = specs::N_coarse[1], z_N = specs::N_coarse[2];
@@ -197,20 +198,10 @@ extern "C" {
                 }
             }
         }
-        while (uniform_mesh::M_cap <= uniform_mesh::M + M) {
-            uniform_mesh::M_cap *= 2;
-            HR(uniform_mesh::faces, uniform_mesh::M_cap * 3);
-        }
-        // dont omp
         for (int i = 0; i < 3 * M; i++)
-            uniform_mesh::faces[3 * uniform_mesh::M + i] = faces[i] + uniform_mesh::N;
-        while (uniform_mesh::N_cap <= uniform_mesh::N + N) {
-            uniform_mesh::N_cap *= 2;
-            HR(uniform_mesh::lr_vertices, uniform_mesh::N_cap * 6);
-        }
+            uniform_mesh::faces[3 * M_offset + i] = faces[i] + N_offset;
         double *current_sdf = sdf + c * S * S * S;
         int t1 = S * S; int t2 = S;
-        // dont omp
         for (int i = 0; i < N; i++) {
             int low = 0, high = 1;
             double sdf_floor = current_sdf[
@@ -228,14 +219,69 @@ extern "C" {
             }
             for (int j = 0; j < 3; j++) {
                 assert(verts_frac[i * 3 + j] >= 0 && verts_frac[i * 3 + j] <= 1);
-                uniform_mesh::lr_vertices[6 * uniform_mesh::N + i * 6 + 2 * j + low] = verts_int[i * 3 + j] + int_floor(verts_frac[i * 3 + j]) + newfound[c * 3 + j] * U;
-                uniform_mesh::lr_vertices[6 * uniform_mesh::N + i * 6 + 2 * j + high] = verts_int[i * 3 + j] + int_ceil(verts_frac[i * 3 + j]) + newfound[c * 3 + j] * U;
+                uniform_mesh::lr_vertices[6 * N_offset + i * 6 + 2 * j + low] = verts_int[i * 3 + j] + int_floor(verts_frac[i * 3 + j]) + newfound[c * 3 + j] * U;
+                uniform_mesh::lr_vertices[6 * N_offset + i * 6 + 2 * j + high] = verts_int[i * 3 + j] + int_ceil(verts_frac[i * 3 + j]) + newfound[c * 3 + j] * U;
             }
         }
+    }
+
+    void reserve_mesh(int N, int M) {
+        while (uniform_mesh::M_cap <= uniform_mesh::M + M) {
+            uniform_mesh::M_cap *= 2;
+            HR(uniform_mesh::faces, uniform_mesh::M_cap * 3);
+        }
+        while (uniform_mesh::N_cap <= uniform_mesh::N + N) {
+            uniform_mesh::N_cap *= 2;
+            HR(uniform_mesh::lr_vertices, uniform_mesh::N_cap * 6);
+        }
+    }
+
+    void update(
+        int c,
+        double *sdf,
+        int *verts_int,
+        double *verts_frac, int N,
+        int *faces, int M
+    ) {
+        reserve_mesh(N, M);
+        update_block(c, sdf, verts_int, verts_frac, N, uniform_mesh::N, faces, M, uniform_mesh::M);
         uniform_mesh::N += N;
         uniform_mesh::M += M;
     }
 
+    // all cnt blocks at once, the mesh of block c is vert_counts[c] vertices and face_counts[c] faces,
+    // concatenated in block order with faces indexing the vertices of their own block
+    void update_batch(
+        int cnt,
+        double *sdf,
+        int *verts_int,
+        double *verts_frac, int *vert_counts,
+        int *faces, int *face_counts
+    ) {
+        int *N_offsets, *M_offsets;
+        HM(N_offsets, cnt + 1);
+        HM(M_offsets, cnt + 1);
+        N_offsets[0] = M_offsets[0] = 0;
+        for (int c = 0; c < cnt; c++) {
+            N_offsets[c + 1] = N_offsets[c] + vert_counts[c];
+            M_offsets[c + 1] = M_offsets[c] + face_counts[c];
+        }
+        reserve_mesh(N_offsets[cnt], M_offsets[cnt]);
+        // blocks write disjoint ranges of the mesh, and neighbor flags only ever go from 0 to 2
+        #pragma omp parallel for
+        for (int c = 0; c < cnt; c++) {
+            update_block(
+                c, sdf,
+                verts_int + 3 * N_offsets[c], verts_frac + 3 * N_offsets[c], vert_counts[c], uniform_mesh::N + N_offsets[c],
+                faces + 3 * M_offsets[c], face_counts[c], uniform_mesh::M + M_offsets[c]
+            );
+        }
+        uniform_mesh::N += N_offsets[cnt];
+        uniform_mesh::M += M_offsets[cnt];
+        safefree(N_offsets);
+        safefree(M_offsets);
+    }
+
     int get_cnt() {
         using namespace pretest;
         int x_N = specs::N_coarse[0], y_N = specs::N_coarse[1], z_N = specs::N_coarse[2];
@@ -4,33 +4,167 @@
 # Authors: Zeyu Ma
 
 
+import hashlib
+import logging
+import os
+import pickle
+import uuid
 from ctypes import POINTER, c_float, c_int32, c_size_t
+from pathlib import Path
 
+import gin
 import numpy as np
 from numpy import ascontiguousarray as AC
 
+import infinigen
 from infinigen.terrain.utils import (
     ASFLOAT,
     ASINT,
     KERNELDATATYPE_DIMS,
     KERNELDATATYPE_NPTYPE,
+    NODE_ATTRS_AVAILABLE,
+    CFuncsPicklable,
     KernelDataType,
     Mesh,
+    Nodes,
     Vars,
     load_cdll,
     register_func,
 )
 
-from .kernelizer import Kernelizer
+from .kernelizer import Kernelizer, my_getattr
 
+logger = logging.getLogger(__name__)
 
-class SurfaceKernel:
+
+def _value_repr(value):
+    if isinstance(value, (str, bool, int, float)) or value is None:
+        return value
+    try:
+        return tuple(_value_repr(v) for v in value)
+    except TypeError:
+        return str(value)
+
+
+def _node_tree_desc(node_tree, desc, seen):
+    if node_tree.name in seen:
+        return
+    seen.add(node_tree.name)
+    desc.append(("tree", node_tree.name))
+    for node in node_tree.nodes:
+        item = [node.bl_idname, node.name]
+        if node.bl_idname == Nodes.ColorRamp:
+            ramp = node.color_ramp
+            item.append((ramp.color_mode, ramp.interpolation))
+            item.append([(e.position, tuple(e.color)) for e in ramp.elements])
+        elif node.bl_idname == Nodes.FloatCurve:
+            item.append(
+                [[tuple(p.location) for p in c.points] for c in node.mapping.curves]
+            )
+        else:
+            for attr in NODE_ATTRS_AVAILABLE.get(node.bl_idname, []):
+                item.append(_value_repr(my_getattr(node, attr)))
+        if node.bl_idname == Nodes.Value:
+            item.append(node.outputs[0].default_value)
+        elif node.bl_idname == Nodes.InputColor:
+            item.append(tuple(node.color))
+        elif node.bl_idname == Nodes.Vector:
+            item.append(tuple(node.vector))
+        for socket in node.inputs:
+            if hasattr(socket, "default_value"):
+                item.append((socket.identifier, _value_repr(socket.default_value)))
+        desc.append(tuple(item))
+        if node.bl_idname == Nodes.Group:
+            _node_tree_desc(node.node_tree, desc, seen)
+    for link in node_tree.links:
+        desc.append(
+            (
+                link.from_node.name,
+                link.from_socket.identifier,
+                link.to_node.name,
+                link.to_socket.identifier,
+            )
+        )
+
+
+def modifier_key(name, modifier):
+    """
+    Hash of everything Kernelizer reads from a geometry nodes modifier, without generating any code
+    """
+    desc = [infinigen.__version__, name]
+    _node_tree_desc(modifier.node_group, desc, set())
+    return hashlib.blake2b(repr(desc).encode(), digest_size=16).hexdigest()
+
+
+@gin.configurable
+class KernelizerCache:
+    """
+    Kernelized (inputs, outputs) of surface modifiers, keyed by modifier_key, so that each surface is
+    kernelized once per process. When folder is set (Terrain uses its on the fly asset folder, which
+    coarse and fine tasks share) results are also persisted there as pickles.
+    """
+
+    _inst = None
+
+    @classmethod
+    def instance(cls):
+        if cls._inst is None:
+            cls._inst = cls()
+        return cls._inst
+
+    def __init__(self, enabled=True, persist=True):
+        self.enabled = enabled
+        self.persist = persist
+        self.folder = None
+        self.memory = {}
+        self.dlls = {}
+
+    def load_dll(self, name, device):
+        if (name, device) not in self.dlls:
+            self.dlls[name, device] = load_cdll(
+                f"terrain/lib/{device}/surfaces/{name}.so"
+            )
+        return self.dlls[name, device]
+
+    def _path(self, key):
+        if self.persist and self.folder is not None:
+            return Path(self.folder) / f"{key}.pkl"
+        return None
+
+    def __call__(self, name, modifier):
+        if not self.enabled:
+            _, inputs, outputs = Kernelizer()(modifier)
+            return inputs, outputs
+
+        key = modifier_key(name, modifier)
+        if key in self.memory:
+            return self.memory[key]
+
+        path = self._path(key)
+        if path is not None and path.exists():
+            with path.open("rb") as f:
+                self.memory[key] = pickle.load(f)
+            return self.memory[key]
+
+        _, inputs, outputs = Kernelizer()(modifier)
+        self.memory[key] = inputs, outputs
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+            with tmp.open("wb") as f:
+                pickle.dump((inputs, outputs), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        return inputs, outputs
+
+
+class SurfaceKernel(CFuncsPicklable):
     def __init__(self, name, attribute, modifier, device):
         self.name = name
         self.attribute = attribute
         self.device = device
-        _, inputs, outputs = Kernelizer()(modifier)
-        dll = load_cdll(f"terrain/lib/{self.device}/surfaces/{name}.so")
+        cache = KernelizerCache.instance()
+        inputs, outputs = cache(name, modifier)
+        dll = cache.load_dll(name, self.device)
         call_param_type = [c_size_t]
         self.use_position = Vars.Position in inputs
         if self.use_position:
@@ -5,7 +5,14 @@
 
 
 from .camera import get_caminfo
-from .ctype_util import ASDOUBLE, ASFLOAT, ASINT, load_cdll, register_func
+from .ctype_util import (
+    ASDOUBLE,
+    ASFLOAT,
+    ASINT,
+    CFuncsPicklable,
+    load_cdll,
+    register_func,
+)
 from .image_processing import (
     boundary_smooth,
     get_normal,
@@ -40,7 +47,14 @@ from .kernelizer_util import (
     var_list,
 )
 from .logging import Timer
-from .mesh import Mesh, Vars, move_modifier, write_attributes
+from .mesh import (
+    Mesh,
+    MeshBuilder,
+    Vars,
+    camera_annotation_poses,
+    move_modifier,
+    write_attributes,
+)
 from .random import (
     chance,
     drive_param,
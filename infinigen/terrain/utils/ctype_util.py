@@ -4,7 +4,7 @@
 # Authors: Zeyu Ma
 
 
-from ctypes import CDLL, POINTER, RTLD_LOCAL, c_double, c_float, c_int32
+from ctypes import CDLL, POINTER, RTLD_LOCAL, _Pointer, c_double, c_float, c_int32
 from pathlib import Path
 
 
@@ -28,8 +28,75 @@ def register_func(me, dll, name, argtypes=[], restype=None, caller_name=None):
     func = getattr(me, caller_name)
     func.argtypes = argtypes
     func.restype = restype
+    # remembered so that CFuncsPicklable objects can re-register after unpickling
+    me.__dict__.setdefault("_cfuncs", {})[caller_name] = (
+        str(dll._name),
+        name,
+        list(argtypes),
+        restype,
+    )
 
 
 def load_cdll(path):
     root = Path(__file__).parent.parent.parent
     return CDLL(root / path, mode=RTLD_LOCAL)
+
+
+def _pack_ctype(t):
+    # pointer types are created on the fly by POINTER() and cannot be pickled by reference
+    if isinstance(t, type) and issubclass(t, _Pointer):
+        return ("POINTER", _pack_ctype(t._type_))
+    return t
+
+
+def _unpack_ctype(t):
+    if isinstance(t, tuple):
+        return POINTER(_unpack_ctype(t[1]))
+    return t
+
+
+class CFuncsPicklable:
+    """
+    Mixin for objects holding functions bound by register_func.
+
+    Bound ctypes functions cannot be pickled, so they are dropped from the state and the
+    libraries are loaded again when unpickling, e.g. in a spawned worker process.
+    Subclasses whose library keeps state set up by an init call should override
+    _init_cdll to repeat it.
+    """
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        cfuncs = state.pop("_cfuncs", {})
+        for caller_name in cfuncs:
+            state.pop(caller_name, None)
+        state["_cfuncs"] = {
+            caller_name: (
+                path,
+                name,
+                [_pack_ctype(t) for t in argtypes],
+                _pack_ctype(restype),
+            )
+            for caller_name, (path, name, argtypes, restype) in cfuncs.items()
+        }
+        return state
+
+    def __setstate__(self, state):
+        cfuncs = state.pop("_cfuncs")
+        self.__dict__.update(state)
+        dlls = {}
+        for caller_name, (path, name, argtypes, restype) in cfuncs.items():
+            if path not in dlls:
+                dlls[path] = CDLL(path, mode=RTLD_LOCAL)
+            register_func(
+                self,
+                dlls[path],
+                name,
+                [_unpack_ctype(t) for t in argtypes],
+                _unpack_ctype(restype),
+                caller_name,
+            )
+        self._init_cdll()
+
+    def _init_cdll(self):
+        pass
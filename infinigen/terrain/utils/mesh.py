@@ -140,7 +140,7 @@ class Mesh:
         elif vertices is not None:
             _trimesh = trimesh.Trimesh(
                 vertices=vertices,
-                faces=faces.astype(np.int32),
+                faces=faces.astype(np.int32, copy=False),
                 vertex_attributes=vertex_attributes,
                 process=False,
             )
@@ -337,67 +337,17 @@ class Mesh:
         return normals
 
     def cat(meshes):
-        verts = np.zeros((0, 3))
-        faces = np.zeros((0, 3), dtype=int)
-        lenv = 0
-        vertex_attributes = {}
+        builder = MeshBuilder()
         for mesh in meshes:
-            verts = np.concatenate((verts, mesh.vertices), 0)
-            faces = np.concatenate((faces, mesh.faces + lenv), 0)
-
-            for attr in mesh.vertex_attributes:
-                if mesh.vertex_attributes[attr].ndim == 1:
-                    mesh.vertex_attributes[attr] = mesh.vertex_attributes[attr].reshape(
-                        (-1, 1)
-                    )
-                mesh_va = mesh.vertex_attributes[attr]
-                if attr not in vertex_attributes:
-                    va = np.zeros(
-                        (lenv, mesh.vertex_attributes[attr].shape[1]),
-                        dtype=mesh.vertex_attributes[attr].dtype,
-                    )
-                else:
-                    va = vertex_attributes[attr]
-                vertex_attributes[attr] = np.concatenate((va, mesh_va))
-            lenv += len(mesh.vertices)
-
-            for attr in vertex_attributes:
-                if len(vertex_attributes[attr]) != lenv:
-                    fillup = np.zeros(
-                        (
-                            lenv - len(vertex_attributes[attr]),
-                            vertex_attributes[attr].shape[1],
-                        ),
-                        dtype=vertex_attributes[attr].dtype,
-                    )
-                    vertex_attributes[attr] = np.concatenate(
-                        (vertex_attributes[attr], fillup)
-                    )
-        return Mesh(vertices=verts, faces=faces, vertex_attributes=vertex_attributes)
+            builder.add_mesh(mesh)
+        return builder.build()
 
     def camera_annotation(self, cameras, fs, fe, relax=0.01):
-        cam_poses = []
-        coords_trans_matrix = np.array(
-            [[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, -1, 0], [0, 0, 0, 1]]
-        )
-        fc = bpy.context.scene.frame_current
-        for f in range(fs, fe + 1):
-            bpy.context.scene.frame_set(f)
-            for cam in cameras:
-                cam_pose = np.array(cam.matrix_world)
-                cam_pose = np.dot(np.array(cam_pose), coords_trans_matrix)
-                cam_poses.append(cam_pose)
-                fov_rad = cam.data.angle
-        bpy.context.scene.frame_set(fc)
-
-        H, W = (
-            bpy.context.scene.render.resolution_y,
-            bpy.context.scene.render.resolution_x,
+        self.camera_annotation_from_poses(
+            *camera_annotation_poses(cameras, fs, fe), relax
         )
-        fov0 = np.arctan(H / 2 / (W / 2 / np.tan(fov_rad / 2))) * 2
-        fov = (fov0, fov_rad)
-        K = getK(fov, H, W)
 
+    def camera_annotation_from_poses(self, cam_poses, K, H, W, relax=0.01):
         self.vertex_attributes["invisible"] = np.zeros(len(self.vertices), bool)
 
         for cam_pose in cam_poses:
@@ -424,6 +374,92 @@ class Mesh:
         ).astype(np.float32)
 
 
+def camera_annotation_poses(cameras, fs, fe):
+    # reads the animated cameras from the blender scene, returns (cam_poses, K, H, W)
+    cam_poses = []
+    coords_trans_matrix = np.array(
+        [[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, -1, 0], [0, 0, 0, 1]]
+    )
+    fc = bpy.context.scene.frame_current
+    for f in range(fs, fe + 1):
+        bpy.context.scene.frame_set(f)
+        for cam in cameras:
+            cam_pose = np.array(cam.matrix_world)
+            cam_pose = np.dot(np.array(cam_pose), coords_trans_matrix)
+            cam_poses.append(cam_pose)
+            fov_rad = cam.data.angle
+    bpy.context.scene.frame_set(fc)
+
+    H, W = (
+        bpy.context.scene.render.resolution_y,
+        bpy.context.scene.render.resolution_x,
+    )
+    fov0 = np.arctan(H / 2 / (W / 2 / np.tan(fov_rad / 2))) * 2
+    fov = (fov0, fov_rad)
+    K = getK(fov, H, W)
+    return cam_poses, K, H, W
+
+
+class MeshBuilder:
+    """
+    Accumulates vertices, faces and vertex attributes of mesh pieces, then concatenates them in one pass.
+
+    add() only keeps references, so pieces may be views into larger buffers or memory mapped arrays,
+    and build() copies each of them exactly once into preallocated outputs. Attributes missing from a
+    piece are zero filled, and 1D attributes become (N, 1), as in the output of Mesh.cat.
+    """
+
+    def __init__(self):
+        self.pieces = []
+        self.n_verts = 0
+        self.n_faces = 0
+
+    def add(self, vertices, faces, vertex_attributes=None):
+        vertex_attributes = vertex_attributes or {}
+        for attr, value in vertex_attributes.items():
+            assert len(value) == len(vertices), attr
+        self.pieces.append((vertices, faces, vertex_attributes))
+        self.n_verts += len(vertices)
+        self.n_faces += len(faces)
+
+    def add_mesh(self, mesh):
+        self.add(mesh.vertices, mesh.faces, dict(mesh.vertex_attributes))
+
+    def _attribute_layout(self):
+        widths, dtypes = {}, {}
+        for _, _, vertex_attributes in self.pieces:
+            for attr, value in vertex_attributes.items():
+                if attr not in widths:
+                    widths[attr] = 1 if value.ndim == 1 else value.shape[1]
+                    dtypes[attr] = value.dtype
+                else:
+                    dtypes[attr] = np.result_type(dtypes[attr], value.dtype)
+        return widths, dtypes
+
+    def build(self):
+        widths, dtypes = self._attribute_layout()
+        verts = np.empty((self.n_verts, 3), dtype=np.float64)
+        faces = np.empty((self.n_faces, 3), dtype=np.int32)
+        vertex_attributes = {
+            attr: np.zeros((self.n_verts, widths[attr]), dtype=dtypes[attr])
+            for attr in widths
+        }
+
+        lenv = lenf = 0
+        for piece_verts, piece_faces, piece_attributes in self.pieces:
+            nv, nf = len(piece_verts), len(piece_faces)
+            verts[lenv : lenv + nv] = piece_verts
+            np.add(piece_faces, lenv, out=faces[lenf : lenf + nf], casting="unsafe")
+            for attr, value in piece_attributes.items():
+                vertex_attributes[attr][lenv : lenv + nv] = value.reshape(
+                    (nv, widths[attr])
+                )
+            lenv += nv
+            lenf += nf
+
+        return Mesh(vertices=verts, faces=faces, vertex_attributes=vertex_attributes)
+
+
 def move_modifier(target_obj, m):
     with Timer(f"copying {m.name}"):
         modifier = target_obj.modifiers.new(m.name, "NODES")
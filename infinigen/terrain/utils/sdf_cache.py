@@ -0,0 +1,132 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import gin
+import numpy as np
+
+import infinigen
+
+logger = logging.getLogger(__name__)
+
+COMPLETE_MARKER = "complete"
+
+
+def _update_array(h, x):
+    x = np.ascontiguousarray(x)
+    h.update(f"{x.dtype.str}{x.shape}".encode())
+    h.update(x.tobytes())
+
+
+def surface_kernel_key(surface):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(
+        f"{surface.name}|{surface.attribute}|{sorted(surface.outputs.items())}".encode()
+    )
+    for dtype in sorted(surface.imp_values_of_type.keys()):
+        h.update(str(dtype).encode())
+        _update_array(h, surface.imp_values_of_type[dtype])
+    return h.hexdigest()
+
+
+def element_key(element):
+    """
+    Hash of everything which determines an element's outputs besides the query positions
+    """
+    h = hashlib.blake2b(digest_size=16)
+    desc = [
+        infinigen.__version__,
+        element.__class__.__name__,
+        getattr(element, "meta_params", None),
+        element.material,
+        getattr(element, "aux_names", None),
+        element.height_offset,
+    ]
+    h.update(repr(desc).encode())
+    for name in [
+        "int_params",
+        "float_params",
+        "int_params2",
+        "float_params2",
+        "int_params3",
+        "float_params3",
+    ]:
+        _update_array(h, getattr(element, name))
+    if element.whole_bbox is not None:
+        _update_array(h, np.asarray(element.whole_bbox))
+    for surface in element.displacement:
+        h.update(surface_kernel_key(surface).encode())
+    return h.hexdigest()
+
+
+@gin.configurable
+class SDFTileCache:
+    """
+    Content addressed on-disk cache of Element outputs, one folder of .npy tiles per
+    (element parameters, displacement surfaces, query positions, sdf_only) key.
+
+    Tiles are loaded memory mapped copy-on-write, so callers may modify the returned arrays
+    without touching the cache. Queries smaller than min_points are not worth the disk round
+    trip and are always evaluated.
+    """
+
+    def __init__(self, folder, enabled=False, min_points=2**16, max_size_gb=20):
+        self.folder = Path(folder)
+        self.enabled = enabled
+        self.min_points = min_points
+        self.max_size = max_size_gb * 1e9
+        self.size = None
+        self.hits = self.misses = 0
+
+    def key(self, element, positions, sdf_only):
+        if not self.enabled or len(positions) < self.min_points:
+            return None
+        h = hashlib.blake2b(digest_size=20)
+        h.update(element_key(element).encode())
+        h.update(str(bool(sdf_only)).encode())
+        _update_array(h, positions)
+        return h.hexdigest()
+
+    def tile_path(self, key):
+        return self.folder / key[:2] / key
+
+    def load(self, key):
+        path = self.tile_path(key)
+        if not (path / COMPLETE_MARKER).exists():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {p.stem: np.load(p, mmap_mode="c") for p in sorted(path.glob("*.npy"))}
+
+    def _current_size(self):
+        if self.size is None:
+            self.size = sum(
+                f.stat().st_size for f in self.folder.rglob("*.npy") if f.is_file()
+            )
+        return self.size
+
+    def save(self, key, ret):
+        nbytes = sum(np.asarray(v).nbytes for v in ret.values())
+        if self._current_size() + nbytes > self.max_size:
+            logger.debug(f"{self.__class__.__name__} is full, not saving {key}")
+            return
+
+        # write into a private folder and rename, so readers never see a partial tile
+        path = self.tile_path(key)
+        tmp = path.parent / f".{key}.{uuid.uuid4().hex}"
+        tmp.mkdir(parents=True)
+        try:
+            for var, value in ret.items():
+                np.save(tmp / f"{var}.npy", np.asarray(value))
+            (tmp / COMPLETE_MARKER).touch()
+            os.rename(tmp, path)
+            self.size += nbytes
+        except OSError:
+            # another process saved the same tile first
+            shutil.rmtree(tmp, ignore_errors=True)
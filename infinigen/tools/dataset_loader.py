@@ -5,13 +5,23 @@
 
 import json
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import imageio
 import numpy as np
 
+from .compress_masks import recover
 from .suffixes import parse_suffix
 
+os.environ.setdefault(
+    "OPENCV_IO_ENABLE_OPENEXR", "1"
+)  # must be set before cv2 is imported
+
 # import torch.utils.data IMPORTED ONLY IF USING get_infinigen_dataset
 
 
@@ -20,7 +30,7 @@ logger = logging.getLogger(__name__)
 ALLOWED_IMAGE_TYPES = {
     # Read docs/GroundTruthAnnotations.md for more explanations
     "Image_png",
-    # ('Image', '.exr'), # NOT IMPLEMENTED
+    "Image_exr",
     "camview_npz",  # intrinisic, extrinsic, etc
     # names available via EITHER blender_gt.gin and opengl_gt.gin
     "Depth_npy",
@@ -64,7 +74,7 @@ def get_blocksize(scene_folder):
 
 def get_framebounds_inclusive(scene_folder):
     rgb = scene_folder / "frames" / "Image" / "camera_0"
-    first, *_, last = sorted(rgb.glob("*.png"))
+    first, *_, last = sorted(p for p in rgb.iterdir() if p.suffix in [".png", ".exr"])
     return (parse_suffix(first)["frame"], parse_suffix(last)["frame"])
 
 
@@ -90,7 +100,33 @@ def get_frame_path(scene_folder, cam: int, frame_idx, data_type) -> Path:
     return Path(scene_folder) / "frames" / data_type_name / f"camera_{cam}" / imgname
 
 
+def load_exr(path):
+    import cv2
+
+    img = cv2.imread(str(path), cv2.IMREAD_ANYCOLOR | cv2.IMREAD_ANYDEPTH)
+    if img is None:
+        raise ValueError(f"Could not read {path=}, is OpenEXR support enabled in cv2?")
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return img
+
+
+def is_compressed_mask(d: dict):
+    # see compress_masks.compress
+    return set(d.keys()) == {"vals", "indices", "shape"}
+
+
 class InfinigenSceneDataset:
+    """
+    Per-frame access to the renders of one scene folder.
+
+    Optionally:
+    - num_workers threads decode a frame's files concurrently
+    - prefetch frames after the most recently requested one are decoded in the background
+    - cache_size most recently decoded frames are kept in memory
+    - mmap loads .npy files as read-only memory maps instead of reading them in full
+    """
+
     def __init__(
         self,
         scene_folder: Path,
@@ -99,9 +135,18 @@ class InfinigenSceneDataset:
         ] = None,  # see ALLOWED_IMAGE_KEYS above. Use 'None' to retrieve all available PNG datatypes
         cameras=None,
         gt_for_first_camera_only=True,
+        num_workers=0,
+        prefetch=0,
+        cache_size=0,
+        mmap=False,
     ):
         self.scene_folder = Path(scene_folder)
         self.gt_for_first_camera_only = gt_for_first_camera_only
+        self.num_workers = num_workers
+        self.prefetch = prefetch
+        self.cache_size = cache_size
+        self.mmap = mmap
+        self._init_loading_state()
 
         if data_types is None:
             data_types = get_imagetypes_available(self.scene_folder)
@@ -125,18 +170,51 @@ class InfinigenSceneDataset:
         first, last = self.framebounds_inclusive
         return last - first
 
+    def _init_loading_state(self):
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._pending = {}
+        self.hits = self.misses = 0
+
+    def __getstate__(self):
+        # threads and futures cannot be pickled, e.g. by torch DataLoader workers
+        state = self.__dict__.copy()
+        for k in ["_pool", "_pool_pid", "_lock", "_cache", "_pending"]:
+            del state[k]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_loading_state()
+
+    def _executor(self):
+        n_threads = max(self.num_workers, 1 if self.prefetch > 0 else 0)
+        if n_threads == 0:
+            return None
+        # a forked process does not inherit its parent's threads
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = ThreadPoolExecutor(n_threads)
+            self._pool_pid = os.getpid()
+            self._pending = {}
+        return self._pool
+
     @staticmethod
-    def load_any_filetype(path):
+    def load_any_filetype(path, mmap=False):
         match path.suffix:
             case ".png":
                 return imageio.imread(path)
             case ".exr":
-                raise NotImplementedError
+                return load_exr(path)
             case ".npy":
-                return np.load(path)
+                return np.load(path, mmap_mode="r" if mmap else None)
             case ".npz":
-                return dict(np.load(path))
-            case "json":
+                d = dict(np.load(path))
+                if is_compressed_mask(d):
+                    return recover(d)
+                return d
+            case ".json":
                 with path.open("r") as f:
                     return json.load(f)
             case _:
@@ -144,7 +222,7 @@ class InfinigenSceneDataset:
 
     def _imagetypes_to_load(self, cam: int):
         for data_type in self.data_types:
-            dtypename = data_type[0]
+            dtypename = data_type.split("_")[0]
             if (
                 self.gt_for_first_camera_only
                 and cam != 0
@@ -169,21 +247,80 @@ class InfinigenSceneDataset:
         frame_num = self.framebounds_inclusive[0] + i
         return get_frame_path(self.scene_folder, cam, frame_num, dtype)
 
-    def __getitem__(self, i):
-        def get_camera_images(cam: int):
-            imgs = {}
-            for dtype in self._imagetypes_to_load(cam):
-                path = self.frame_path(i, cam, dtype)
-                imgs[dtype] = self.load_any_filetype(path)
-            return imgs
+    def load_frame(self, i, parallel=True):
+        files = [
+            (cam, dtype, self.frame_path(i, cam, dtype))
+            for cam in self.cameras
+            for dtype in self._imagetypes_to_load(cam)
+        ]
+
+        def load(path):
+            return self.load_any_filetype(path, mmap=self.mmap)
+
+        pool = self._executor()
+        if parallel and pool is not None and self.num_workers > 1:
+            values = list(pool.map(load, [path for *_, path in files]))
+        else:
+            values = [load(path) for *_, path in files]
 
-        per_camera_data = [get_camera_images(i) for i in self.cameras]
+        per_camera_data = {cam: {} for cam in self.cameras}
+        for (cam, dtype, _), value in zip(files, values):
+            per_camera_data[cam][dtype] = value
+        per_camera_data = [per_camera_data[cam] for cam in self.cameras]
 
         if len(self.cameras) == 1:
             return per_camera_data[0]
         else:
             return per_camera_data
 
+    def _cache_put(self, i, frame):
+        if self.cache_size <= 0:
+            return
+        self._cache[i] = frame
+        self._cache.move_to_end(i)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _schedule_prefetch(self, i):
+        pool = self._executor()
+        if pool is None:
+            return
+        window = range(i + 1, min(i + 1 + self.prefetch, len(self)))
+        for j in [j for j in self._pending if j not in window]:
+            self._pending.pop(j).cancel()  # random access, stop reading ahead elsewhere
+        for j in window:
+            if j not in self._cache and j not in self._pending:
+                # prefetches already run on the pool, so they load their files serially
+                self._pending[j] = pool.submit(self.load_frame, j, parallel=False)
+
+    def __getitem__(self, i):
+        with self._lock:
+            if i in self._cache:
+                self._cache.move_to_end(i)
+                frame = self._cache[i]
+                self.hits += 1
+            else:
+                frame = None
+                self.misses += 1
+            future = self._pending.pop(i, None)
+            self._schedule_prefetch(i)
+
+        if frame is not None:
+            return frame
+
+        frame = future.result() if future is not None else self.load_frame(i)
+        with self._lock:
+            self._cache_put(i, frame)
+        return frame
+
+    def benchmark(self, n=None):
+        """Read the first n frames in order, returning the achieved frames per second"""
+        n = len(self) if n is None else min(n, len(self))
+        start = time.perf_counter()
+        for i in range(n):
+            self[i]
+        return n / (time.perf_counter() - start)
+
 
 def get_infinigen_dataset(data_folder: Path, mode="concat", validate=False, **kwargs):
     import torch.utils.data
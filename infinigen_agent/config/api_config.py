@@ -14,6 +14,10 @@ USE_V1_PATH = True  # 使用 /v1 路径（已确认正确）
 # API 请求配置
 API_TIMEOUT = 60  # 请求超时时间（秒）
 MAX_RETRIES = 3  # 最大重试次数
+POOL_CONNECTIONS = 4  # 连接池缓存的主机数
+POOL_MAXSIZE = 16  # 每个主机的最大并发连接数
+CACHE_SIZE = 256  # 相同请求的结果缓存条数（0 表示不缓存）
+CACHE_TTL = 600  # 缓存有效期（秒）
 
 # 模型配置
 DEFAULT_MODEL = "Qwen2.5-7B-infinigen"  # vLLM 部署的模型名称
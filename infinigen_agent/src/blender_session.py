@@ -0,0 +1,87 @@
+"""
+Blender 场景会话模块
+在同一个 bpy 会话中完成 加载 → 改色 → 渲染 → 保存，避免重复加载大场景
+"""
+
+import time
+from pathlib import Path
+from typing import Optional
+
+import bpy
+from src.scene_color_applier import SceneColorApplier
+from src.scene_renderer import SceneRenderer
+
+
+class BlenderSceneSession:
+    """
+    Blender 场景会话
+
+    只加载一次场景文件（模板以只读方式打开，不复制、不回写），
+    颜色应用和渲染共用内存中的同一份场景，修改后的场景由 save() 同步写入 output_path。
+
+    不在 fork 出的子进程中后台保存：Blender 进程是多线程的（渲染、依赖图线程），
+    fork 后子进程可能卡在父进程其他线程持有的锁上。
+    """
+
+    def __init__(self, scene_path: str, output_path: Optional[str] = None):
+        """
+        初始化场景会话
+
+        Args:
+            scene_path: 要打开的 .blend 文件（模板或已生成的场景），不会被修改
+            output_path: 修改后场景的保存路径，默认与 scene_path 相同
+        """
+        self.scene_path = Path(scene_path)
+        self.output_path = Path(output_path) if output_path else self.scene_path
+        self.load_time = None
+        self.save_time = None
+
+        self.load_scene()
+        # 两者都不再自行加载场景，直接使用当前已加载的场景
+        self.applier = SceneColorApplier()
+        self.renderer = SceneRenderer()
+
+    def load_scene(self):
+        """只读加载场景（不加载 UI，不修改源文件）"""
+        file_size = self.scene_path.stat().st_size / (1024 * 1024)  # MB
+        print(f"  场景文件大小: {file_size:.2f} MB")
+
+        start_time = time.time()
+        try:
+            bpy.ops.wm.open_mainfile(filepath=str(self.scene_path), load_ui=False)
+        except Exception as e:
+            print(f"✗ 加载场景失败: {e}")
+            raise
+        self.load_time = time.time() - start_time
+        print(f"✓ 成功加载场景: {self.scene_path}（耗时: {self.load_time:.2f} 秒）")
+
+    def save(self) -> str:
+        """
+        同步保存当前场景到 output_path
+
+        Returns:
+            保存路径
+        """
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path = str(self.output_path)
+
+        # copy=True: 不改变当前会话的文件路径，避免之后误写回模板
+        start_time = time.time()
+        bpy.ops.wm.save_as_mainfile(filepath=output_path, copy=True)
+        self.save_time = time.time() - start_time
+        print(f"✓ 场景已保存到: {output_path}（耗时: {self.save_time:.2f} 秒）")
+        return output_path
+
+    def render_image(self, output_path: str, **kwargs) -> str:
+        """渲染当前内存中的场景，参数同 SceneRenderer.render_image"""
+        return self.renderer.render_image(output_path=output_path, **kwargs)
+
+    def close(self):
+        """结束会话（场景在 save() 中已同步写入，无需等待）"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
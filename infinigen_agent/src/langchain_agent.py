@@ -4,6 +4,8 @@
 """
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
 from pathlib import Path
 import logging
@@ -21,6 +23,7 @@ from langchain_openai import ChatOpenAI
 from src.scene_generator import SceneGenerator
 from src.scene_color_applier import SceneColorApplier
 from src.scene_renderer import SceneRenderer
+from src.blender_session import BlenderSceneSession
 from src.color_parser import ColorParser
 from src.procedural_furniture_generator import ProceduralFurnitureGenerator
 from src.room_type_detector import detect_room_type
@@ -294,34 +297,48 @@ class LangChainInfinigenAgent:
         print("\n📋 模式: 模板池模式（快速）")
         print("=" * 60)
         
+        # 各步骤耗时（秒），随结果返回，便于前端展示延迟分布
+        timings = {}
+        total_start = time.perf_counter()
+        
         # 步骤2: 并行执行 - 生成颜色方案和场景
         print("\n步骤2: 并行生成颜色方案和场景...")
         
-        # 2.1 生成颜色方案
-        print("  2.1 生成家具颜色方案...")
-        try:
-            color_scheme_json = self.generate_furniture_colors(user_input)
-            print(f"  ✓ 颜色方案生成成功")
-            print(f"  {color_scheme_json[:200]}...")  # 显示前200字符
-        except Exception as e:
+        # 2.1 生成颜色方案（在后台线程中等待 LLM，主线程同时准备和加载场景；bpy 只在主线程中使用）
+        print("  2.1 生成家具颜色方案（后台）...")
+        
+        def timed_generate_colors():
+            start = time.perf_counter()
+            try:
+                return self.generate_furniture_colors(user_input)
+            finally:
+                timings["color_generation"] = time.perf_counter() - start
+        
+        color_executor = ThreadPoolExecutor(max_workers=1)
+        color_future = color_executor.submit(timed_generate_colors)
+        color_executor.shutdown(wait=False)
+        
+        def color_failure(e):
             print(f"  ✗ 颜色方案生成失败: {e}")
+            timings["total"] = time.perf_counter() - total_start
             return {
                 "success": False,
                 "error": "颜色生成失败",
-                "message": str(e)
+                "message": str(e),
+                "timings": timings
             }
         
         # 2.2 生成场景（并行）- 优先使用模板池
         print("  2.2 生成场景...")
+        scene_start = time.perf_counter()
         try:
             # 检测房间类型
             room_type = detect_room_type(user_input)
             
             from pathlib import Path
-            from pathlib import Path
-            import shutil
             
             scene_file = None
+            source_file = None  # 实际加载的场景文件（模板直接只读加载，不复制）
             used_template = False
             
             # 尝试从模板池获取模板
@@ -336,18 +353,13 @@ class LangChainInfinigenAgent:
                     print(f"         文件大小: {template.file_size_mb:.2f} MB")
                     print(f"      ⚡ 使用模板跳过场景生成步骤（节省 5-10 分钟）")
                     
-                    # 复制模板文件到输出目录（保持原模板不变）
+                    # 模板只读加载，改色后的场景保存到输出目录（保持原模板不变）
                     output_path = Path(output_folder)
                     output_path.mkdir(parents=True, exist_ok=True)
                     
-                    # 复制模板文件
-                    template_path = Path(template.scene_file)
+                    source_file = Path(template.scene_file)
                     scene_file = output_path / "scene.blend"
                     
-                    print(f"      📋 正在复制模板到输出目录...")
-                    shutil.copy2(template_path, scene_file)
-                    print(f"      ✓ 模板已复制到: {scene_file}")
-                    
                     used_template = True
                 else:
                     if template:
@@ -357,6 +369,10 @@ class LangChainInfinigenAgent:
             
             # 如果没有使用模板，则生成新场景
             if not used_template:
+                # 颜色方案已经失败时不再启动耗时的场景生成
+                if color_future.done() and color_future.exception() is not None:
+                    return color_failure(color_future.exception())
+                
                 print("      🏗️  使用 Infinigen 原生命令生成新场景...")
                 print("          ⚡ 使用超快配置（ultra_fast_solve.gin + singleroom.gin）")
                 print("          预计时间: 5-10 分钟（vs fast_solve 8-13 分钟，默认 50+ 分钟）")
@@ -413,16 +429,18 @@ class LangChainInfinigenAgent:
             # 确保 scene_file 是 Path 对象（如果还不是）
             if not isinstance(scene_file, Path):
                 scene_file = Path(scene_file)
+            if source_file is None:
+                source_file = scene_file
             
             # 确认场景文件存在且有效
-            if not scene_file.exists():
-                raise FileNotFoundError(f"场景文件不存在: {scene_file}")
+            if not source_file.exists():
+                raise FileNotFoundError(f"场景文件不存在: {source_file}")
             
-            file_size = scene_file.stat().st_size
+            file_size = source_file.stat().st_size
             if file_size < 1024:
                 raise ValueError(f"场景文件大小异常（可能未完全生成）: {file_size} 字节")
             
-            print(f"  ✓ 场景文件验证通过: {scene_file} (大小: {file_size / (1024*1024):.2f} MB)")
+            print(f"  ✓ 场景文件验证通过: {source_file} (大小: {file_size / (1024*1024):.2f} MB)")
             if used_template:
                 print(f"  → 使用模板，跳过场景生成，准备继续执行后续步骤（应用颜色和渲染）...")
             else:
@@ -431,19 +449,49 @@ class LangChainInfinigenAgent:
             print(f"  ✗ 场景生成失败: {e}")
             import traceback
             traceback.print_exc()
+            timings["total"] = time.perf_counter() - total_start
             return {
                 "success": False,
                 "error": "场景生成失败",
-                "message": str(e)
+                "message": str(e),
+                "timings": timings
             }
+        timings["scene_preparation"] = time.perf_counter() - scene_start
         
         # 保存 used_template 状态，用于返回值
         scene_generation_used_template = used_template
         
+        # 2.3 在等待 LLM 的同时加载场景（场景只加载一次：改色和渲染共用同一个会话）
+        self.scene_session = None
+        try:
+            print(f"  2.3 正在加载场景文件: {source_file}")
+            print("  ⚠ 如果场景文件很大，这可能需要几分钟...")
+            self.scene_session = BlenderSceneSession(str(source_file), output_path=str(scene_file))
+            self.scene_applier = self.scene_session.applier
+            timings["scene_load"] = self.scene_session.load_time
+        except Exception as e:
+            print(f"  ✗ 加载场景失败: {e}")
+            import traceback
+            traceback.print_exc()
+        
+        # 2.4 等待颜色方案
+        wait_start = time.perf_counter()
+        try:
+            color_scheme_json = color_future.result()
+            print(f"  ✓ 颜色方案生成成功")
+            print(f"  {color_scheme_json[:200]}...")  # 显示前200字符
+        except Exception as e:
+            if self.scene_session is not None:
+                self.scene_session.close()
+            return color_failure(e)
+        timings["color_wait"] = time.perf_counter() - wait_start
+        
         # 步骤3: 应用颜色到场景
         print(f"\n{'='*60}")
         print("步骤3: 应用颜色到场景")
         print(f"{'='*60}")
+        apply_start = time.perf_counter()
+        colors = []
         try:
             # 解析颜色方案
             import json
@@ -474,10 +522,8 @@ class LangChainInfinigenAgent:
             
             print(f"  ✓ 解析到 {len(colors)} 个颜色配置")
             
-            # 加载场景并应用颜色
-            print(f"  正在加载场景文件: {scene_file}")
-            print("  ⚠ 如果场景文件很大，这可能需要几分钟...")
-            self.scene_applier = SceneColorApplier(str(scene_file))
+            if self.scene_session is None:
+                raise RuntimeError(f"场景未加载: {source_file}")
             
             # 初始化程序化生成器（用于生成缺失的家具）
             print("  正在初始化程序化生成器...")
@@ -532,9 +578,7 @@ class LangChainInfinigenAgent:
                     else:
                         print(f"    ⚠ {color.furniture_type}: 场景中未找到该家具（不支持程序化生成）")
             
-            # 保存场景（替换原文件，不生成新文件）
-            self.scene_applier.save_scene(str(scene_file))
-            print(f"\n  ✓ 颜色已应用到场景并保存: {scene_file}")
+            print(f"\n  ✓ 颜色已应用到场景")
             
         except Exception as e:
             print(f"  ✗ 应用颜色失败: {e}")
@@ -542,36 +586,57 @@ class LangChainInfinigenAgent:
             traceback.print_exc()
             print(f"  ⚠ 颜色应用失败，但将继续渲染场景（使用原始颜色）")
             # 不返回错误，继续执行渲染步骤
+        timings["color_application"] = time.perf_counter() - apply_start
         
         # 步骤4: 渲染图片（无论颜色应用是否成功，都会渲染）
         print("\n步骤4: 渲染场景图片...")
         try:
-            self.scene_renderer = SceneRenderer(str(scene_file))
+            if self.scene_session is None:
+                # 场景加载失败时重新加载一次
+                self.scene_session = BlenderSceneSession(str(source_file), output_path=str(scene_file))
+                timings["scene_load"] = self.scene_session.load_time
+            self.scene_renderer = self.scene_session.renderer
+            
+            # 渲染前保存改色后的场景（渲染会修改合成节点等设置）
+            self.scene_session.save()
+            timings["save"] = self.scene_session.save_time
+            
             output_image = Path(scene_file).parent / "rendered_image.png"
             
             # 只渲染单张图片（默认只保存最终图像）
-            rendered_image = self.scene_renderer.render_image(
+            render_start = time.perf_counter()
+            rendered_image = self.scene_session.render_image(
                 output_path=str(output_image),
                 resolution=(1920, 1080),
                 save_all_passes=False  # 只保存最终图像，更快，文件更少
             )
+            timings["render"] = time.perf_counter() - render_start
             
             print(f"  ✓ 图片渲染成功: {rendered_image}")
             
+            self.scene_session.close()
+            
         except Exception as e:
             print(f"  ✗ 渲染失败: {e}")
             import traceback
             traceback.print_exc()
+            if self.scene_session is not None:
+                self.scene_session.close()
+            timings["total"] = time.perf_counter() - total_start
             return {
                 "success": False,
                 "error": "渲染失败",
                 "message": str(e),
-                "scene_file": str(scene_file)
+                "scene_file": str(scene_file),
+                "timings": timings
             }
+
+        timings["total"] = time.perf_counter() - total_start
         
         # 返回结果
         print("\n" + "=" * 60)
         print("✓ 处理完成！")
+        print("  耗时: " + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items() if v is not None))
         print("=" * 60)
         
         return {
@@ -582,7 +647,8 @@ class LangChainInfinigenAgent:
             "rendered_image": str(rendered_image),
             "color_scheme": color_scheme_json,
             "colors_applied": len(colors) if colors else 0,
-            "used_template": scene_generation_used_template
+            "used_template": scene_generation_used_template,
+            "timings": timings
         }
     
     def _process_generate_mode(
@@ -1,10 +1,19 @@
 """
 vLLM API 客户端
 用于与 vLLM 服务进行交互
+
+同步客户端复用带连接池的 requests.Session（HTTP keep-alive），相同的并发请求只发送一次，
+成功的结果在有限大小的 TTL 缓存中保存；AsyncVLLMClient 提供 asyncio 接口。
 """
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
+import copy
 import json
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Dict, List, Optional, Any
 import sys
 from pathlib import Path
@@ -19,6 +28,10 @@ from config.api_config import (
     VLLM_API_KEY,
     API_TIMEOUT,
     MAX_RETRIES,
+    POOL_CONNECTIONS,
+    POOL_MAXSIZE,
+    CACHE_SIZE,
+    CACHE_TTL,
     DEFAULT_MODEL,
     DEFAULT_TEMPERATURE,
     DEFAULT_MAX_TOKENS,
@@ -26,6 +39,74 @@ from config.api_config import (
 )
 
 
+def chat_request_data(
+    messages: List[Dict[str, str]],
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    **kwargs
+) -> Dict[str, Any]:
+    """构建聊天补全请求体"""
+    return {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        **kwargs
+    }
+
+
+def simple_messages(user_message: str, system_message: Optional[str] = None) -> List[Dict[str, str]]:
+    messages = []
+    if system_message:
+        messages.append({"role": "system", "content": system_message})
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+
+class TTLCache:
+    """线程安全的有限大小 TTL 缓存（LRU 淘汰）"""
+    
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (过期时间, 值)
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+    
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+    
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self):
+        return len(self._data)
+
+
+def request_key(endpoint: str, data: Dict[str, Any]) -> str:
+    """请求的缓存/合并键：端点和完整请求体（包含 model、messages、temperature 等）"""
+    return json.dumps([endpoint, data], sort_keys=True, ensure_ascii=False)
+
+
 class VLLMClient:
     """vLLM API 客户端类"""
     
@@ -34,7 +115,11 @@ class VLLMClient:
         api_url: str = None,
         api_key: str = VLLM_API_KEY,
         timeout: int = API_TIMEOUT,
-        use_v1: bool = USE_V1_PATH
+        use_v1: bool = USE_V1_PATH,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        cache_size: int = CACHE_SIZE,
+        cache_ttl: float = CACHE_TTL
     ):
         """
         初始化 vLLM 客户端
@@ -44,6 +129,10 @@ class VLLMClient:
             api_key: API 密钥
             timeout: 请求超时时间
             use_v1: 是否使用 /v1 路径
+            pool_connections: 连接池缓存的主机数
+            pool_maxsize: 每个主机的最大并发连接数（超出时等待空闲连接）
+            cache_size: 结果缓存条数，0 表示不缓存
+            cache_ttl: 缓存有效期（秒）
         """
         if api_url is None:
             self.api_url = VLLM_API_URL if use_v1 else VLLM_API_URL_NO_V1
@@ -52,69 +141,121 @@ class VLLMClient:
         self.api_key = api_key
         self.timeout = timeout
         self.use_v1 = use_v1
+        self.pool_maxsize = pool_maxsize
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        
+        # 复用连接（HTTP keep-alive），不再为每个请求建立新的 TCP/TLS 连接
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
+        self.session.verify = False  # 如果证书有问题，可能需要设置为 False
+        
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._inflight = {}  # key -> Future，相同的并发请求只发送一次
+        self._inflight_lock = threading.Lock()
+    
+    def _url(self, endpoint: str) -> str:
+        # use_v1 的区别已体现在 api_url 中，直接拼接端点
+        return f"{self.api_url}/{endpoint}"
+    
+    def _post(self, url: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """发送一次请求；网络错误和 HTTP 错误以异常抛出，响应不是 JSON 时返回 None"""
+        response = self.session.post(url, json=data, timeout=self.timeout)
+        response.raise_for_status()
+        try:
+            return response.json()
+        except ValueError:
+            # 如果不是 JSON，打印响应内容用于调试
+            print(f"响应不是 JSON 格式，状态码: {response.status_code}")
+            print(f"响应内容: {response.text[:500]}")
+            return None
+    
+    @staticmethod
+    def _report_failure(e: Exception, attempt: int, retries: int) -> bool:
+        """打印失败信息，返回是否还应重试"""
+        if isinstance(e, requests.exceptions.Timeout):
+            print(f"请求超时，剩余重试次数: {retries - attempt - 1}")
+        else:
+            print(f"请求失败: {e}")
+            if hasattr(getattr(e, "response", None), 'text'):
+                print(f"响应内容: {e.response.text}")
+        if attempt < retries - 1:
+            return True
+        print("达到最大重试次数，请求失败")
+        return False
+    
+    def _request_with_retries(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        retries: int
+    ) -> Optional[Dict[str, Any]]:
+        url = self._url(endpoint)
+        for attempt in range(retries):
+            try:
+                return self._post(url, data)
+            except requests.exceptions.RequestException as e:
+                if not self._report_failure(e, attempt, retries):
+                    return None
+                time.sleep(2 ** attempt)  # 指数退避
+        return None
     
     def _make_request(
         self,
         endpoint: str,
         data: Dict[str, Any],
-        retries: int = MAX_RETRIES
+        retries: int = MAX_RETRIES,
+        use_cache: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
-        发送 HTTP 请求（带重试机制）
+        发送 HTTP 请求（带重试、缓存和并发请求合并）
         
         Args:
             endpoint: API 端点（如 "chat/completions"）
             data: 请求数据
             retries: 剩余重试次数
+            use_cache: 是否使用结果缓存；相同的并发请求总是合并
             
         Returns:
             API 响应数据，失败返回 None
         """
-        # 根据是否使用 v1 路径构建 URL
-        if self.use_v1:
-            url = f"{self.api_url}/{endpoint}"
-        else:
-            # 不使用 v1 时，直接拼接端点
-            url = f"{self.api_url}/{endpoint}"
+        key = request_key(endpoint, data)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return copy.deepcopy(cached)
         
-        for attempt in range(retries):
-            try:
-                response = requests.post(
-                    url,
-                    headers=self.headers,
-                    json=data,
-                    timeout=self.timeout,
-                    verify=False  # 如果证书有问题，可能需要设置为 False
-                )
-                response.raise_for_status()
-                try:
-                    return response.json()
-                except ValueError:
-                    # 如果不是 JSON，打印响应内容用于调试
-                    print(f"响应不是 JSON 格式，状态码: {response.status_code}")
-                    print(f"响应内容: {response.text[:500]}")
-                    return None
-            except requests.exceptions.Timeout:
-                print(f"请求超时，剩余重试次数: {retries - attempt - 1}")
-                if attempt < retries - 1:
-                    time.sleep(2 ** attempt)  # 指数退避
-                else:
-                    print("达到最大重试次数，请求失败")
-                    return None
-            except requests.exceptions.RequestException as e:
-                print(f"请求失败: {e}")
-                if hasattr(e.response, 'text'):
-                    print(f"响应内容: {e.response.text}")
-                if attempt < retries - 1:
-                    time.sleep(2 ** attempt)
-                else:
-                    return None
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
         
-        return None
+        if not leader:
+            # 已有相同请求在进行中，等待它的结果
+            result = future.result()
+            return copy.deepcopy(result)
+        
+        result = None
+        try:
+            result = self._request_with_retries(endpoint, data, retries)
+            if result is not None:
+                self.cache.set(key, copy.deepcopy(result))
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            future.set_result(result)
+        return copy.deepcopy(result)
     
     def chat_completion(
         self,
@@ -122,6 +263,7 @@ class VLLMClient:
         model: str = DEFAULT_MODEL,
         temperature: float = DEFAULT_TEMPERATURE,
         max_tokens: int = DEFAULT_MAX_TOKENS,
+        use_cache: bool = True,
         **kwargs
     ) -> Optional[Dict[str, Any]]:
         """
@@ -132,22 +274,27 @@ class VLLMClient:
             model: 模型名称
             temperature: 温度参数
             max_tokens: 最大生成 token 数
+            use_cache: 是否复用相同请求的缓存结果
             **kwargs: 其他参数
             
         Returns:
             API 响应，包含生成的文本
         """
-        data = {
-            "model": model,
-            "messages": messages,
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-            **kwargs
-        }
-        
-        response = self._make_request("chat/completions", data)
+        data = chat_request_data(messages, model, temperature, max_tokens, **kwargs)
+        response = self._make_request("chat/completions", data, use_cache=use_cache)
         return response
     
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
     def get_completion_text(self, response: Dict[str, Any]) -> Optional[str]:
         """
         从 API 响应中提取生成的文本
@@ -185,11 +332,7 @@ class VLLMClient:
         Returns:
             模型生成的回复文本
         """
-        messages = []
-        if system_message:
-            messages.append({"role": "system", "content": system_message})
-        messages.append({"role": "user", "content": user_message})
-        
+        messages = simple_messages(user_message, system_message)
         response = self.chat_completion(messages, **kwargs)
         return self.get_completion_text(response)
     
@@ -216,6 +359,105 @@ class VLLMClient:
             return False
 
 
+class AsyncVLLMClient:
+    """
+    vLLM API 客户端的 asyncio 版本
+    
+    与同步客户端共用连接池和结果缓存：每个请求在线程中通过池化的 Session 发送，
+    并发数由 pool_maxsize 限制；重试的退避等待使用 asyncio.sleep，不阻塞事件循环；
+    同一事件循环中相同的并发请求只发送一次。
+    """
+    
+    def __init__(self, client: Optional[VLLMClient] = None, **kwargs):
+        """
+        初始化异步客户端
+        
+        Args:
+            client: 共用的同步客户端（为 None 时用 kwargs 新建）
+            **kwargs: 传给 VLLMClient 的参数
+        """
+        self.client = client or VLLMClient(**kwargs)
+        self._semaphore = None
+        self._inflight = {}  # key -> asyncio.Future
+    
+    async def _request_with_retries(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        retries: int
+    ) -> Optional[Dict[str, Any]]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.client.pool_maxsize)
+        url = self.client._url(endpoint)
+        for attempt in range(retries):
+            try:
+                async with self._semaphore:
+                    return await asyncio.to_thread(self.client._post, url, data)
+            except requests.exceptions.RequestException as e:
+                if not self.client._report_failure(e, attempt, retries):
+                    return None
+                await asyncio.sleep(2 ** attempt)  # 指数退避
+        return None
+    
+    async def _make_request(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        retries: int = MAX_RETRIES,
+        use_cache: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """发送 HTTP 请求（带重试、缓存和并发请求合并），失败返回 None"""
+        key = request_key(endpoint, data)
+        if use_cache:
+            cached = self.client.cache.get(key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+        
+        future = self._inflight.get(key)
+        if future is not None:
+            # 已有相同请求在进行中，等待它的结果
+            return copy.deepcopy(await asyncio.shield(future))
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        result = None
+        try:
+            result = await self._request_with_retries(endpoint, data, retries)
+            if result is not None:
+                self.client.cache.set(key, copy.deepcopy(result))
+        finally:
+            del self._inflight[key]
+            future.set_result(result)
+        return copy.deepcopy(result)
+    
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        temperature: float = DEFAULT_TEMPERATURE,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        use_cache: bool = True,
+        **kwargs
+    ) -> Optional[Dict[str, Any]]:
+        """发送聊天补全请求，参数同 VLLMClient.chat_completion"""
+        data = chat_request_data(messages, model, temperature, max_tokens, **kwargs)
+        return await self._make_request("chat/completions", data, use_cache=use_cache)
+    
+    async def simple_chat(
+        self,
+        user_message: str,
+        system_message: Optional[str] = None,
+        **kwargs
+    ) -> Optional[str]:
+        """简单的聊天接口，参数同 VLLMClient.simple_chat"""
+        messages = simple_messages(user_message, system_message)
+        response = await self.chat_completion(messages, **kwargs)
+        return self.client.get_completion_text(response)
+    
+    def close(self):
+        self.client.close()
+
+
 if __name__ == "__main__":
     # 测试客户端
     print("正在测试 vLLM API 连接...")
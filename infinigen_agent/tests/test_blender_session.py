@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+测试 Blender 场景会话：只加载一次，改色后保存，模板不被修改
+"""
+
+import sys
+from pathlib import Path
+
+# ruff: noqa: E402
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import bpy
+from src.blender_session import BlenderSceneSession
+from src.color_parser import FurnitureColor
+
+
+def make_template(path: Path):
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    bpy.ops.mesh.primitive_cube_add()
+    bpy.context.active_object.name = "Sofa"
+    bpy.ops.wm.save_as_mainfile(filepath=str(path))
+    return path.read_bytes()
+
+
+def test_session_saves_snapshot_without_touching_template(tmp_path):
+    template = tmp_path / "template.blend"
+    output = tmp_path / "out" / "scene.blend"
+    template_bytes = make_template(template)
+
+    session = BlenderSceneSession(str(template), output_path=str(output))
+    sofas = session.applier.find_objects_by_name(["沙发"])
+    assert [o.name for o in sofas] == ["Sofa"]
+    color = FurnitureColor(furniture_type="沙发", color_name="红色", rgb=(255, 0, 0))
+    session.applier.apply_color_to_object(sofas[0], color)
+
+    session.save()
+    # 保存的是调用 save 时的场景，之后的修改（如渲染设置）不影响保存结果
+    bpy.data.objects["Sofa"].name = "Renamed"
+    session.close()
+
+    assert template.read_bytes() == template_bytes
+    assert Path(bpy.data.filepath) == template
+
+    bpy.ops.wm.open_mainfile(filepath=str(output))
+    sofa = bpy.data.objects["Sofa"]
+    assert sofa.data.materials[0].name == "Sofa_material"
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as d:
+        test_session_saves_snapshot_without_touching_template(Path(d))
+    print("✓ 测试通过")
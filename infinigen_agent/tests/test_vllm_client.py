@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""
+测试 vLLM 客户端的连接复用、并发请求合并和结果缓存（使用本地桩服务器）
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# ruff: noqa: E402
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.vllm_client import AsyncVLLMClient, VLLMClient
+
+
+class StubServer(ThreadingHTTPServer):
+    """模拟 vLLM 的 chat/completions 接口，记录请求数和连接数"""
+
+    daemon_threads = True
+
+    def __init__(self, delay=0.0):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.delay = delay
+        self.requests = 0
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 支持 keep-alive
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.connections.add(self.client_address)
+        time.sleep(self.server.delay)
+        reply = json.dumps(
+            {
+                "choices": [
+                    {"message": {"content": body["messages"][-1]["content"].upper()}}
+                ]
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(delay=0.0):
+    server = StubServer(delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_session_reuses_connection_and_caches():
+    server = start_stub()
+    try:
+        client = VLLMClient(api_url=server.url, cache_size=2)
+        for i in range(5):
+            assert client.simple_chat(f"hello {i}", use_cache=False) == f"HELLO {i}"
+        assert server.requests == 5
+        assert len(server.connections) == 1
+
+        assert client.simple_chat("a") == "A"
+        assert client.simple_chat("a") == "A"
+        assert server.requests == 6
+        # 温度不同的请求不共用缓存
+        assert client.simple_chat("a", temperature=0.1) == "A"
+        assert server.requests == 7
+        # 超出缓存大小时淘汰最久未用的条目
+        client.simple_chat("b")
+        client.simple_chat("a")
+        assert server.requests == 9
+    finally:
+        server.shutdown()
+
+
+def test_cache_expires():
+    server = start_stub()
+    try:
+        client = VLLMClient(api_url=server.url, cache_ttl=0.1)
+        client.simple_chat("a")
+        client.simple_chat("a")
+        assert server.requests == 1
+        time.sleep(0.2)
+        client.simple_chat("a")
+        assert server.requests == 2
+    finally:
+        server.shutdown()
+
+
+def test_identical_inflight_requests_are_coalesced():
+    server = start_stub(delay=0.3)
+    try:
+        client = VLLMClient(api_url=server.url, cache_size=0)
+        with ThreadPoolExecutor(8) as executor:
+            replies = list(executor.map(lambda _: client.simple_chat("same"), range(8)))
+        assert replies == ["SAME"] * 8
+        assert server.requests == 1
+    finally:
+        server.shutdown()
+
+
+def test_async_client_coalesces_and_limits_connections():
+    server = start_stub(delay=0.2)
+    try:
+        client = AsyncVLLMClient(api_url=server.url, pool_maxsize=2, cache_size=0)
+
+        async def run():
+            same = [client.simple_chat("same") for _ in range(4)]
+            different = [client.simple_chat(f"p{i}") for i in range(4)]
+            return await asyncio.gather(*same, *different)
+
+        replies = asyncio.run(run())
+        assert replies == ["SAME"] * 4 + [f"P{i}" for i in range(4)]
+        assert server.requests == 5
+        assert len(server.connections) <= 2
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_session_reuses_connection_and_caches()
+    test_cache_expires()
+    test_identical_inflight_requests_are_coalesced()
+    test_async_client_coalesces_and_limits_connections()
+    print("✓ 测试通过")
@@ -7,10 +7,10 @@ import os
 import sys
 import time
 import json
-import threading
+import multiprocessing
 from pathlib import Path
 from datetime import datetime
-from flask import Flask, request, jsonify, send_file, send_from_directory, render_template_string
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, render_template_string, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import uuid
@@ -22,7 +22,9 @@ if not infinigen_agent_path.exists():
     infinigen_agent_path = Path("/home/ubuntu/infinigen/infinigen_agent")
 sys.path.insert(0, str(infinigen_agent_path))
 
-from src.langchain_agent import LangChainInfinigenAgent
+from worker_pool import BlenderWorkerPool, PoolFullError
+from task_store import TaskStore
+from progress_tracker import ProgressTracker
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 CORS(app)  # 允许跨域请求
@@ -32,22 +34,46 @@ UPLOAD_FOLDER = Path("/home/ubuntu/infinigen/outputs")
 UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
 ALLOWED_EXTENSIONS = {'blend'}
 
-# 存储任务状态
-tasks = {}
-
-# 初始化 Agent
-print("正在初始化 LangChain Infinigen Agent...")
-try:
-    agent = LangChainInfinigenAgent(
-        infinigen_root="/home/ubuntu/infinigen",
-        use_template_pool=True  # 启用模板池
+# 存储任务状态（SQLite，服务重启后保留），在主进程中创建，见下方
+TASK_DB = Path(os.environ.get("INFINIGEN_WEB_TASK_DB", UPLOAD_FOLDER / "web_tasks.sqlite3"))
+tasks = None
+
+# 任务进度跟踪（增量读取 pipeline CSV，缓存渲染文件查找）
+progress_tracker = ProgressTracker()
+
+# SSE 推送：任务无更新时重新计算进度的间隔（秒）
+SSE_REFRESH_INTERVAL = 2.0
+FINISHED_STATUSES = ("completed", "failed")
+
+# Blender 工作进程池配置
+NUM_WORKERS = int(os.environ.get("INFINIGEN_WEB_WORKERS", 2))  # 常驻 Blender 工作进程数
+MAX_QUEUED_TASKS = int(os.environ.get("INFINIGEN_WEB_MAX_QUEUE", 8))  # 排队任务上限，超出返回 503
+
+# 初始化工作进程池（每个进程内导入 infinigen、解析 gin 并创建 Agent）
+def start_worker_pool():
+    print(f"正在启动 {NUM_WORKERS} 个 Blender 工作进程...")
+    return BlenderWorkerPool(
+        n_workers=NUM_WORKERS,
+        max_queue=MAX_QUEUED_TASKS,
+        init_kwargs=dict(
+            infinigen_root="/home/ubuntu/infinigen",
+            use_template_pool=True  # 启用模板池
+        )
     )
-    print("✓ Agent 初始化成功")
-except Exception as e:
-    print(f"⚠ Agent 初始化失败: {e}")
-    import traceback
-    traceback.print_exc()
-    agent = None
+
+
+pool = None
+# 工作进程以 spawn 方式启动时会重新导入本模块，只在主进程中打开任务存储和创建进程池
+# （打开任务存储时会把未完成的任务标记为中断，不能在工作进程中执行）
+if multiprocessing.parent_process() is None:
+    tasks = TaskStore(TASK_DB)
+    try:
+        pool = start_worker_pool()
+        print("✓ 工作进程池已启动（Agent 在各工作进程中后台初始化）")
+    except Exception as e:
+        print(f"⚠ 工作进程池启动失败: {e}")
+        import traceback
+        traceback.print_exc()
 
 
 def allowed_file(filename):
@@ -59,131 +85,48 @@ def get_task_output_dir(task_id):
     return UPLOAD_FOLDER / f"web_task_{task_id}"
 
 
-def read_pipeline_progress(output_dir):
-    """读取 pipeline 进度"""
-    pipeline_file = output_dir / "pipeline_coarse.csv"
-    
-    if not pipeline_file.exists():
-        return None, []
-    
-    completed_stages = []
-    try:
-        with open(pipeline_file, "r") as f:
-            lines = f.readlines()
-            for line in lines[1:]:
-                if line.strip():
-                    parts = line.strip().split(",")
-                    if len(parts) >= 3:
-                        stage_name = parts[1].strip()
-                        ran = parts[2].strip().lower() == "true"
-                        if ran and stage_name:
-                            completed_stages.append(stage_name)
+def on_generate_start(task_id, mode):
+    """任务被工作进程取出、开始执行"""
+    tasks.update(task_id, status="running", message="开始生成场景...", mode=mode)
+
+
+def on_generate_done(task_id, mode, results):
+    """工作进程返回结果"""
+    progress_tracker.forget(get_task_output_dir(task_id))
+    if results.get("success"):
+        fields = dict(
+            status="completed",
+            message="场景生成完成",
+            scene_file=str(results.get("scene_file", "")),
+            rendered_image=str(results.get("rendered_image", "")),
+            preview_image=str(results.get("preview_image", "")),
+            used_template=results.get("used_template", False),
+            needs_confirmation=results.get("needs_confirmation", False),
+            mode=results.get("mode", mode),
+            timings=results.get("timings", {}),  # 各步骤耗时（秒）
+        )
         
-        current_stage = completed_stages[-1] if completed_stages else None
-        return current_stage, completed_stages
-    except Exception as e:
-        return None, []
-
-
-ALL_STAGES = [
-    "terrain", "sky_lighting", "solve_rooms", "solve_large", "pose_cameras",
-    "animate_cameras", "populate_intermediate_pholders", "solve_medium",
-    "solve_small", "populate_assets", "floating_objs", "room_doors",
-    "room_windows", "room_stairs", "skirting_floor", "skirting_ceiling",
-    "room_pillars", "room_walls", "room_floors", "room_ceilings",
-    "lights_off", "invisible_room_ceilings", "overhead_cam", "hide_other_rooms",
-    "fancy_clouds", "grass", "rocks", "nature_backdrop",
-]
-
-
-def calculate_progress(output_dir):
-    """计算任务进度"""
-    # 检查场景文件
-    scene_file = output_dir / "scene.blend"
-    if not scene_file.exists():
-        scene_file = output_dir / "coarse" / "scene.blend"
-    
-    if scene_file.exists():
-        # 检查渲染文件
-        render_files = list(output_dir.glob("frames/**/*.png")) + list(output_dir.glob("frames/**/*.exr"))
-        if render_files:
-            return 100, "渲染完成"
-        return 95, "场景生成完成，正在渲染"
-    
-    # 读取 pipeline 进度
-    current_stage, completed_stages = read_pipeline_progress(output_dir)
-    
-    if current_stage:
-        try:
-            stage_index = ALL_STAGES.index(current_stage)
-            progress = int((stage_index + 1) / len(ALL_STAGES) * 90)
-        except ValueError:
-            progress = int(len(completed_stages) / len(ALL_STAGES) * 90)
-        return progress, f"正在执行: {current_stage}"
-    elif completed_stages:
-        progress = int(len(completed_stages) / len(ALL_STAGES) * 90)
-        return progress, f"已完成: {completed_stages[-1]}"
+        # 如果使用了模板模式，记录颜色方案
+        if mode == "template":
+            fields["color_scheme"] = results.get("color_scheme", "")
+            fields["colors_applied"] = results.get("colors_applied", 0)
+        tasks.update(task_id, **fields)
     else:
-        if (output_dir / "assets").exists():
-            return 5, "初始化中..."
-        return 0, "等待开始..."
+        tasks.update(
+            task_id,
+            status="failed",
+            message=results.get("message", "生成失败"),
+            error=results.get("error", "未知错误"),
+            timings=results.get("timings", {}),
+        )
 
 
-def generate_scene_task(task_id, user_request, seed=None, mode="template", auto_confirm=False):
-    """在后台线程中生成场景"""
-    try:
-        tasks[task_id]["status"] = "running"
-        tasks[task_id]["message"] = "开始生成场景..."
-        tasks[task_id]["mode"] = mode
-        
-        output_dir = get_task_output_dir(task_id)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 使用 agent 生成场景
-        if agent is None:
-            raise Exception("Agent 未初始化")
-        
-        # 处理 seed 参数
-        import random
-        if seed is None:
-            actual_seed = None  # 让 Agent 自动生成
-        else:
-            actual_seed = str(seed)
-        
-        # 调用 Agent 的 process_request 方法
-        results = agent.process_request(
-            user_input=user_request,
-            output_folder=str(output_dir),
-            seed=actual_seed,
-            timeout=1200,  # 20分钟超时
-            mode=mode,
-            auto_confirm=auto_confirm
-        )
-        
-        if results.get("success"):
-            tasks[task_id]["status"] = "completed"
-            tasks[task_id]["message"] = "场景生成完成"
-            tasks[task_id]["scene_file"] = str(results.get("scene_file", ""))
-            tasks[task_id]["rendered_image"] = str(results.get("rendered_image", ""))
-            tasks[task_id]["preview_image"] = str(results.get("preview_image", ""))
-            tasks[task_id]["used_template"] = results.get("used_template", False)
-            tasks[task_id]["needs_confirmation"] = results.get("needs_confirmation", False)
-            tasks[task_id]["mode"] = results.get("mode", mode)
-            
-            # 如果使用了模板模式，记录颜色方案
-            if mode == "template":
-                tasks[task_id]["color_scheme"] = results.get("color_scheme", "")
-                tasks[task_id]["colors_applied"] = results.get("colors_applied", 0)
-        else:
-            tasks[task_id]["status"] = "failed"
-            tasks[task_id]["message"] = results.get("message", "生成失败")
-            tasks[task_id]["error"] = results.get("error", "未知错误")
-        
-    except Exception as e:
-        tasks[task_id]["status"] = "failed"
-        tasks[task_id]["message"] = f"生成失败: {str(e)}"
-        import traceback
-        tasks[task_id]["error"] = traceback.format_exc()
+def pool_full_response(e):
+    """任务队列已满，让客户端稍后重试"""
+    response = jsonify({"error": "服务繁忙，请稍后重试", "message": str(e)})
+    response.status_code = 503
+    response.headers["Retry-After"] = "30"
+    return response
 
 
 @app.route('/api/generate', methods=['POST'])
@@ -198,32 +141,43 @@ def generate_scene():
     if not user_request:
         return jsonify({"error": "请求不能为空"}), 400
     
-    if agent is None:
-        return jsonify({"error": "Agent 未初始化"}), 500
+    if pool is None:
+        return jsonify({"error": "工作进程池未初始化"}), 500
     
     if mode not in ['template', 'generate']:
         return jsonify({"error": "无效的模式，必须是 'template' 或 'generate'"}), 400
     
     # 创建任务
     task_id = str(uuid.uuid4())
-    tasks[task_id] = {
-        "task_id": task_id,
-        "status": "pending",
-        "message": "任务已创建",
-        "created_at": datetime.now().isoformat(),
-        "user_request": user_request,
-        "seed": seed,
-        "mode": mode,
-        "auto_confirm": auto_confirm
-    }
-    
-    # 在后台线程中执行
-    thread = threading.Thread(
-        target=generate_scene_task,
-        args=(task_id, user_request, seed, mode, auto_confirm)
+    output_dir = get_task_output_dir(task_id)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tasks.create(
+        task_id,
+        status="pending",
+        message="任务已创建",
+        created_at=datetime.now().isoformat(),
+        user_request=user_request,
+        seed=seed,
+        mode=mode,
+        auto_confirm=auto_confirm
     )
-    thread.daemon = True
-    thread.start()
+    
+    # 提交到工作进程池执行
+    try:
+        pool.submit(
+            "process_request",
+            on_start=lambda job_id: on_generate_start(task_id, mode),
+            on_done=lambda job_id, results: on_generate_done(task_id, mode, results),
+            user_input=user_request,
+            output_folder=str(output_dir),
+            seed=None if seed is None else str(seed),  # None 时让 Agent 自动生成
+            timeout=1200,  # 20分钟超时
+            mode=mode,
+            auto_confirm=auto_confirm
+        )
+    except PoolFullError as e:
+        tasks.delete(task_id)
+        return pool_full_response(e)
     
     mode_text = "模板模式" if mode == "template" else "生成模式"
     return jsonify({
@@ -234,20 +188,15 @@ def generate_scene():
     })
 
 
-@app.route('/api/task/<task_id>/status', methods=['GET'])
-def get_task_status(task_id):
-    """获取任务状态"""
-    if task_id not in tasks:
-        return jsonify({"error": "任务不存在"}), 404
-    
-    task = tasks[task_id]
-    output_dir = get_task_output_dir(task_id)
+def build_task_status(task):
+    """生成任务状态响应（运行中的任务会刷新进度）"""
+    task_id = task["task_id"]
     
-    # 计算进度
+    # 计算进度（只有变化时才写回存储）
     if task["status"] == "running":
-        progress, message = calculate_progress(output_dir)
-        task["progress"] = progress
-        task["current_stage"] = message
+        progress, message = progress_tracker.calculate_progress(get_task_output_dir(task_id))
+        if (progress, message) != (task.get("progress"), task.get("current_stage")):
+            task = tasks.update(task_id, progress=progress, current_stage=message)
     
     response = {
         "task_id": task_id,
@@ -256,7 +205,8 @@ def get_task_status(task_id):
         "progress": task.get("progress", 0),
         "current_stage": task.get("current_stage", ""),
         "created_at": task.get("created_at", ""),
-        "user_request": task.get("user_request", "")
+        "user_request": task.get("user_request", ""),
+        "timings": task.get("timings", {})
     }
     
     # 如果完成，添加文件路径
@@ -273,20 +223,65 @@ def get_task_status(task_id):
             response["color_scheme"] = task.get("color_scheme", "")
             response["colors_applied"] = task.get("colors_applied", 0)
     
-    return jsonify(response)
+    return response
+
+
+@app.route('/api/task/<task_id>/status', methods=['GET'])
+def get_task_status(task_id):
+    """获取任务状态"""
+    task = tasks.get(task_id)
+    if task is None:
+        return jsonify({"error": "任务不存在"}), 404
+    
+    return jsonify(build_task_status(task))
+
+
+@app.route('/api/task/<task_id>/events', methods=['GET'])
+def task_events(task_id):
+    """
+    以 Server-Sent Events 推送任务状态，替代前端轮询 /status
+    
+    状态变化时立即推送；运行中每 SSE_REFRESH_INTERVAL 秒检查一次进度，
+    任务完成或失败后推送最终状态并结束连接（确认精修后需重新订阅）
+    """
+    if task_id not in tasks:
+        return jsonify({"error": "任务不存在"}), 404
+    
+    def stream():
+        last_sent = None
+        version = tasks.version(task_id)
+        while True:
+            task = tasks.get(task_id)
+            if task is None:
+                return
+            status = build_task_status(task)
+            if status != last_sent:
+                yield f"data: {json.dumps(status, ensure_ascii=False)}\n\n"
+                last_sent = status
+            else:
+                yield ": keep-alive\n\n"  # 注释行，用于检测客户端断开
+            if status["status"] in FINISHED_STATUSES:
+                return
+            version = tasks.wait_for_update(task_id, version, timeout=SSE_REFRESH_INTERVAL)
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.route('/api/task/<task_id>/image', methods=['GET'])
 def get_task_image(task_id):
     """获取任务生成的图片（优先返回精修渲染图，否则返回预览图）"""
-    if task_id not in tasks:
+    task = tasks.get(task_id)
+    if task is None:
         return jsonify({"error": "任务不存在"}), 404
     
-    task = tasks[task_id]
     output_dir = get_task_output_dir(task_id)
     
     # 优先查找精修渲染图片
-    image_files = list(output_dir.glob("frames/**/*.png")) + list(output_dir.glob("frames/**/*.exr"))
+    image_files = progress_tracker.render_files.find(output_dir)
     if not image_files:
         # 尝试直接查找
         image_files = list(output_dir.glob("rendered_image.png")) + list(output_dir.glob("*.png"))
@@ -308,10 +303,10 @@ def get_task_image(task_id):
 @app.route('/api/task/<task_id>/preview', methods=['GET'])
 def get_task_preview(task_id):
     """获取任务预览图片"""
-    if task_id not in tasks:
+    task = tasks.get(task_id)
+    if task is None:
         return jsonify({"error": "任务不存在"}), 404
     
-    task = tasks[task_id]
     output_dir = get_task_output_dir(task_id)
     
     # 查找预览图片
@@ -325,10 +320,10 @@ def get_task_preview(task_id):
 @app.route('/api/task/<task_id>/download/<file_type>', methods=['GET'])
 def download_file(task_id, file_type):
     """下载场景文件"""
-    if task_id not in tasks:
+    task = tasks.get(task_id)
+    if task is None:
         return jsonify({"error": "任务不存在"}), 404
     
-    task = tasks[task_id]
     output_dir = get_task_output_dir(task_id)
     
     if file_type == "scene":
@@ -346,7 +341,7 @@ def download_file(task_id, file_type):
     
     elif file_type == "image":
         # 优先查找精修渲染图片
-        image_files = list(output_dir.glob("frames/**/*.png")) + list(output_dir.glob("frames/**/*.exr"))
+        image_files = progress_tracker.render_files.find(output_dir)
         if not image_files:
             image_files = list(output_dir.glob("rendered_image.png")) + list(output_dir.glob("*.png"))
         
@@ -373,51 +368,63 @@ def download_file(task_id, file_type):
 @app.route('/api/task/<task_id>/confirm', methods=['POST'])
 def confirm_and_render(task_id):
     """确认并精修渲染场景（用于生成模式）"""
-    if task_id not in tasks:
+    task = tasks.get(task_id)
+    if task is None:
         return jsonify({"error": "任务不存在"}), 404
     
-    task = tasks[task_id]
     
     if task.get("mode") != "generate":
         return jsonify({"error": "只有生成模式才能使用此接口"}), 400
     
-    if task["status"] != "completed" or not task.get("needs_confirmation"):
+    if pool is None:
+        return jsonify({"error": "工作进程池未初始化"}), 500
+    
+    # 原子地把任务从 completed 改为 rendering，同时到达的确认请求只有一个能成功，
+    # 且在提交前设置状态，工作进程开始执行时的状态不会被覆盖
+    previous, claimed = tasks.update_if(
+        task_id,
+        lambda t: t["status"] == "completed" and t.get("needs_confirmation"),
+        status="rendering",
+        message="已确认，等待空闲的渲染进程...",
+    )
+    if not claimed:
         return jsonify({"error": "任务状态不正确"}), 400
     
-    if agent is None:
-        return jsonify({"error": "Agent 未初始化"}), 500
-    
-    # 在后台线程中执行精修渲染
-    def render_task():
-        try:
-            tasks[task_id]["status"] = "rendering"
-            tasks[task_id]["message"] = "正在进行精修渲染..."
-            
-            scene_file = task.get("scene_file")
-            output_dir = get_task_output_dir(task_id)
-            
-            result = agent.confirm_and_render(
-                scene_file=scene_file,
-                output_folder=str(output_dir)
+    def on_render_start(job_id):
+        tasks.update(task_id, status="rendering", message="正在进行精修渲染...")
+    
+    def on_render_done(job_id, result):
+        # 精修渲染会写入新的 frames，丢弃旧的查找结果
+        progress_tracker.render_files.invalidate(get_task_output_dir(task_id))
+        if result.get("success"):
+            tasks.update(
+                task_id,
+                status="completed",
+                message="精修渲染完成",
+                rendered_image=str(result.get("rendered_image", "")),
+                needs_confirmation=False,
             )
-            
-            if result.get("success"):
-                tasks[task_id]["status"] = "completed"
-                tasks[task_id]["message"] = "精修渲染完成"
-                tasks[task_id]["rendered_image"] = str(result.get("rendered_image", ""))
-                tasks[task_id]["needs_confirmation"] = False
-            else:
-                tasks[task_id]["status"] = "failed"
-                tasks[task_id]["message"] = result.get("message", "精修渲染失败")
-        except Exception as e:
-            tasks[task_id]["status"] = "failed"
-            tasks[task_id]["message"] = f"精修渲染失败: {str(e)}"
-            import traceback
-            tasks[task_id]["error"] = traceback.format_exc()
-    
-    thread = threading.Thread(target=render_task)
-    thread.daemon = True
-    thread.start()
+        else:
+            tasks.update(
+                task_id,
+                status="failed",
+                message=result.get("message", "精修渲染失败"),
+                error=result.get("error", "未知错误"),
+            )
+    
+    # 提交到工作进程池执行精修渲染
+    try:
+        pool.submit(
+            "confirm_and_render",
+            on_start=on_render_start,
+            on_done=on_render_done,
+            scene_file=task.get("scene_file"),
+            output_folder=str(get_task_output_dir(task_id))
+        )
+    except PoolFullError as e:
+        # 未能提交，恢复确认前的状态，允许稍后重试
+        tasks.update(task_id, status=previous["status"], message=previous.get("message", ""))
+        return pool_full_response(e)
     
     return jsonify({
         "task_id": task_id,
@@ -429,19 +436,18 @@ def confirm_and_render(task_id):
 @app.route('/api/tasks', methods=['GET'])
 def list_tasks():
     """列出所有任务"""
-    task_list = []
-    for task_id, task in tasks.items():
-        task_list.append({
-            "task_id": task_id,
+    # 按创建时间倒序排列
+    task_list = [
+        {
+            "task_id": task["task_id"],
             "status": task["status"],
             "message": task.get("message", ""),
             "progress": task.get("progress", 0),
             "created_at": task.get("created_at", ""),
             "user_request": task.get("user_request", "")
-        })
-    
-    # 按创建时间倒序排列
-    task_list.sort(key=lambda x: x["created_at"], reverse=True)
+        }
+        for task in tasks.list()
+    ]
     
     return jsonify({"tasks": task_list})
 
@@ -450,8 +456,9 @@ def list_tasks():
 def health_check():
     """健康检查"""
     return jsonify({
-        "status": "ok",
-        "agent_initialized": agent is not None,
+        "status": "ok" if pool is not None and pool.healthy else "degraded",
+        "agent_initialized": pool is not None,
+        "workers": pool.stats() if pool is not None else None,
         "timestamp": datetime.now().isoformat()
     })
 
@@ -467,18 +474,20 @@ if __name__ == '__main__':
     print("Infinigen Web API 服务器")
     print("=" * 60)
     print(f"输出目录: {UPLOAD_FOLDER}")
-    print(f"Agent 状态: {'已初始化' if agent else '未初始化'}")
+    print(f"工作进程池: {NUM_WORKERS} 个进程，最多排队 {MAX_QUEUED_TASKS} 个任务" if pool else "工作进程池: 未初始化")
     print("=" * 60)
     print("\n启动服务器...")
     print("API 地址: http://localhost:5000")
     print("\n可用接口:")
     print("  POST /api/generate - 生成场景")
     print("  GET  /api/task/<task_id>/status - 查询任务状态")
+    print("  GET  /api/task/<task_id>/events - 订阅任务状态（SSE）")
     print("  GET  /api/task/<task_id>/image - 获取渲染图片")
     print("  GET  /api/task/<task_id>/download/<file_type> - 下载文件")
     print("  GET  /api/tasks - 列出所有任务")
     print("  GET  /api/health - 健康检查")
     print("\n" + "=" * 60)
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # 关闭自动重载：重载器会再导入一次本模块，启动第二个工作进程池
+    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
 
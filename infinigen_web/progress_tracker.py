@@ -0,0 +1,210 @@
+"""
+任务进度跟踪
+增量读取 pipeline_coarse.csv（记住文件偏移），并缓存渲染文件查找结果，
+避免每次状态查询都重新解析 CSV 和递归 glob 输出目录
+"""
+
+import threading
+import time
+from pathlib import Path
+
+ALL_STAGES = [
+    "terrain",
+    "sky_lighting",
+    "solve_rooms",
+    "solve_large",
+    "pose_cameras",
+    "animate_cameras",
+    "populate_intermediate_pholders",
+    "solve_medium",
+    "solve_small",
+    "populate_assets",
+    "floating_objs",
+    "room_doors",
+    "room_windows",
+    "room_stairs",
+    "skirting_floor",
+    "skirting_ceiling",
+    "room_pillars",
+    "room_walls",
+    "room_floors",
+    "room_ceilings",
+    "lights_off",
+    "invisible_room_ceilings",
+    "overhead_cam",
+    "hide_other_rooms",
+    "fancy_clouds",
+    "grass",
+    "rocks",
+    "nature_backdrop",
+]
+
+
+class PipelineCSVTailer:
+    """
+    增量读取 pipeline_coarse.csv
+
+    RandomStageExecutor 每完成一个阶段就整体重写该文件，但已有的行不会改变，
+    因此只需从上次读到的偏移继续读取新增的完整行；文件变短说明正在被重写，此时从头开始。
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offset = 0
+        self.header_read = False
+        self.completed_stages = []
+
+    def _reset(self):
+        self.offset = 0
+        self.header_read = False
+        self.completed_stages = []
+
+    def _parse_line(self, line):
+        if not self.header_read:
+            self.header_read = True
+            return
+        parts = line.strip().split(",")
+        if len(parts) >= 3:
+            stage_name = parts[1].strip()
+            ran = parts[2].strip().lower() == "true"
+            if ran and stage_name:
+                self.completed_stages.append(stage_name)
+
+    def poll(self):
+        """读取新增内容，返回 (当前阶段, 已完成阶段列表)"""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            self._reset()
+            return None, []
+
+        if size < self.offset:
+            self._reset()
+        if size > self.offset:
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(self.offset)
+                    data = f.read(size - self.offset)
+            except OSError:
+                data = b""
+            # 只处理完整的行，最后不完整的一行留到下次
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].decode("utf-8", errors="replace").splitlines():
+                if line.strip():
+                    self._parse_line(line)
+            self.offset += end
+
+        current_stage = self.completed_stages[-1] if self.completed_stages else None
+        return current_stage, list(self.completed_stages)
+
+
+class RenderFileIndex:
+    """
+    缓存输出目录下的渲染图片查找结果
+
+    同一目录在 ttl 秒内只 glob 一次；找到的文件只会增加，因此一旦找到渲染结果，
+    进度判断不再需要重新查找。
+    """
+
+    PATTERNS = ("frames/**/*.png", "frames/**/*.exr")
+
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self._cache = {}  # output_dir -> (查找时间, 文件列表)
+        self._lock = threading.Lock()
+
+    def find(self, output_dir, max_age=None):
+        """
+        返回 output_dir 下的渲染文件
+
+        Args:
+            max_age: 允许的缓存最大时长（秒），默认使用 ttl；0 表示强制重新查找
+        """
+        output_dir = Path(output_dir)
+        max_age = self.ttl if max_age is None else max_age
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(output_dir)
+        if cached is not None and now - cached[0] <= max_age:
+            return cached[1]
+
+        files = []
+        if (output_dir / "frames").exists():
+            for pattern in self.PATTERNS:
+                files.extend(output_dir.glob(pattern))
+        with self._lock:
+            self._cache[output_dir] = (now, files)
+        return files
+
+    def has_renders(self, output_dir):
+        with self._lock:
+            cached = self._cache.get(Path(output_dir))
+        if cached is not None and cached[1]:
+            return True
+        return bool(self.find(output_dir))
+
+    def invalidate(self, output_dir):
+        with self._lock:
+            self._cache.pop(Path(output_dir), None)
+
+
+class ProgressTracker:
+    """按任务输出目录计算进度，复用每个目录的 CSV 读取状态和渲染文件缓存"""
+
+    def __init__(self, render_ttl=5.0):
+        self.render_files = RenderFileIndex(ttl=render_ttl)
+        self._tailers = {}
+        self._lock = threading.Lock()
+
+    def _tailer(self, output_dir):
+        with self._lock:
+            tailer = self._tailers.get(output_dir)
+            if tailer is None:
+                tailer = PipelineCSVTailer(output_dir / "pipeline_coarse.csv")
+                self._tailers[output_dir] = tailer
+            return tailer
+
+    def read_pipeline_progress(self, output_dir):
+        """读取 pipeline 进度"""
+        tailer = self._tailer(Path(output_dir))
+        with self._lock:
+            return tailer.poll()
+
+    def calculate_progress(self, output_dir):
+        """计算任务进度"""
+        output_dir = Path(output_dir)
+
+        # 检查场景文件
+        scene_file = output_dir / "scene.blend"
+        if not scene_file.exists():
+            scene_file = output_dir / "coarse" / "scene.blend"
+
+        if scene_file.exists():
+            # 检查渲染文件
+            if self.render_files.has_renders(output_dir):
+                return 100, "渲染完成"
+            return 95, "场景生成完成，正在渲染"
+
+        # 读取 pipeline 进度
+        current_stage, completed_stages = self.read_pipeline_progress(output_dir)
+
+        if current_stage:
+            try:
+                stage_index = ALL_STAGES.index(current_stage)
+                progress = int((stage_index + 1) / len(ALL_STAGES) * 90)
+            except ValueError:
+                progress = int(len(completed_stages) / len(ALL_STAGES) * 90)
+            return progress, f"正在执行: {current_stage}"
+        elif completed_stages:
+            progress = int(len(completed_stages) / len(ALL_STAGES) * 90)
+            return progress, f"已完成: {completed_stages[-1]}"
+        else:
+            if (output_dir / "assets").exists():
+                return 5, "初始化中..."
+            return 0, "等待开始..."
+
+    def forget(self, output_dir):
+        """任务结束后释放该目录的跟踪状态"""
+        output_dir = Path(output_dir)
+        with self._lock:
+            self._tailers.pop(output_dir, None)
@@ -0,0 +1,142 @@
+"""
+任务状态存储
+基于 SQLite，线程安全，服务重启后任务记录不丢失
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# 服务重启时仍处于这些状态的任务已随旧进程中断
+UNFINISHED_STATUSES = ("pending", "running", "rendering")
+
+
+class TaskStore:
+    """
+    线程安全的任务存储
+
+    每个任务保存为一行：task_id、created_at 和其余字段的 JSON。
+    所有访问共用一个连接并由锁串行化；每次更新都会唤醒 wait_for_update 的等待者，
+    供 SSE 接口在任务变化时立即推送。
+    """
+
+    def __init__(self, db_path):
+        """
+        初始化任务存储
+
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " task_id TEXT PRIMARY KEY,"
+            " created_at TEXT NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._versions = {}  # task_id -> 更新次数（仅本进程内）
+
+        self._fail_interrupted()
+
+    def _fail_interrupted(self):
+        for task in self.list():
+            if task["status"] in UNFINISHED_STATUSES:
+                self.update(
+                    task["task_id"], status="failed", message="服务重启，任务已中断"
+                )
+
+    def _read(self, task_id):
+        row = self._conn.execute(
+            "SELECT data FROM tasks WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _write(self, task):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO tasks (task_id, created_at, data) VALUES (?, ?, ?)",
+            (task["task_id"], task["created_at"], json.dumps(task, ensure_ascii=False)),
+        )
+        self._conn.commit()
+        self._versions[task["task_id"]] = self._versions.get(task["task_id"], 0) + 1
+        self._changed.notify_all()
+
+    def create(self, task_id, **fields):
+        """创建任务，fields 中需包含 created_at"""
+        task = {"task_id": task_id, **fields}
+        with self._lock:
+            self._write(task)
+        return task
+
+    def get(self, task_id):
+        """获取任务（字典副本），不存在时返回 None"""
+        with self._lock:
+            return self._read(task_id)
+
+    def update(self, task_id, **fields):
+        """原子地更新任务的部分字段，返回更新后的任务"""
+        with self._lock:
+            task = self._read(task_id)
+            if task is None:
+                raise KeyError(task_id)
+            task.update(fields)
+            self._write(task)
+            return task
+
+    def update_if(self, task_id, condition, **fields):
+        """
+        比较并更新：只有 condition(当前任务) 为真时才更新，检查和写入在同一把锁内完成
+
+        Returns:
+            (更新前的任务, 是否已更新)；任务不存在时返回 (None, False)
+        """
+        with self._lock:
+            task = self._read(task_id)
+            if task is None or not condition(task):
+                return task, False
+            self._write({**task, **fields})
+            return task, True
+
+    def delete(self, task_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            self._conn.commit()
+            self._versions.pop(task_id, None)
+
+    def list(self):
+        """列出所有任务，按创建时间倒序"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM tasks ORDER BY created_at DESC"
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def __contains__(self, task_id):
+        return self.get(task_id) is not None
+
+    def version(self, task_id):
+        with self._lock:
+            return self._versions.get(task_id, 0)
+
+    def wait_for_update(self, task_id, version, timeout=None):
+        """
+        等待任务在 version 之后被更新
+
+        Returns:
+            当前版本号（超时时可能仍等于 version）
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._versions.get(task_id, 0) == version:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return self._versions.get(task_id, 0)
@@ -0,0 +1,333 @@
+"""
+Blender 常驻工作进程池
+每个工作进程启动时导入 infinigen、解析 gin 配置并创建 Agent，之后循环处理任务，
+请求无需再付出解释器/插件启动开销；每个进程有独立的 bpy 状态，并发用户互不干扰。
+"""
+
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from pathlib import Path
+
+
+class PoolFullError(Exception):
+    """任务队列已满（背压），调用方应稍后重试"""
+
+
+class PoolUnavailableError(PoolFullError):
+    """所有工作进程都无法启动（进程池不健康），调用方应稍后重试"""
+
+
+def init_agent(infinigen_root, gin_configs=None, gin_overrides=None, **agent_kwargs):
+    """工作进程初始化：导入 infinigen、解析 gin 配置并创建 Agent"""
+    infinigen_root = Path(infinigen_root)
+    sys.path.insert(0, str(infinigen_root))
+    sys.path.insert(0, str(infinigen_root / "infinigen_agent"))
+    os.chdir(infinigen_root)
+
+    from infinigen.core import init
+
+    init.apply_gin_configs(
+        configs=["base_indoors.gin"] + list(gin_configs or []),
+        overrides=list(gin_overrides or []),
+        config_folders=[
+            infinigen_root / "infinigen_examples/configs_indoor",
+            infinigen_root / "infinigen_examples/configs_nature",
+        ],
+    )
+
+    from src.langchain_agent import LangChainInfinigenAgent
+
+    return LangChainInfinigenAgent(infinigen_root=str(infinigen_root), **agent_kwargs)
+
+
+def _worker_main(worker_id, init_fn, init_kwargs, inbox, events):
+    try:
+        handler = init_fn(**init_kwargs)
+    except Exception:
+        events.put(("init_failed", worker_id, None, traceback.format_exc()))
+        # 以非零状态退出，由主进程按退避策略决定是否重启
+        sys.exit(1)
+    events.put(("ready", worker_id, None, None))
+
+    while True:
+        job = inbox.get()
+        if job is None:
+            break
+        job_id, method, kwargs = job
+        events.put(("started", worker_id, job_id, None))
+        try:
+            result = getattr(handler, method)(**kwargs)
+        except Exception as e:
+            result = {
+                "success": False,
+                "error": f"工作进程执行失败: {e}",
+                "message": traceback.format_exc(),
+            }
+        events.put(("done", worker_id, job_id, result))
+
+
+class BlenderWorkerPool:
+    """
+    Blender 工作进程池
+
+    排队的任务保存在主进程中，由事件线程逐个分配给空闲的工作进程（每个进程有自己的收件队列），
+    因此任一时刻都知道每个任务在哪个进程上：进程意外退出时，分配给它的任务会以失败结束。
+    队列已满时 submit 抛出 PoolFullError，由 Web 层返回 503 让客户端稍后重试，而不是无限堆积线程。
+
+    退出的工作进程按指数退避重启；连续失败 max_restarts 次后不再重启该进程。
+    所有进程都放弃重启时进程池变为不健康：排队的任务以失败结束，submit 抛出 PoolUnavailableError。
+    """
+
+    def __init__(
+        self,
+        n_workers=2,
+        max_queue=8,
+        init_fn=init_agent,
+        init_kwargs=None,
+        max_restarts=5,
+        restart_backoff=1.0,
+        max_restart_backoff=60.0,
+    ):
+        """
+        初始化进程池
+
+        Args:
+            n_workers: 工作进程数量（同时打开的 Blender 场景数）
+            max_queue: 排队等待的最大任务数
+            init_fn: 在工作进程中创建处理对象的函数（需可被 pickle）
+            init_kwargs: 传给 init_fn 的参数
+            max_restarts: 单个工作进程连续失败（退出前未能完成初始化或任务）的最大重启次数
+            restart_backoff: 第一次重启前的等待时间（秒），之后每次失败翻倍
+            max_restart_backoff: 重启等待时间上限（秒）
+        """
+        # spawn: 每个工作进程都是干净的解释器，不继承 Web 服务的线程和 bpy 状态
+        self._ctx = multiprocessing.get_context("spawn")
+        self.n_workers = n_workers
+        self.max_queue = max_queue
+        self.max_restarts = max_restarts
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self._init_fn = init_fn
+        self._init_kwargs = init_kwargs or {}
+
+        self._events = self._ctx.Queue()
+        self._pending = deque()  # 尚未分配的 (job_id, method, kwargs)
+        self._callbacks = {}  # job_id -> (on_start, on_done)
+        self._running = {}  # worker_id -> 已分配给它的 job_id
+        self._workers = {}  # worker_id -> Process，等待重启时为 None
+        self._inboxes = {}  # worker_id -> 该进程的任务队列
+        self._ready = set()
+        self._idle = set()
+        self._failures = {}  # worker_id -> 连续失败次数
+        self._restart_at = {}  # worker_id -> 计划重启的时间
+        self._given_up = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.completed = self.failed = 0
+
+        for worker_id in range(n_workers):
+            self._failures[worker_id] = 0
+            self._start_worker(worker_id)
+
+        self._event_thread = threading.Thread(target=self._event_loop, daemon=True)
+        self._event_thread.start()
+
+    @property
+    def healthy(self):
+        """是否还有工作进程在运行或等待重启"""
+        return len(self._given_up) < self.n_workers
+
+    def _start_worker(self, worker_id):
+        # 每次启动都用新的收件队列，避免新进程收到分配给已退出进程的任务
+        inbox = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._init_fn, self._init_kwargs, inbox, self._events),
+            daemon=True,
+        )
+        process.start()
+        self._inboxes[worker_id] = inbox
+        self._workers[worker_id] = process
+
+    def submit(self, method, on_start=None, on_done=None, **kwargs):
+        """
+        提交任务
+
+        Args:
+            method: 工作进程中处理对象的方法名，如 "process_request"
+            on_start: 任务开始执行时的回调 on_start(job_id)
+            on_done: 任务结束时的回调 on_done(job_id, result)
+            **kwargs: 传给 method 的参数
+
+        Returns:
+            job_id
+        """
+        if self._closed:
+            raise RuntimeError("进程池已关闭")
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            if not self.healthy:
+                raise PoolUnavailableError("没有可用的 Blender 工作进程（均无法启动）")
+            if len(self._pending) >= self.max_queue:
+                raise PoolFullError(f"任务队列已满（最多 {self.max_queue} 个排队任务）")
+            self._callbacks[job_id] = (on_start, on_done)
+            self._pending.append((job_id, method, kwargs))
+            self._dispatch()
+        return job_id
+
+    def _dispatch(self):
+        # 调用方需持有 self._lock；分配时即记录任务所在的进程
+        while self._pending and self._idle:
+            worker_id = self._idle.pop()
+            job = self._pending.popleft()
+            self._running[worker_id] = job[0]
+            self._inboxes[worker_id].put(job)
+
+    def _finish(self, job_id, result):
+        with self._lock:
+            _, on_done = self._callbacks.pop(job_id, (None, None))
+            if result.get("success"):
+                self.completed += 1
+            else:
+                self.failed += 1
+        if on_done is not None:
+            try:
+                on_done(job_id, result)
+            except Exception:
+                traceback.print_exc()
+
+    def _handle_event(self, kind, worker_id, job_id, payload):
+        if kind == "ready":
+            if self._workers.get(worker_id) is None:
+                return  # 就绪后立即退出的进程，已在等待重启
+            with self._lock:
+                self._ready.add(worker_id)
+                self._idle.add(worker_id)
+                self._failures[worker_id] = 0
+                self._dispatch()
+            print(f"✓ Blender 工作进程 {worker_id} 已就绪")
+        elif kind == "init_failed":
+            print(f"✗ Blender 工作进程 {worker_id} 初始化失败:\n{payload}")
+        elif kind == "started":
+            with self._lock:
+                on_start, _ = self._callbacks.get(job_id, (None, None))
+            if on_start is not None:
+                try:
+                    on_start(job_id)
+                except Exception:
+                    traceback.print_exc()
+        elif kind == "done":
+            with self._lock:
+                if self._running.get(worker_id) != job_id:
+                    return  # 进程退出时已按失败处理
+                del self._running[worker_id]
+                self._idle.add(worker_id)
+                self._dispatch()
+            self._finish(job_id, payload)
+
+    def _check_workers(self):
+        now = time.monotonic()
+        for worker_id, process in list(self._workers.items()):
+            if self._closed:
+                return
+            if process is None:
+                if now >= self._restart_at.get(worker_id, float("inf")):
+                    del self._restart_at[worker_id]
+                    print(f"正在重启 Blender 工作进程 {worker_id}...")
+                    self._start_worker(worker_id)
+                continue
+            if process.is_alive():
+                continue
+
+            with self._lock:
+                self._ready.discard(worker_id)
+                self._idle.discard(worker_id)
+                job_id = self._running.pop(worker_id, None)
+            self._workers[worker_id] = None
+            if job_id is not None:
+                self._finish(
+                    job_id,
+                    {
+                        "success": False,
+                        "error": "工作进程意外退出",
+                        "message": f"exitcode={process.exitcode}",
+                    },
+                )
+
+            self._failures[worker_id] += 1
+            if self._failures[worker_id] > self.max_restarts:
+                print(
+                    f"✗ Blender 工作进程 {worker_id} 已连续失败 {self._failures[worker_id]} 次"
+                    f"（exitcode={process.exitcode}），不再重启"
+                )
+                with self._lock:
+                    self._given_up.add(worker_id)
+                continue
+            delay = min(
+                self.restart_backoff * 2 ** (self._failures[worker_id] - 1),
+                self.max_restart_backoff,
+            )
+            print(
+                f"⚠ Blender 工作进程 {worker_id} 已退出（exitcode={process.exitcode}），"
+                f"{delay:g} 秒后重启..."
+            )
+            self._restart_at[worker_id] = now + delay
+
+        if not self.healthy:
+            self._fail_pending()
+
+    def _fail_pending(self):
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+        for job_id, _, _ in pending:
+            self._finish(
+                job_id,
+                {
+                    "success": False,
+                    "error": "没有可用的 Blender 工作进程",
+                    "message": "所有工作进程均无法启动，进程池已停止重启",
+                },
+            )
+
+    def _event_loop(self):
+        while not self._closed:
+            try:
+                event = self._events.get(timeout=1)
+            except queue.Empty:
+                event = None
+            except (EOFError, OSError):
+                break
+            if event is not None:
+                self._handle_event(*event)
+            self._check_workers()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.n_workers,
+                "healthy": self.healthy,
+                "ready": len(self._ready),
+                "busy": len(self._running),
+                "queued": len(self._pending),
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+    def shutdown(self, timeout=None):
+        """通知所有工作进程在完成当前任务后退出"""
+        self._closed = True
+        for worker_id, process in self._workers.items():
+            if process is not None:
+                self._inboxes[worker_id].put(None)
+        for process in self._workers.values():
+            if process is not None:
+                process.join(timeout)
@@ -0,0 +1,75 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import bpy
+import numpy as np
+import pytest
+
+from infinigen.core.placement.asset_cache import AssetCache
+from infinigen.core.placement.factory import AssetFactory
+from infinigen.core.util import blender as butil
+
+
+class NoisyCubeFactory(AssetFactory):
+    n_created = 0
+
+    def create_asset(self, i, placeholder, face_size, **params):
+        NoisyCubeFactory.n_created += 1
+        obj = butil.spawn_cube(size=np.random.uniform(1, 2))
+        child = butil.spawn_cube(size=0.5, location=(0, 0, 2))
+        child.parent = obj
+        material = bpy.data.materials.new("noisy_cube")
+        material.diffuse_color = (*np.random.uniform(size=3), 1)
+        obj.data.materials.append(material)
+        return obj
+
+
+def vertices(obj):
+    co = np.zeros((len(obj.data.vertices), 3))
+    obj.data.vertices.foreach_get("co", co.reshape(-1))
+    return co
+
+
+@pytest.fixture
+def asset_cache(tmp_path, monkeypatch):
+    cache = AssetCache(folder=tmp_path)
+    monkeypatch.setattr(AssetCache, "_inst", cache)
+    return cache
+
+
+def test_spawn_asset_cache_hit(asset_cache):
+    factory = NoisyCubeFactory(factory_seed=0)
+    NoisyCubeFactory.n_created = 0
+
+    first = factory.spawn_asset(3, distance=10)
+    ref_vertices = vertices(first)
+    ref_color = tuple(first.data.materials[0].diffuse_color)
+    butil.delete(list(first.children_recursive) + [first])
+
+    second = factory.spawn_asset(3, distance=10.5)  # same distance bucket
+    assert NoisyCubeFactory.n_created == 1
+    assert asset_cache.stats() == dict(hits=1, misses=1)
+
+    assert second.name == f"{factory}.spawn_asset(3)"
+    np.testing.assert_allclose(vertices(second), ref_vertices)
+    assert tuple(second.data.materials[0].diffuse_color) == pytest.approx(ref_color)
+    assert len(second.children) == 1
+    assert second.name in bpy.context.scene.objects
+
+    factory.spawn_asset(4, distance=10)
+    factory.spawn_asset(3, distance=100)
+    assert NoisyCubeFactory.n_created == 3
+
+
+def test_asset_cache_evicts_least_recently_used(asset_cache):
+    factory = NoisyCubeFactory(factory_seed=0)
+    factory.spawn_asset(0)
+    asset_cache.max_size = 1.5 * sum(
+        f.stat().st_size for f in asset_cache.folder.rglob("*") if f.is_file()
+    )
+    factory.spawn_asset(1)
+
+    entries = list(asset_cache.folder.rglob("*.json"))
+    assert len(entries) == 1
+    assert asset_cache.load(factory, entries[0].stem) is not None
+    assert asset_cache.stats()["hits"] == 1
@@ -0,0 +1,176 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import os
+from pathlib import Path
+
+import bpy
+import gin
+import numpy as np
+import pytest
+from mathutils.bvhtree import BVHTree
+from mathutils.kdtree import KDTree
+
+import infinigen
+from infinigen.core.placement import camera as cam_util
+from infinigen.core.util.math import FixedSeed
+from infinigen.core.util.organization import Task
+from infinigen.core.util.test_utils import setup_gin
+
+
+def setup_scene():
+    gin.bind_parameter("get_sensor_coords.H", 30)
+    gin.bind_parameter("get_sensor_coords.W", 40)
+    scene = bpy.context.scene
+    scene.render.resolution_x, scene.render.resolution_y = 40, 30
+
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=60, y_subdivisions=60, size=60)
+    ground = bpy.context.active_object
+    scene_bvh = BVHTree.FromObject(ground, bpy.context.evaluated_depsgraph_get())
+
+    (rig,) = cam_util.spawn_camera_rigs(
+        camera_rig_config=[
+            dict(loc=(0, 0, 0), rot_euler=(0, 0, 0)),
+            dict(loc=(0.1, 0, 0), rot_euler=(0, 0.1, 0)),
+        ],
+        n_camera_rigs=1,
+    )
+
+    placeholders_kd = KDTree(1)
+    placeholders_kd.insert((100, 100, 100), 0)
+    placeholders_kd.balance()
+
+    return dict(
+        camera_rig=rig,
+        terrain=None,
+        scene_bvh=scene_bvh,
+        location_sample=lambda: np.random.uniform([-10, -10, 0], [10, 10, 0]),
+        placeholders_kd=placeholders_kd,
+        camera_selection_answers={},
+        vertexwise_min_dist=None,
+        camera_selection_ratio={},
+        terrain_coverage_range=(0.1, 1),
+    )
+
+
+def test_snapshot_scores_match_camera_objects():
+    kwargs = setup_scene()
+    rig = kwargs.pop("camera_rig")
+    terrain, scene_bvh, placeholders_kd = (
+        kwargs.pop(k) for k in ["terrain", "scene_bvh", "placeholders_kd"]
+    )
+    kwargs.pop("location_sample")
+
+    snapshot = cam_util.CameraRigSnapshot(rig)
+    props = cam_util.CameraProposal(
+        loc=np.array([1.0, 2.0, 2.0]), rot=np.deg2rad([70, 0, 30]), focal_length=35
+    )
+
+    props.apply(rig)
+    bpy.context.view_layer.update()
+    for cam, pose in zip(rig.children, snapshot.poses(props)):
+        assert np.allclose(cam.matrix_world, pose.matrix_world, atol=1e-5)
+        with FixedSeed(0):
+            ref = cam_util.keep_cam_pose_proposal(
+                cam, terrain, scene_bvh, placeholders_kd, **kwargs
+            )
+        with FixedSeed(0):
+            score = cam_util.keep_cam_pose_proposal(
+                pose, terrain, scene_bvh, placeholders_kd, **kwargs
+            )
+        assert ref is not None
+        assert score == pytest.approx(ref, rel=1e-4)
+
+
+def test_parallel_search_independent_of_workers():
+    kwargs = setup_scene()
+
+    views = {}
+    for n_workers in [1, 3]:
+        with FixedSeed(0):
+            views[n_workers] = cam_util.compute_base_views(
+                n_views=2,
+                min_candidates_ratio=3,
+                max_tries=500,
+                n_workers=n_workers,
+                chunksize=2,
+                **kwargs,
+            )
+
+    assert len(views[1]) == 2
+    for (s1, p1, f1), (s3, p3, f3) in zip(views[1], views[3]):
+        assert s1 == s3 and f1 == f3
+        np.testing.assert_array_equal(p1.loc, p3.loc)
+        np.testing.assert_array_equal(p1.rot, p3.rot)
+
+
+class ParentOnlyTerrain:
+    """Rejects cameras with x < 0, and fails if queried from a forked worker"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.queries = 0
+
+    def compute_camera_space_sdf(self, XYZ):
+        assert os.getpid() == self.pid, "terrain sdf evaluated in a forked worker"
+        self.queries += 1
+        return XYZ[:, 0]
+
+
+def test_parallel_search_evaluates_terrain_in_parent():
+    kwargs = setup_scene()
+    kwargs["terrain"] = terrain = ParentOnlyTerrain()
+
+    views = {}
+    for n_workers in [1, 3]:
+        with FixedSeed(0):
+            views[n_workers] = cam_util.compute_base_views(
+                n_views=2,
+                min_candidates_ratio=3,
+                max_tries=500,
+                n_workers=n_workers,
+                chunksize=2,
+                **kwargs,
+            )
+
+    assert terrain.queries > 0
+    for (s1, p1, _), (s3, p3, _) in zip(views[1], views[3]):
+        assert s1 == s3
+        assert p1.loc[0] > 0
+        np.testing.assert_array_equal(p1.loc, p3.loc)
+
+
+@pytest.mark.nature
+@pytest.mark.skipif(
+    not (Path(infinigen.__file__).parent / "terrain" / "lib").exists(),
+    reason="terrain libraries are not compiled",
+)
+def test_parallel_search_with_terrain(tmp_path):
+    from infinigen.terrain.core import Terrain
+
+    setup_gin("infinigen_examples/configs_nature", configs=["base_nature.gin"])
+    kwargs = setup_scene()
+    terrain = Terrain(0, task=Task.Coarse, on_the_fly_asset_folder=tmp_path)
+    # run the OpenMP kernels in this process before the workers are forked
+    terrain.compute_camera_space_sdf(np.zeros((1, 3)))
+    kwargs["terrain"] = terrain
+    kwargs["location_sample"] = lambda: np.random.uniform([-10, -10, 5], [10, 10, 20])
+
+    views = {}
+    for n_workers in [1, 3]:
+        with FixedSeed(0):
+            views[n_workers] = cam_util.search_viewpoints_parallel(
+                n_min_candidates=4,
+                max_tries=200,
+                n_workers=n_workers,
+                chunksize=2,
+                **kwargs,
+            )
+
+    gin.clear_config()
+    gin.unlock_config()
+
+    assert len(views[1]) == len(views[3])
+    for (s1, p1, _), (s3, p3, _) in zip(views[1], views[3]):
+        assert s1 == s3
+        np.testing.assert_array_equal(p1.loc, p3.loc)
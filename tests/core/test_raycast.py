@@ -0,0 +1,125 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import bpy
+import gin
+import numpy as np
+import pytest
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
+
+from infinigen.core.placement import split_in_view
+from infinigen.core.placement.camera import adjust_camera_sensor, get_sensor_coords
+from infinigen.core.util import blender as butil
+from infinigen.core.util.raycast import BatchRaycaster
+
+
+def sphere_mesh():
+    obj = butil.spawn_icosphere(radius=2)
+    verts = np.zeros((len(obj.data.vertices), 3))
+    obj.data.vertices.foreach_get("co", verts.reshape(-1))
+    faces = np.array([list(p.vertices) for p in obj.data.polygons])
+    butil.delete(obj)
+    return verts, faces
+
+
+def has_embree():
+    import trimesh.ray
+
+    return trimesh.ray.has_embree
+
+
+@pytest.mark.parametrize("backend", ["bvhtree", "triangle", "embree"])
+def test_ray_cast_batch_matches_bvhtree(backend):
+    if backend == "embree" and not has_embree():
+        pytest.skip("embree not installed")
+    verts, faces = sphere_mesh()
+    raycaster = BatchRaycaster.from_mesh(verts, faces, backend=backend)
+    bvh = BVHTree.FromPolygons(verts.tolist(), faces.tolist())
+
+    rng = np.random.default_rng(0)
+    origins = rng.uniform(-5, 5, size=(300, 3))
+    origins *= (3 / np.linalg.norm(origins, axis=-1))[:, None]
+    directions = rng.uniform(-1, 1, size=(300, 3)) - origins / 3
+
+    dists, index = raycaster.ray_cast_batch(origins, directions)
+    for o, d, dist, idx in zip(origins, directions, dists, index):
+        _, _, ref_idx, ref_dist = bvh.ray_cast(Vector(o), Vector(d))
+        if ref_dist is None:
+            assert idx == -1 and np.isinf(dist)
+        else:
+            assert idx == ref_idx
+            assert dist == pytest.approx(ref_dist, abs=1e-4)
+    assert (index >= 0).sum() > 50 and (index < 0).sum() > 50
+
+    # single queries are forwarded to the wrapped BVHTree
+    assert raycaster.ray_cast(Vector((0, 0, 5)), Vector((0, 0, -1)))[3] == (
+        pytest.approx(3, abs=0.1)
+    )
+
+
+def reference_visibility_mask(obj, cam):
+    bvh = BVHTree.FromObject(obj, bpy.context.evaluated_depsgraph_get())
+    mask = np.zeros(len(obj.data.vertices), dtype=bool)
+    invworld = obj.matrix_world.inverted()
+    sensor_coords, pix_it = get_sensor_coords(cam)
+    for x, y in pix_it:
+        origin = cam.matrix_world.translation
+        direction = (sensor_coords[y, x] - origin).normalized()
+        *_, index, dist = bvh.ray_cast(invworld @ origin, invworld.to_3x3() @ direction)
+        if dist is not None:
+            mask[list(obj.data.polygons[index].vertices)] = True
+    return mask
+
+
+def test_raycast_visibility_mask():
+    gin.bind_parameter("get_sensor_coords.H", 12)
+    gin.bind_parameter("get_sensor_coords.W", 16)
+    scene = bpy.context.scene
+    scene.render.resolution_x, scene.render.resolution_y = 16, 12
+    scene.frame_start = scene.frame_end = 1
+
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=40, y_subdivisions=40, size=20)
+    grid = bpy.context.active_object
+    grid.location = (3, 0, 0)
+
+    bpy.ops.object.camera_add(location=(0, 0, 8), rotation=(0, 0, 0))
+    cam = bpy.context.active_object
+    adjust_camera_sensor(cam)
+    bpy.context.view_layer.update()
+
+    mask = split_in_view.raycast_visiblity_mask(grid, [cam], verbose=False)
+    np.testing.assert_array_equal(mask, reference_visibility_mask(grid, cam))
+    assert 0 < mask.sum() < len(mask)
+
+
+def test_ray_cast_batch_quads():
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=6, y_subdivisions=6, size=2)
+    grid = bpy.context.active_object
+    verts = np.zeros((len(grid.data.vertices), 3))
+    grid.data.vertices.foreach_get("co", verts.reshape(-1))
+    faces = np.array([list(p.vertices) for p in grid.data.polygons])
+    centers = verts[faces].mean(axis=1)
+
+    raycaster = BatchRaycaster.from_mesh(verts, faces, backend="triangle")
+    _, index = raycaster.ray_cast_batch(centers + [0, 0, 1], [0, 0, -1])
+    np.testing.assert_array_equal(index, np.arange(len(faces)))
+
+
+def test_ray_cast_batch_stops_early():
+    verts, faces = sphere_mesh()
+    raycaster = BatchRaycaster.from_mesh(verts, faces, backend="bvhtree")
+    origins = np.zeros((10, 3)) + [0, 0, 5]
+    directions = np.tile([0, 0, -1], (10, 1))
+    directions[:4] = [0, 1, 0]
+
+    calls = []
+
+    def stop_if(dist, index):
+        calls.append(dist)
+        return len(calls) == 2
+
+    dists, index = raycaster.ray_cast_batch(origins, directions, stop_if=stop_if)
+    assert len(calls) == 2
+    assert (index[:4] == -1).all() and (index[4:6] >= 0).all()
+    assert (index[6:] == -1).all() and np.isinf(dists[6:]).all()
@@ -0,0 +1,50 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import bpy
+import numpy as np
+
+from infinigen.core.placement import split_in_view
+from infinigen.core.placement.animation_policy import keyframe
+from infinigen.core.placement.camera import adjust_camera_sensor
+
+
+def animated_cameras():
+    cameras = []
+    for i, y in enumerate([-10, 10]):
+        bpy.ops.object.camera_add(location=(0, y, 2))
+        cam = bpy.context.active_object
+        cam.name = f"camera_{i}"
+        adjust_camera_sensor(cam)
+        keyframe(cam, loc=(0, y, 2), rot=(np.pi / 2, 0, 0), t=1, interp="LINEAR")
+        keyframe(cam, loc=(5, y, 2), rot=(np.pi / 2, 0, 0.5), t=4, interp="LINEAR")
+        cameras.append(cam)
+    return cameras
+
+
+def test_inview_distances_batch_matches_loop():
+    scene = bpy.context.scene
+    scene.frame_start, scene.frame_end = 1, 4
+    scene.render.resolution_x, scene.render.resolution_y = 320, 240
+    cameras = animated_cameras()
+
+    rng = np.random.default_rng(0)
+    point_sets = [rng.uniform(-30, 30, size=(n, 3)) for n in [1, 8, 50, 0, 200]]
+
+    batch = split_in_view.compute_inview_distances_batch(
+        point_sets, cameras, dist_max=25, vis_margin=2, chunk_elements=64
+    )
+    assert len(batch) == len(point_sets)
+
+    for points, (mask, min_dists, min_vis_dists) in zip(point_sets, batch):
+        if len(points) == 0:
+            assert len(mask) == 0
+            continue
+        ref_mask, ref_dists, ref_vis_dists = split_in_view.compute_inview_distances(
+            points, cameras, dist_max=25, vis_margin=2
+        )
+        np.testing.assert_array_equal(mask, ref_mask)
+        np.testing.assert_allclose(min_dists, ref_dists, rtol=1e-6, atol=1e-6)
+        np.testing.assert_allclose(min_vis_dists, ref_vis_dists, rtol=1e-6, atol=1e-6)
+    assert any(mask.any() for mask, _, _ in batch)
+    assert not all(mask.all() for mask, _, _ in batch)
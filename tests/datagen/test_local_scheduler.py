@@ -0,0 +1,112 @@
+# Copyright (C) 2024, Princeton University.
+
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory
+# of this source tree.
+
+import subprocess
+import sys
+import time
+
+from infinigen.datagen.util.submitit_emulator import LocalScheduleHandler
+
+
+def run_until_idle(handler, timeout=30):
+    start = time.time()
+    while handler.pending or handler.running:
+        assert time.time() - start < timeout, "jobs did not finish"
+        handler.poll()
+        handler.wait(1)
+
+
+def sleep_cmd(dur):
+    return [sys.executable, "-c", f"import time; time.sleep({dur})"]
+
+
+def test_local_scheduler_cpu(tmp_path):
+    handler = LocalScheduleHandler(use_gpu=False)
+
+    jobs = [
+        handler.enqueue(
+            sleep_cmd(0.1), params={}, log_folder=tmp_path, stdout_passthrough=False
+        )
+        for _ in range(3)
+    ]
+    assert all(j.status() == "PENDING" for j in jobs)
+
+    handler.poll()
+    assert len(handler.pending) == 0
+    assert len(handler.running) == 3
+
+    run_until_idle(handler)
+    assert all(j.status() == "COMPLETED" for j in jobs)
+
+
+def test_local_scheduler_gpu_slots(tmp_path, monkeypatch):
+    handler = LocalScheduleHandler(use_gpu=True, jobs_per_gpu=1)
+
+    n_queries = 0
+
+    def fake_nvidia_smi(*args, **kwargs):
+        nonlocal n_queries
+        n_queries += 1
+        return b"GPU 0: Fake GPU (UUID: GPU-0)\n"
+
+    monkeypatch.delenv("CUDA_VISIBLE_DEVICES", raising=False)
+    monkeypatch.setattr("infinigen.datagen.util.submitit_emulator.which", lambda p: p)
+    monkeypatch.setattr(
+        "infinigen.datagen.util.submitit_emulator.subprocess.check_output",
+        fake_nvidia_smi,
+    )
+
+    jobs = [
+        handler.enqueue(
+            sleep_cmd(0.5),
+            params={"gpus": 1},
+            log_folder=tmp_path,
+            stdout_passthrough=False,
+        )
+        for _ in range(2)
+    ]
+
+    handler.poll()
+    assert [j.status() for j in jobs] == ["RUNNING", "PENDING"]
+
+    run_until_idle(handler)
+    assert all(j.status() == "COMPLETED" for j in jobs)
+
+    # inventory is only queried again when explicitly refreshed
+    assert n_queries == 1
+    handler.refresh_resources()
+    handler.poll()
+    assert n_queries == 2
+
+
+def test_local_scheduler_wait_wakes_on_exit(tmp_path):
+    handler = LocalScheduleHandler(use_gpu=False)
+    handler.enqueue(
+        sleep_cmd(0), params={}, log_folder=tmp_path, stdout_passthrough=False
+    )
+    handler.poll()
+
+    start = time.time()
+    while handler.running:
+        handler.wait(10)
+        handler.poll()
+    assert time.time() - start < 10
+
+
+def test_local_scheduler_wait_ignores_foreign_children(tmp_path):
+    handler = LocalScheduleHandler(use_gpu=False)
+    handler.enqueue(
+        sleep_cmd(5), params={}, log_folder=tmp_path, stdout_passthrough=False
+    )
+    handler.poll()
+
+    # children not started by the handler, eg manage_jobs' df calls, must not cut wait() short
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    start = time.time()
+    handler.wait(1)
+    assert time.time() - start > 0.9
+
+    for job_rec in handler.running.values():
+        job_rec["job"].kill()
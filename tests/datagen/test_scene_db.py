@@ -0,0 +1,70 @@
+# Copyright (C) 2024, Princeton University.
+
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory
+# of this source tree.
+
+from infinigen.datagen import manage_jobs
+from infinigen.datagen.states import JOB_OBJ_SUCCEEDED, JobState, SceneState
+from infinigen.datagen.util.scene_db import SceneDB
+
+
+def make_scenes():
+    return [
+        {
+            "seed": "a",
+            "configs": ["desert.gin"],
+            "all_done": SceneState.Done,
+            "coarse_submitted": 1,
+            "coarse_job_obj": JOB_OBJ_SUCCEEDED,
+            "coarse_jobstate": JobState.Succeeded,
+            "fine_0_0_0_submitted": 1,
+            "fine_0_0_0_jobstate": JobState.Succeeded,
+        },
+        {
+            "seed": "b",
+            "configs": ["forest.gin"],
+            "all_done": SceneState.NotDone,
+            "coarse_submitted": 1,
+            "coarse_jobstate": JobState.Running,
+        },
+        {"seed": "c", "configs": [], "all_done": SceneState.NotDone},
+    ]
+
+
+def test_scene_db_writes_only_changes(tmp_path):
+    db = SceneDB(tmp_path / "scenes_db.sqlite")
+    scenes = make_scenes()
+
+    assert db.save(scenes) == 3
+    assert db.save(scenes) == 0
+
+    scenes[1]["coarse_jobstate"] = JobState.Succeeded
+    assert db.save(scenes) == 1
+    db.close()
+
+    db = SceneDB(tmp_path / "scenes_db.sqlite")
+    assert db.load() == scenes
+    assert db.tasks_in_state(JobState.Succeeded) == [
+        ("a", "coarse"),
+        ("a", "fine_0_0_0"),
+        ("b", "coarse"),
+    ]
+
+
+def test_resume_from_scene_db(tmp_path):
+    db = SceneDB(tmp_path / manage_jobs.SQLITE_DB_NAME)
+    db.save(make_scenes())
+    db.close()
+
+    # b finished coarse after the db was last saved
+    (tmp_path / "b" / "logs").mkdir(parents=True)
+    (tmp_path / "b" / "logs" / "FINISH_coarse").touch()
+
+    scenes = manage_jobs.init_db_from_existing(tmp_path)
+    scenes = {s["seed"]: s for s in scenes if s is not None}
+
+    assert set(scenes.keys()) == {"a", "b"}
+    assert scenes["a"]["configs"] == ["desert.gin"]
+    assert scenes["a"]["fine_0_0_0_job_obj"] == JOB_OBJ_SUCCEEDED
+    assert scenes["b"]["coarse_job_obj"] == JOB_OBJ_SUCCEEDED
+    assert all(s["all_done"] == SceneState.NotDone for s in scenes.values())
@@ -0,0 +1,71 @@
+# Copyright (C) 2024, Princeton University.
+
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory
+# of this source tree.
+
+from types import SimpleNamespace
+
+from infinigen.datagen import states
+
+FAKE_SACCT = """#!/bin/sh
+# usage mimics: sacct -X -n -P -o JobID,State -j id1,id2,...
+echo "$@" >> {calls}
+ids=$(echo "$@" | sed 's/.*-j //' | tr ',' ' ')
+for id in $ids; do
+    state=$(grep "^$id " {states} | cut -d' ' -f2-)
+    [ -n "$state" ] && echo "$id|$state"
+done
+exit 0
+"""
+
+
+def make_fake_sacct(tmp_path, job_states: dict):
+    calls = tmp_path / "calls.txt"
+    calls.touch()
+    states_file = tmp_path / "states.txt"
+    states_file.write_text("".join(f"{k} {v}\n" for k, v in job_states.items()))
+
+    sacct = tmp_path / "sacct"
+    sacct.write_text(FAKE_SACCT.format(calls=calls, states=states_file))
+    sacct.chmod(0o755)
+    return sacct, calls, states_file
+
+
+def test_slurm_status_cache_batches(tmp_path):
+    sacct, calls, states_file = make_fake_sacct(
+        tmp_path, {"100": "RUNNING", "101": "CANCELLED by 0", "102": "PENDING"}
+    )
+    cache = states.SlurmStatusCache(sacct_path=str(sacct), max_ids_per_query=2)
+
+    jobs = [SimpleNamespace(job_id=str(i)) for i in range(100, 103)]
+    cache.refresh([j.job_id for j in jobs])
+
+    # 3 ids in chunks of 2
+    assert len(calls.read_text().splitlines()) == 2
+    assert [cache.status(j) for j in jobs] == ["RUNNING", "CANCELLED", "PENDING"]
+
+    # terminal states are not queried again
+    states_file.write_text("100 COMPLETED\n102 RUNNING\n")
+    cache.refresh([j.job_id for j in jobs])
+    last_call = calls.read_text().splitlines()[-1]
+    assert last_call.endswith("-j 100,102")
+    assert [cache.status(j) for j in jobs] == ["COMPLETED", "CANCELLED", "RUNNING"]
+
+    n_calls = len(calls.read_text().splitlines())
+    cache.refresh([j.job_id for j in jobs[:2]])
+    assert len(calls.read_text().splitlines()) == n_calls
+
+
+def test_slurm_status_cache_falls_back_to_seff(tmp_path, monkeypatch):
+    monkeypatch.setattr(states, "seff", lambda job_obj: "RUNNING")
+
+    cache = states.SlurmStatusCache(sacct_path=str(tmp_path / "missing_sacct"))
+    job = SimpleNamespace(job_id="100")
+    cache.refresh([job.job_id])
+    assert cache.status(job) == "RUNNING"
+
+    # sacct works but has not seen the job yet
+    sacct, _, _ = make_fake_sacct(tmp_path, {})
+    cache = states.SlurmStatusCache(sacct_path=str(sacct))
+    cache.refresh([job.job_id])
+    assert cache.status(job) == "RUNNING"
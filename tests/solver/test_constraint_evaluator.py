@@ -16,8 +16,10 @@ from infinigen.core import tagging
 from infinigen.core import tags as t
 from infinigen.core.constraints import constraint_language as cl
 from infinigen.core.constraints import usage_lookup
-from infinigen.core.constraints.evaluator import evaluate
-from infinigen.core.constraints.evaluator.node_impl import node_impls
+from infinigen.core.constraints.constraint_language import util as iu
+from infinigen.core.constraints.evaluator import eval_memo, evaluate
+from infinigen.core.constraints.evaluator.node_impl import node_impls, trimesh_geometry
+from infinigen.core.constraints.example_solver.geometry import parse_scene
 from infinigen.core.constraints.example_solver.state_def import (
     ObjectState,
     State,
@@ -78,6 +80,61 @@ def test_eval_node():
     assert eval(scene.tagged({t.Semantics.Chair}).count()) == 1
 
 
+def test_memo_eviction_for_deletion():
+    butil.clear_scene()
+
+    state = state_from_dummy_scene(make_chair_table())
+
+    scene = cl.scene()
+    chairs = scene.tagged({t.Semantics.Chair})
+    tables = scene.tagged({t.Semantics.Table})
+    problem = cl.Problem([], [chairs.count(), tables.count() * 2])
+
+    memo = {}
+    assert evaluate.evaluate_problem(problem, state, memo=memo).loss() == 3
+
+    backup = state.objs.pop("chair1")
+    eval_memo.evict_memo_for_name(memo, "chair1")
+    assert eval_memo.memo_key(chairs) not in memo
+    assert eval_memo.memo_key(tables) in memo
+    assert evaluate.evaluate_problem(problem, state, memo=memo).loss() == 2
+
+    # reverting the deletion must evict the same entries again
+    eval_memo.evict_memo_for_name(memo, "chair1")
+    state.objs["chair1"] = backup
+    assert evaluate.evaluate_problem(problem, state, memo=memo).loss() == 3
+
+
+def test_eviction_index_matches_graph_walk():
+    butil.clear_scene()
+
+    state = state_from_dummy_scene(make_chair_table())
+
+    scene = cl.scene()
+    chairs = scene.tagged({t.Semantics.Chair})
+    tables = scene.tagged({t.Semantics.Table})
+    problem = cl.Problem(
+        {"chairs": chairs.count() >= 1},
+        {"tables": tables.count() * 2, "total": scene.count()},
+    )
+
+    memo = {}
+    evaluate.evaluate_problem(problem, state, memo=memo)
+    index = eval_memo.EvictionIndex(problem)
+
+    for name in ["chair1", "table1"]:
+        walk_memo = dict(memo)
+        eval_memo.evict_memo_for_obj(problem, walk_memo, state.objs[name])
+        index_memo = dict(memo)
+        index.evict(index_memo, state.objs[name])
+        assert walk_memo.keys() == index_memo.keys()
+
+    index_memo = dict(memo)
+    index.evict(index_memo, state.objs["chair1"])
+    assert eval_memo.memo_key(tables) in index_memo
+    assert eval_memo.memo_key(chairs) not in index_memo
+
+
 def test_min_dist():
     butil.clear_scene()
 
@@ -687,6 +744,44 @@ def test_min_dist_tagged():
     assert np.isclose(res, 6)
 
 
+def test_bvh_cache_refit_after_move():
+    butil.clear_scene()
+
+    a = butil.spawn_cube(size=2, location=(0, 0, 0), name="a1")
+    bs = [
+        butil.spawn_cube(size=1, location=(x, 0, 1.2), name=f"b{i}")
+        for i, x in enumerate([4, -4])
+    ]
+    scene = parse_scene.parse_scene([a] + bs)
+    for o in bs:
+        tagging.tag_canonical_surfaces(o)
+    bvh_cache = {}
+    b_names = [o.name for o in bs]
+
+    def touching(tags):
+        return trimesh_geometry.any_touching(
+            scene, "a1", b_names, b_tags=tags, bvh_cache=bvh_cache
+        ).hit
+
+    assert not touching(None)
+    assert not touching({t.Subpart.Bottom})
+    cached = dict(bvh_cache)
+
+    # b0's bottom face now cuts through the side of a1
+    iu.translate(scene, "b0", (-3, 0, 0))
+    assert touching(None)
+    assert touching({t.Subpart.Bottom})
+    assert not touching({t.Subpart.Top})
+
+    # managers were refit in place rather than rebuilt
+    for k, col in cached.items():
+        assert bvh_cache[k] is col
+
+    iu.translate(scene, "b0", (3, 0, 0))
+    assert not touching(None)
+    assert not touching({t.Subpart.Bottom})
+
+
 def test_table():
     butil.clear_scene()
 
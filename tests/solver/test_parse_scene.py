@@ -0,0 +1,87 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory
+# of this source tree.
+
+import time
+
+import bpy
+import numpy as np
+import pytest
+import trimesh
+
+from infinigen.core.constraints.example_solver.geometry import parse_scene
+from infinigen.core.util import blender as butil
+
+
+def to_trimesh_loop(obj):
+    # original per-vertex implementation, kept as a reference for to_trimesh
+    bpy.context.view_layer.update()
+    verts = np.array([obj.matrix_world @ v.co for v in obj.data.vertices])
+    faces = np.array([p.vertices for p in obj.data.polygons])
+    return trimesh.Trimesh(vertices=verts, faces=faces, process=False)
+
+
+def test_to_trimesh_matches_loop():
+    butil.clear_scene()
+
+    obj = butil.spawn_cube(size=2, location=(1, 2, 3), name="cube")
+    obj.rotation_euler = (0.1, 0.2, 0.3)
+    obj.scale = (1, 2, 0.5)
+    bpy.context.view_layer.update()
+
+    # quads, handled by the fallback path
+    ref = to_trimesh_loop(obj)
+    res = parse_scene.to_trimesh(obj)
+    assert np.allclose(ref.vertices, res.vertices)
+    assert (ref.faces == res.faces).all()
+
+    parse_scene.preprocess_obj(obj)
+    ref = to_trimesh_loop(obj)
+    res = parse_scene.to_trimesh(obj)
+    assert res.faces.shape == (12, 3)
+    assert np.allclose(ref.vertices, res.vertices)
+    assert (ref.faces == res.faces).all()
+
+
+def test_add_objects_to_scene():
+    butil.clear_scene()
+
+    objs = [
+        butil.spawn_cube(size=1, location=(i, 0, 0), name=f"cube{i}") for i in range(5)
+    ]
+    scene = parse_scene.parse_scene(objs)
+
+    for i, o in enumerate(objs):
+        mesh = scene.geometry[o.name + "_mesh"]
+        assert np.allclose(mesh.bounds.mean(axis=0), (i, 0, 0))
+        assert len(mesh.faces) == 12
+
+
+@pytest.mark.skip_for_ci
+def test_to_trimesh_benchmark():
+    butil.clear_scene()
+
+    template = butil.spawn_cube(size=1, name="pholder")
+    parse_scene.preprocess_obj(template)
+
+    # bpy.ops-based spawning is quadratic in scene size, so copy the template directly
+    objs = []
+    for i in range(2000):
+        o = bpy.data.objects.new(f"pholder{i}", template.data.copy())
+        o.location = (i % 50, i // 50, 0)
+        bpy.context.scene.collection.objects.link(o)
+        objs.append(o)
+
+    start = time.perf_counter()
+    for o in objs:
+        to_trimesh_loop(o)
+    loop_dur = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bpy.context.view_layer.update()
+    for o in objs:
+        parse_scene.to_trimesh(o, update=False)
+    vec_dur = time.perf_counter() - start
+
+    print(f"to_trimesh for {len(objs)} objs: {loop_dur=:.3f}s {vec_dur=:.3f}s")
+    assert vec_dur < loop_dur
@@ -0,0 +1,69 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import bpy
+import numpy as np
+
+from infinigen.core import tagging
+from infinigen.core import tags as t
+from infinigen.core.constraints.example_solver.geometry import parse_scene
+from infinigen.core.constraints.example_solver.geometry.planes import Planes
+from infinigen.core.util import blender as butil
+
+
+def make_cube(name, location=(0, 0, 0)):
+    o = butil.spawn_cube(size=1, location=location, name=name)
+    parse_scene.preprocess_obj(o)
+    tagging.tag_canonical_surfaces(o)
+    return o
+
+
+def test_planes_shared_between_identical_meshes():
+    butil.clear_scene()
+
+    a = make_cube("cube_a")
+    b = make_cube("cube_b", location=(3, 0, 0))
+    bpy.context.view_layer.update()
+
+    planes = Planes()
+    a_planes = planes.get_tagged_planes(a, {t.Subpart.Top})
+    b_planes = planes.get_tagged_planes(b, {t.Subpart.Top})
+
+    assert len(a_planes) == 1
+    assert [idx for _, idx in a_planes] == [idx for _, idx in b_planes]
+    assert all(name == "cube_b" for name, _ in b_planes)
+    assert planes.stats["planes_miss"] == 1
+    assert planes.stats["planes_hit"] == 1
+
+
+def test_planes_cache_invalidated_by_geometry():
+    butil.clear_scene()
+
+    a = make_cube("cube_a")
+    bpy.context.view_layer.update()
+
+    planes = Planes()
+    mask = np.ones(len(a.data.polygons), dtype=bool)
+    before = planes.get_all_planes_cached(a, mask)
+
+    # same topology, different shape
+    a.data.vertices[0].co.z += 0.5
+    after = planes.get_all_planes_cached(a, mask)
+
+    assert planes.stats["planes_miss"] == 2
+    assert len(after) > len(before)
+
+
+def test_planes_cache_lru_bound():
+    butil.clear_scene()
+
+    objs = [make_cube(f"cube_{i}") for i in range(4)]
+    for i, o in enumerate(objs):
+        o.data.vertices[0].co.z += 0.1 * (i + 1)
+    bpy.context.view_layer.update()
+
+    planes = Planes(max_cached_planes=2)
+    for o in objs:
+        planes.get_all_planes_cached(o, np.ones(len(o.data.polygons), dtype=bool))
+
+    assert len(planes._cached_planes) == 2
@@ -0,0 +1,71 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import gin
+import numpy as np
+import pytest
+
+from infinigen.core.constraints.example_solver import moves
+from infinigen.core.constraints.example_solver.state_def import state_from_dummy_scene
+from infinigen.core.util import blender as butil
+
+
+def make_state(table_x):
+    butil.clear_scene()
+    col = butil.get_collection("indoor_scene_test")
+    chairs = butil.get_collection("chair")
+    tables = butil.get_collection("table")
+    col.children.link(chairs)
+    col.children.link(tables)
+
+    chair = butil.spawn_cube(size=2, location=(0, 0, 0), name="chair1")
+    butil.put_in_collection(chair, chairs)
+    table = butil.spawn_cube(size=2, location=(table_x, 0, 0), name="table1")
+    butil.put_in_collection(table, tables)
+
+    return state_from_dummy_scene(col)
+
+
+@pytest.mark.parametrize(
+    "move,valid",
+    [
+        (moves.TranslateMove(["chair1"], translation=np.array((2.5, 0, 0))), False),
+        (moves.TranslateMove(["chair1"], translation=np.array((-2.5, 0, 0))), True),
+        (moves.TranslateMove(["chair1"], translation=np.array((0, 0.5, 0))), True),
+        (
+            moves.RotateMove(["chair1"], axis=np.array((0, 0, 1)), angle=np.pi / 4),
+            False,
+        ),
+        (moves.RotateMove(["chair1"], axis=np.array((0, 0, 1)), angle=np.pi / 2), True),
+    ],
+)
+def test_prescreen_matches_apply(move, valid):
+    state = make_state(table_x=2.2)
+
+    (screened,) = moves.prescreen_pose_moves(state, [move])
+    applied = move.apply(state)
+    move.revert(state)
+
+    assert screened == applied == valid
+
+
+def test_prescreen_passes_other_moves():
+    state = make_state(table_x=3)
+    res = moves.prescreen_pose_moves(state, [moves.Deletion(["chair1"])])
+    assert res == [True]
+
+
+def test_prescreen_honors_disable_collision_checking():
+    state = make_state(table_x=2.2)
+    move = moves.TranslateMove(["chair1"], translation=np.array((2.5, 0, 0)))
+
+    with gin.unlock_config():
+        gin.bind_parameter("check_post_move_validity.disable_collision_checking", True)
+    try:
+        (screened,) = moves.prescreen_pose_moves(state, [move])
+        applied = move.apply(state)
+        move.revert(state)
+    finally:
+        gin.clear_config()
+
+    assert screened == applied is True
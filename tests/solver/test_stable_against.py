@@ -91,7 +91,7 @@ def make_scene_coplanar(loc2):
             parent_plane_idx=0,
         )
     )
-    butil.save_blend("test.blend")
+    # butil.save_blend("test.blend")
 
     return state_def.State(objs=objs)
 
@@ -0,0 +1,125 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import numpy as np
+
+from infinigen.terrain.elements.core import Element, height_band_bbox
+from infinigen.terrain.mesher.culling import culled_kernel_sdfs
+from infinigen.terrain.mesher.spherical_mesher import kernel_caller
+from infinigen.terrain.utils import Vars
+
+
+class FakeKernel:
+    def __init__(self, sdf_fn, bound_fn=None):
+        self.sdf_fn = sdf_fn
+        self.n_evaluated = 0
+        if bound_fn is not None:
+            self.sdf_lower_bound = bound_fn
+
+    def __call__(self, positions, sdf_only=False):
+        self.n_evaluated += len(positions)
+        return {Vars.SDF: self.sdf_fn(positions).astype(np.float32)}
+
+
+def sphere(center, radius):
+    center = np.array(center)
+    return lambda p: np.linalg.norm(p - center, axis=-1) - radius
+
+
+def test_culled_min_matches_full():
+    ground = FakeKernel(lambda p: p[:, 2])
+    rocks = []
+    for center in [(-3, 0, 0), (0, 2, 0), (3, -1, 0)]:
+        f = sphere(center, 0.5)
+        rocks.append(FakeKernel(f, bound_fn=f))
+    kernels = [rocks[0], ground, *rocks[1:]]
+
+    XYZ = np.random.default_rng(0).uniform(-5, 5, size=(10000, 3))
+    full = np.stack([k(XYZ, sdf_only=1)[Vars.SDF] for k in kernels], -1)
+    for k in kernels:
+        k.n_evaluated = 0
+
+    culled = culled_kernel_sdfs(kernels, XYZ)
+    assert culled.shape == full.shape
+    np.testing.assert_array_equal(culled.min(axis=-1), full.min(axis=-1))
+
+    assert ground.n_evaluated == len(XYZ)
+    for rock in rocks:
+        assert rock.n_evaluated < len(XYZ) / 2
+
+
+def test_localized_elements_are_culled():
+    from infinigen.terrain.elements.upsidedown_mountains import UpsidedownMountains
+    from infinigen.terrain.elements.warped_rocks import WarpedRocks
+
+    # parameters as the constructors lay them out, without loading the element libraries
+    mountains = object.__new__(UpsidedownMountains)
+    heightmaps = np.random.default_rng(1).uniform(0, 3, size=3 * 5 * 8 * 8)
+    mountains.float_params = np.concatenate(
+        ([100, 20, 0, 0.005, 9, 1, 0.2], heightmaps)
+    ).astype(np.float32)
+    rocks = object.__new__(WarpedRocks)
+    rocks.float_params = np.zeros(13, dtype=np.float32)
+    rocks.float_params[[0, 4, 11, 12]] = [3, 4, 2, -10]
+
+    # stand-in sdfs which respect the bounds the real kernels guarantee
+    def band(lo, hi, slope):
+        return lambda p: slope * np.maximum(lo - p[:, 2], p[:, 2] - hi)
+
+    elements = []
+    for element, sdf_fn in [
+        (mountains, band(20 - 3, 20 + 3, 1)),
+        (rocks, band(-np.inf, -10 + 2 + 4 / 3, 3)),
+    ]:
+        element.displacement = []
+        element.height_offset = 0
+        element.whole_bbox = None
+        element.sdf_cache = None
+        element._set_sdf_bbox()
+        kernel = FakeKernel(sdf_fn)
+        element._evaluate = lambda positions, sdf_only, kernel=kernel: kernel(positions)
+        elements.append((element, kernel))
+
+    ground = FakeKernel(lambda p: p[:, 2])
+    kernels = [ground, *(element for element, _ in elements)]
+    XYZ = np.random.default_rng(0).uniform(-30, 30, size=(10000, 3))
+    full = np.stack(
+        [ground(XYZ)[Vars.SDF], *(kernel.sdf_fn(XYZ) for _, kernel in elements)], -1
+    )
+
+    culled = culled_kernel_sdfs(kernels, XYZ)
+    np.testing.assert_allclose(culled.min(axis=-1), full.min(axis=-1), rtol=1e-6)
+    for _, kernel in elements:
+        assert 0 < kernel.n_evaluated < len(XYZ) / 2
+
+
+class SlabElement(Element):
+    # |z - level| - 0.1 in the element's own frame, evaluated by Element.__call__ without a library
+    def __init__(self, level, height_offset, bounded=True):
+        self.level = level
+        self.height_offset = height_offset
+        self.material = "ground"
+        self.displacement = []
+        self.whole_bbox = None
+        self.sdf_cache = None
+        self.sdf_bbox = height_band_bbox(level - 0.1, level + 0.1) if bounded else None
+        self.sdf_bbox_slope = 1
+
+    def call(self, N, positions, sdf, *auxs):
+        z = np.ctypeslib.as_array(positions, shape=(N, 3))[:, 2]
+        np.ctypeslib.as_array(sdf, shape=(N,))[:] = np.abs(z - self.level) - 0.1
+
+
+def test_culling_with_height_offset():
+    kernels = [
+        SlabElement(3, height_offset=1.3, bounded=False),
+        SlabElement(-4, height_offset=2.7),
+        SlabElement(10, height_offset=-0.9),
+    ]
+    XYZ = np.random.default_rng(0).uniform(-20, 20, size=(10000, 3))
+    before = XYZ.copy()
+
+    culled = kernel_caller(kernels, XYZ, min_only=True)
+    full = kernel_caller(kernels, XYZ)
+    np.testing.assert_array_equal(culled.min(axis=-1), full.min(axis=-1))
+    np.testing.assert_array_equal(XYZ, before)
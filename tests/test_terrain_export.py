@@ -0,0 +1,58 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import ctypes.util
+import pickle
+from ctypes import CDLL, POINTER, c_char, c_double, c_size_t
+from types import SimpleNamespace
+
+import numpy as np
+
+from infinigen.terrain.core import Terrain
+from infinigen.terrain.utils import CFuncsPicklable, Mesh, register_func
+
+
+class FakeMesher(CFuncsPicklable):
+    def __init__(self, offset):
+        self.offset = offset
+        register_func(
+            self, CDLL(ctypes.util.find_library("m")), "cos", [c_double], c_double
+        )
+
+    def __call__(self, elements):
+        vertices = np.arange(9, dtype=np.float64).reshape(3, 3) + self.offset
+        vertices[0, 0] += self.cos(0.0)
+        return Mesh(vertices=vertices, faces=np.array([[0, 1, 2]]))
+
+
+class FakeElement(CFuncsPicklable):
+    def __init__(self):
+        register_func(
+            self,
+            CDLL(ctypes.util.find_library("c")),
+            "strlen",
+            [POINTER(c_char)],
+            c_size_t,
+        )
+        self.inits = 1
+
+    def _init_cdll(self):
+        self.inits += 1
+
+
+def test_cfuncs_picklable_rebinds_functions():
+    element = pickle.loads(pickle.dumps(FakeElement()))
+    assert element.strlen(b"terrain") == 7
+    assert element.inits == 2
+
+
+def test_run_meshers_workers_keep_order():
+    jobs = [(f"mesh_{i}", FakeMesher(i), []) for i in [3, 1, 2, 0]]
+
+    serial = Terrain.run_meshers(SimpleNamespace(export_workers=1), jobs)
+    parallel = Terrain.run_meshers(SimpleNamespace(export_workers=3), jobs)
+
+    assert list(parallel.keys()) == [name for name, _, _ in jobs]
+    for name in serial:
+        np.testing.assert_array_equal(parallel[name].vertices, serial[name].vertices)
+        np.testing.assert_array_equal(parallel[name].faces, serial[name].faces)
@@ -0,0 +1,69 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import numpy as np
+
+from infinigen.core.nodes.node_wrangler import Nodes, NodeWrangler
+from infinigen.core.util import blender as butil
+from infinigen.terrain.surface_kernel import core as surface_kernel_core
+from infinigen.terrain.surface_kernel.core import KernelizerCache
+from infinigen.terrain.utils import KernelDataType
+
+
+def value_node(mod):
+    return next(n for n in mod.node_group.nodes if n.bl_idname == Nodes.Value)
+
+
+def displace_modifier(obj, value):
+    mod = obj.modifiers.new("displace", "NODES")
+    mod.node_group = butil.bpy.data.node_groups.new("displace", "GeometryNodeTree")
+    nw = NodeWrangler(mod.node_group)
+    geometry = nw.new_node(
+        Nodes.GroupInput, expose_input=[("NodeSocketGeometry", "Geometry", None)]
+    )
+    scale = nw.new_node(Nodes.Value, label="scale")
+    scale.outputs[0].default_value = value
+    offset = nw.new_node(
+        Nodes.VectorMath,
+        input_kwargs={0: nw.new_node(Nodes.InputNormal), "Scale": scale},
+        attrs={"operation": "SCALE"},
+    )
+    displaced = nw.new_node(
+        Nodes.SetPosition, input_kwargs={"Geometry": geometry, "Offset": offset}
+    )
+    nw.new_node(Nodes.GroupOutput, input_kwargs={"Geometry": displaced})
+    return mod
+
+
+def test_kernelizer_cache(tmp_path, monkeypatch):
+    calls = []
+
+    class CountingKernelizer:
+        def __call__(self, modifier):
+            calls.append(modifier.name)
+            value = value_node(modifier).outputs[0].default_value
+            inputs = {"scale": (KernelDataType.float, np.array([value], np.float32))}
+            return "", inputs, {"offset": KernelDataType.float3}
+
+    monkeypatch.setattr(surface_kernel_core, "Kernelizer", CountingKernelizer)
+
+    mod = displace_modifier(butil.spawn_cube(), 0.5)
+    cache = KernelizerCache()
+    cache.folder = tmp_path
+
+    inputs, outputs = cache("dirt", mod)
+    assert cache("dirt", mod)[0] is inputs
+    assert len(calls) == 1
+
+    # another process, e.g. the fine task, loads it from disk
+    fresh = KernelizerCache()
+    fresh.folder = tmp_path
+    inputs2, outputs2 = fresh("dirt", mod)
+    assert len(calls) == 1
+    np.testing.assert_array_equal(inputs2["scale"][1], inputs["scale"][1])
+    assert outputs2 == outputs
+
+    value_node(mod).outputs[0].default_value = 0.25
+    inputs3, _ = fresh("dirt", mod)
+    assert len(calls) == 2
+    assert inputs3["scale"][1][0] == 0.25
@@ -0,0 +1,69 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import logging
+import time
+
+import numpy as np
+import pytest
+
+from infinigen.terrain import marching_cubes as _marching_cubes_lewiner_cy
+from infinigen.terrain.mesher._marching_cubes_lewiner import (
+    marching_cubes,
+    marching_cubes_batch,
+)
+
+logger = logging.getLogger(__name__)
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(_marching_cubes_lewiner_cy, "marching_cubes_batch"),
+    reason="terrain marching cubes extension is not compiled",
+)
+
+
+def random_blocks(n, upscale=3, seed=0):
+    # noisy planes crossing each block, like UniformMesher's fine blocks
+    rng = np.random.default_rng(seed)
+    S = upscale + 1
+    grid = np.stack(np.meshgrid(*[np.arange(S)] * 3, indexing="ij"), -1)[None]
+    normals = rng.normal(size=(n, 1, 1, 1, 3))
+    centers = rng.uniform(0, S - 1, size=(n, 1, 1, 1, 3))
+    sdf = ((grid - centers) * normals).sum(-1) + 0.3 * rng.normal(size=(n, S, S, S))
+    crossing = (sdf.min(axis=(1, 2, 3)) < 0) & (sdf.max(axis=(1, 2, 3)) > 0)
+    return sdf[crossing]
+
+
+def test_marching_cubes_batch_matches_loop():
+    blocks = random_blocks(2000)
+    verts_int, verts_frac, faces, vert_counts, face_counts = marching_cubes_batch(
+        blocks, 0
+    )
+    vert_offsets = np.concatenate([[0], np.cumsum(vert_counts)])
+    face_offsets = np.concatenate([[0], np.cumsum(face_counts)])
+
+    for b, block in enumerate(blocks):
+        ref_int, ref_frac, ref_faces, _, _ = marching_cubes(block, 0)
+        v = slice(vert_offsets[b], vert_offsets[b + 1])
+        f = slice(face_offsets[b], face_offsets[b + 1])
+        assert np.array_equal(verts_int[v], ref_int)
+        assert np.array_equal(verts_frac[v], ref_frac)
+        assert np.array_equal(faces[f], ref_faces)
+
+
+def test_marching_cubes_batch_throughput():
+    blocks = random_blocks(20000)
+
+    start = time.perf_counter()
+    for block in blocks:
+        marching_cubes(block, 0)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    marching_cubes_batch(blocks, 0)
+    batch_time = time.perf_counter() - start
+
+    logger.info(
+        f"{len(blocks)} blocks: loop {len(blocks) / loop_time:.0f} blocks/s, "
+        f"batch {len(blocks) / batch_time:.0f} blocks/s"
+    )
+    assert batch_time < loop_time
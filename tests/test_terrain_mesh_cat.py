@@ -0,0 +1,55 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+import numpy as np
+
+from infinigen.terrain.utils import Mesh, MeshBuilder
+
+
+def random_mesh(rng, n_verts, n_faces, attributes):
+    return Mesh(
+        vertices=rng.uniform(size=(n_verts, 3)),
+        faces=rng.integers(0, n_verts, size=(n_faces, 3)),
+        vertex_attributes={
+            name: rng.uniform(size=(n_verts, *shape)).astype(np.float32)
+            for name, shape in attributes.items()
+        },
+    )
+
+
+def test_mesh_cat(tmp_path):
+    rng = np.random.default_rng(0)
+    meshes = [
+        random_mesh(rng, 5, 4, {"a": ()}),
+        random_mesh(rng, 0, 0, {"a": (), "b": (3,)}),
+        random_mesh(rng, 7, 6, {"b": (3,)}),
+        random_mesh(rng, 3, 1, {"a": (), "b": (3,)}),
+    ]
+
+    catted = Mesh.cat(meshes)
+
+    np.testing.assert_array_equal(
+        catted.vertices, np.concatenate([m.vertices for m in meshes])
+    )
+    np.testing.assert_array_equal(
+        catted.faces,
+        np.concatenate([meshes[0].faces, meshes[2].faces + 5, meshes[3].faces + 12]),
+    )
+    a = catted.vertex_attributes["a"]
+    assert a.shape == (15, 1)
+    np.testing.assert_array_equal(a[:5, 0], meshes[0].vertex_attributes["a"])
+    assert (a[5:12] == 0).all()
+    np.testing.assert_array_equal(a[12:, 0], meshes[3].vertex_attributes["a"])
+    b = catted.vertex_attributes["b"]
+    assert b.shape == (15, 3)
+    assert (b[:5] == 0).all()
+
+    # memory mapped pieces go through the builder without being loaded up front
+    np.save(tmp_path / "verts.npy", meshes[2].vertices)
+    builder = MeshBuilder()
+    builder.add(np.load(tmp_path / "verts.npy", mmap_mode="r"), meshes[2].faces)
+    builder.add_mesh(meshes[0])
+    mesh = builder.build()
+    assert len(mesh.vertices) == 12
+    np.testing.assert_array_equal(mesh.faces[6:], meshes[0].faces + 7)
+    assert mesh.vertex_attributes["a"].shape == (12, 1)
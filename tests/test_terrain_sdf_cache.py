@@ -0,0 +1,88 @@
+# Copyright (C) 2024, Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from infinigen.terrain.elements.core import Element
+from infinigen.terrain.utils import Vars
+from infinigen.terrain.utils.sdf_cache import SDFTileCache
+
+
+def fake_element(float_params):
+    empty_int, empty_float = np.zeros(0, np.int32), np.zeros(0, np.float32)
+    return SimpleNamespace(
+        meta_params=[0],
+        material="ground",
+        height_offset=0,
+        whole_bbox=None,
+        displacement=[],
+        int_params=empty_int,
+        float_params=np.array(float_params, np.float32),
+        int_params2=empty_int,
+        float_params2=empty_float,
+        int_params3=empty_int,
+        float_params3=empty_float,
+    )
+
+
+def test_sdf_tile_cache_roundtrip(tmp_path):
+    cache = SDFTileCache(tmp_path, enabled=True, min_points=10)
+    element = fake_element([1, 2])
+    positions = np.random.default_rng(0).uniform(size=(100, 3))
+
+    assert cache.key(element, positions[:5], True) is None
+    key = cache.key(element, positions, True)
+    assert cache.load(key) is None
+
+    sdf = positions[:, 2].astype(np.float32)
+    cache.save(key, {Vars.SDF: sdf})
+
+    # a fresh cache on the same folder, as in a re-run of the task
+    cache = SDFTileCache(tmp_path, enabled=True, min_points=10)
+    assert cache.key(element, positions, True) == key
+    ret = cache.load(key)
+    np.testing.assert_array_equal(ret[Vars.SDF], sdf)
+
+    # copy on write, the tile on disk is unchanged
+    ret[Vars.SDF] -= 1
+    np.testing.assert_array_equal(cache.load(key)[Vars.SDF], sdf)
+
+    assert cache.key(element, positions + 1e-3, True) != key
+    assert cache.key(element, positions, False) != key
+    assert cache.key(fake_element([1, 3]), positions, True) != key
+
+
+class SlopeElement(Element):
+    # z - slope * x in the element's own frame, evaluated by Element.__call__ without a library
+    def __init__(self, slope, height_offset, cache):
+        for name, value in vars(fake_element([slope])).items():
+            setattr(self, name, value)
+        self.height_offset = height_offset
+        self.sdf_cache = cache
+        self.n_evaluated = 0
+
+    def call(self, N, positions, sdf, *auxs):
+        self.n_evaluated += N
+        xyz = np.ctypeslib.as_array(positions, shape=(N, 3))
+        slope = self.float_params[0]
+        np.ctypeslib.as_array(sdf, shape=(N,))[:] = xyz[:, 2] - slope * xyz[:, 0]
+
+
+def test_sdf_tile_cache_shared_positions(tmp_path):
+    # meshers pass one positions array to every element in turn
+    positions = np.random.default_rng(0).uniform(-10, 10, size=(1000, 3))
+
+    def run():
+        cache = SDFTileCache(tmp_path, enabled=True, min_points=10)
+        elements = [SlopeElement(0.5, 1.3, cache), SlopeElement(-2, 2.7, cache)]
+        sdfs = [np.array(e(positions, sdf_only=True)[Vars.SDF]) for e in elements]
+        return cache, elements, sdfs
+
+    _, _, uncached = run()
+    cache, elements, cached = run()
+    assert cache.hits == 2 and cache.misses == 0
+    assert [e.n_evaluated for e in elements] == [0, 0]
+    for sdf, ref in zip(cached, uncached):
+        np.testing.assert_array_equal(sdf, ref)